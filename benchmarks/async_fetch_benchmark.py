@@ -0,0 +1,60 @@
+"""
+Compares fetching the sidebar's data one endpoint after another with fanning
+out through AsyncNbaService, against a local server that adds a fixed latency
+to every response.
+
+    $ python3 -m benchmarks.async_fetch_benchmark
+"""
+
+from benchmarks.fixture_server import FixtureServer, LocalNbaService
+from constants import UTC
+from datetime import datetime
+from services.async_nba_service import AsyncNbaService
+from sidebarbot import fetch_sidebar_data
+from team_config import KNICKS
+
+import asyncio
+import logging
+import statistics
+import time
+
+LATENCY = 0.05
+ROUNDS = 10
+
+
+def sequential(nba_service):
+  year = nba_service.season_year(datetime.now(UTC))
+  nba_service.players(year)
+  nba_service.roster('knicks', year)
+  nba_service.teams(year)
+  nba_service.schedule('knicks', year)
+  nba_service.conference_standings()
+
+
+def concurrent(nba_service):
+  asyncio.run(fetch_sidebar_data(
+      AsyncNbaService(nba_service), KNICKS, datetime.now(UTC)))
+
+
+def measure(fetch, base_url):
+  timings = []
+  for _ in range(ROUNDS):
+    # A new service per round so nothing is served from the memo.
+    nba_service = LocalNbaService(logging.getLogger(__name__), base_url)
+    start = time.perf_counter()
+    fetch(nba_service)
+    timings.append(time.perf_counter() - start)
+  return statistics.median(timings)
+
+
+if __name__ == '__main__':
+  logging.basicConfig(level=logging.ERROR)
+  with FixtureServer(latency=LATENCY) as server:
+    sequential_time = measure(sequential, server.base_url)
+    concurrent_time = measure(concurrent, server.base_url)
+  print(f'Per-request latency: {LATENCY * 1000:.0f} ms, rounds: {ROUNDS}')
+  print(f'Sequential (6 round trips): {sequential_time * 1000:.1f} ms')
+  print(f'Concurrent (season_year, then 5 in parallel): '
+        f'{concurrent_time * 1000:.1f} ms')
+  print(f'Critical path reduction: '
+        f'{(1 - concurrent_time / sequential_time) * 100:.0f}%')
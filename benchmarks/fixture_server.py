@@ -0,0 +1,67 @@
+"""
+A local stand-in for data.nba.net that serves files from services/testdata with
+an artificial delay, so benchmarks can measure network-bound code paths without
+depending on the real API.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from services.nba_service import NbaService
+
+import os.path
+import threading
+import time
+
+
+class FixtureServer:
+
+  def __init__(self, latency=0.05):
+    """
+    Parameters
+    ----------
+    latency: float
+      Seconds to wait before answering each request.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+      protocol_version = 'HTTP/1.1'
+
+      def do_GET(self):
+        time.sleep(latency)
+        path = 'services/testdata/' + self.path.split('/')[-1]
+        if not os.path.isfile(path):
+          self.send_error(404)
+          return
+        with open(path, 'rb') as f:
+          body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+      def log_message(self, format, *args):
+        pass
+
+    self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+
+  def __enter__(self):
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    return self
+
+  def __exit__(self, *args):
+    self.server.shutdown()
+    self.server.server_close()
+
+
+class LocalNbaService(NbaService):
+  """An NbaService whose requests go to a FixtureServer instead of
+  data.nba.net."""
+
+  def __init__(self, logger, base_url, **kwargs):
+    super().__init__(logger, cache_dir=None, **kwargs)
+    self.base_url = base_url
+
+  def _download(self, endpoint, url):
+    return super()._download(
+        endpoint, url.replace('http://data.nba.net', self.base_url))
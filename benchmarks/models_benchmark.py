@@ -0,0 +1,94 @@
+"""
+Compares the raw JSON dicts with the services.models objects they're turned
+into, on the testdata fixtures: memory kept alive by each representation,
+the cost of building it, and the time to render both bots' text from the
+models.
+
+    $ python3 -m benchmarks.models_benchmark
+"""
+
+from datetime import datetime
+from game_thread_bot import GameThreadBot
+from services.fake_nba_service import FakeNbaService
+from services.models import Boxscore, ConferenceStandings, Game, Player, Team
+from unittest.mock import MagicMock
+
+import json
+import logging
+import sidebarbot
+import timeit
+import tracemalloc
+
+ROUNDS = 200
+NOW = datetime(2020, 12, 28, 3, 0, 0, 0, sidebarbot.UTC)
+
+FIXTURES = [
+  ('0022000036_boxscore.json', lambda data: Boxscore.from_json(data)),
+  ('players.json',
+   lambda data: tuple(Player.from_json(p) for p in data['league']['standard'])),
+  ('schedule.json',
+   lambda data: tuple(Game.from_json(g) for g in data['league']['standard'])),
+  ('standings_conference.json',
+   lambda data: ConferenceStandings.from_json(data['league']['standard'])),
+  ('teams.json',
+   lambda data: {
+       t['teamId']: Team.from_json(t) for t in data['league']['standard']}),
+]
+
+
+def retained_memory(build):
+  """Returns how many bytes the object returned by build keeps allocated."""
+  tracemalloc.start()
+  result = build()
+  current, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del result
+  return current
+
+
+def per_run_us(fn):
+  return timeit.timeit(fn, number=ROUNDS) / ROUNDS * 1e6
+
+
+def benchmark_fixtures():
+  print(f'{"fixture":>26} | {"dicts":>9} | {"models":>9} | '
+        f'{"json.loads":>10} | {"+ models":>9}')
+  for file_name, to_model in FIXTURES:
+    with open(f'services/testdata/{file_name}', 'r') as f:
+      body = f.read()
+    data = json.loads(body)
+    to_model(data)  # Warm up any caches before measuring.
+    dicts_kib = retained_memory(lambda: json.loads(body)) / 1024
+    models_kib = retained_memory(lambda: to_model(json.loads(body))) / 1024
+    loads_us = per_run_us(lambda: json.loads(body))
+    convert_us = per_run_us(lambda: to_model(data))
+    print(f'{file_name:>26} | {dicts_kib:7.1f} K | {models_kib:7.1f} K | '
+          f'{loads_us:7.0f} us | {convert_us:6.0f} us')
+
+
+def benchmark_rendering():
+  logger = logging.getLogger(__name__)
+  nba_service = FakeNbaService(logger)
+  teams = nba_service.teams('2020')
+  boxscore = nba_service.boxscore('20201227', '0022000036')
+  schedule = nba_service.schedule('knicks', '2020')
+  standings = nba_service.conference_standings()
+  bot = GameThreadBot(logger, nba_service, NOW, MagicMock(), 'NYKnicks')
+
+  for name, render in [
+      ('post game thread', lambda: bot._build_postgame_thread_text(
+          boxscore, teams)),
+      ('game thread', lambda: bot._build_game_thread_text(boxscore, teams)),
+      ('sidebar schedule', lambda: sidebarbot.build_schedule(
+          logger, NOW, teams, schedule)),
+      ('tank standings', lambda: sidebarbot.build_tank_standings(
+          logger, standings, teams)),
+  ]:
+    print(f'{name:>26}: {per_run_us(render):6.0f} us/render')
+
+
+if __name__ == '__main__':
+  logging.basicConfig(level=logging.ERROR)
+  print(f'rounds: {ROUNDS}')
+  benchmark_fixtures()
+  benchmark_rendering()
@@ -0,0 +1,48 @@
+"""
+Compares decoding the whole schedule.json with the partial parser on the
+game thread bot's hot path, which only reads the games around
+lastStandardGamePlayedIndex.
+
+    $ python3 -m benchmarks.schedule_parse_benchmark
+"""
+
+from services.schedule_parser import parse_schedule
+
+import json
+import timeit
+import tracemalloc
+
+ROUNDS = 200
+
+
+def full(body):
+  league = json.loads(body)['league']
+  idx = league['lastStandardGamePlayedIndex']
+  return league['standard'][idx:idx + 2]
+
+
+def partial(body):
+  league = parse_schedule(body)['league']
+  idx = league['lastStandardGamePlayedIndex']
+  return league['standard'][idx:idx + 2]
+
+
+def peak_memory(parse, body):
+  tracemalloc.start()
+  result = parse(body)
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del result
+  return peak
+
+
+if __name__ == '__main__':
+  with open('services/testdata/schedule.json', 'r') as f:
+    body = f.read()
+  assert full(body) == partial(body)
+
+  print(f'schedule.json: {len(body)} bytes, rounds: {ROUNDS}')
+  for name, parse in [('json.loads', full), ('parse_schedule', partial)]:
+    seconds = timeit.timeit(lambda: parse(body), number=ROUNDS) / ROUNDS
+    print(f'{name:>15}: {seconds * 1e6:8.0f} us/run, '
+          f'peak {peak_memory(parse, body) / 1024:7.1f} KiB allocated')
@@ -0,0 +1,58 @@
+"""
+Compares finding the current and next game next to lastStandardGamePlayedIndex
+with looking them up in a SeasonCalendar: once for a fresh schedule (a cron
+run, which indexes the games as far as the lookups need) and again on a
+calendar that already did (a daemon or fan-out run that gets the memoized
+schedule).
+
+    $ python3 -m benchmarks.season_calendar_benchmark
+"""
+
+from constants import UTC
+from datetime import datetime, timedelta
+from services.models import Game, Schedule
+from services.schedule_parser import parse_schedule
+from services.season_calendar import SeasonCalendar
+
+import timeit
+
+ROUNDS = 2000
+
+# 1 hour before NYK @ CLE.
+NOW = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+LEAD = timedelta(hours=1)
+
+
+def parse(body):
+  league = parse_schedule(body, Game.from_json)['league']
+  games = league['standard']
+  index = league['lastStandardGamePlayedIndex']
+  return Schedule(index, games, SeasonCalendar(games, index))
+
+
+def by_index(schedule):
+  idx = schedule.last_played_index
+  return schedule.games[idx], schedule.games[idx + 1]
+
+
+def by_calendar(schedule):
+  calendar = schedule.calendar
+  return calendar.current_game(NOW, LEAD), calendar.next_game(NOW)
+
+
+if __name__ == '__main__':
+  with open('services/testdata/schedule.json', 'r') as f:
+    body = f.read()
+  built = parse(body)
+  by_calendar(built)
+
+  print(f'schedule.json: {len(body)} bytes, rounds: {ROUNDS}')
+  cases = [
+    ('index, fresh', lambda: by_index(parse(body))),
+    ('calendar, fresh', lambda: by_calendar(parse(body))),
+    ('index, memoized', lambda: by_index(built)),
+    ('calendar, memoized', lambda: by_calendar(built)),
+  ]
+  for name, run in cases:
+    seconds = min(timeit.repeat(run, number=ROUNDS, repeat=5)) / ROUNDS
+    print(f'{name:>18}: {seconds * 1e6:8.1f} us/run')
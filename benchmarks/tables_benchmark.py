@@ -0,0 +1,127 @@
+"""
+Compares rendering the post game box score tables with tables.Table against
+the string concatenation the game thread bot used before, for each testdata
+box score: time per render and the peak memory allocated while rendering.
+Both must produce the same text.
+
+    $ python3 -m benchmarks.tables_benchmark
+"""
+
+from game_thread_bot import GameThreadBot
+from services.fake_nba_service import FakeNbaService
+
+import logging
+import timeit
+import tracemalloc
+
+ROUNDS = 2000
+BOXSCORES = ['0022000036', '0022000046', '0022000066']
+
+
+def plusminus(someStat):
+  return GameThreadBot._plusminus(someStat)
+
+
+def legacy_player_row(p):
+  name = f'{p.name}^{p.pos}' if p.pos else p.name
+  return (f'|{name}|{p.min}|{p.fgm}-{p.fga}|{p.tpm}-{p.tpa}|{p.ftm}-{p.fta}|'
+          f'{p.off_reb}|{p.def_reb}|{p.tot_reb}|{p.assists}|{p.steals}|'
+          f'{p.blocks}|{p.turnovers}|{p.p_fouls}|'
+          f'{plusminus(p.plus_minus)}|{p.points}|\n')
+
+
+def legacy_tables(boxscore, vTeamFullName, hTeamFullName):
+  """The team stats, team leaders and player stats sections as they were
+  rendered before tables.Table."""
+  road = boxscore.game.road
+  home = boxscore.game.home
+  v = boxscore.road_stats
+  h = boxscore.home_stats
+  body = f"""
+##### Team Stats
+
+|**Team**|**PTS**|**FG**|**FG%**|**3P**|**3P%**|**FT**|**FT%**|**OREB**|**TREB**|**AST**|**PF**|**STL**|**TO**|**BLK**|
+|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|
+|{vTeamFullName}|{v.points}|{v.fgm}-{v.fga}|{v.fgp}%|{v.tpm}-{v.tpa}|{v.tpp}%|{v.ftm}-{v.fta}|{v.ftp}%|{v.off_reb}|{v.tot_reb}|{v.assists}|{v.p_fouls}|{v.steals}|{v.turnovers}|{v.blocks}|
+|{hTeamFullName}|{h.points}|{h.fgm}-{h.fga}|{h.fgp}%|{h.tpm}-{h.tpa}|{h.tpp}%|{h.ftm}-{h.fta}|{h.ftp}%|{h.off_reb}|{h.tot_reb}|{h.assists}|{h.p_fouls}|{h.steals}|{h.turnovers}|{h.blocks}|
+
+|**Team**|**Biggest Lead**|**Longest Run**|**PTS: In Paint**|**PTS: Off TOs**|**PTS: Fastbreak**|
+|:--|:--|:--|:--|:--|:--|
+|{vTeamFullName}|{plusminus(v.biggest_lead)}|{v.longest_run}|{v.points_in_paint}|{v.points_off_turnovers}|{v.fast_break_points}|
+|{hTeamFullName}|{plusminus(h.biggest_lead)}|{h.longest_run}|{h.points_in_paint}|{h.points_off_turnovers}|{h.fast_break_points}|
+  """
+  body += f"""
+##### Team Leaders
+
+|**Team**|**Points**|**Rebounds**|**Assists**|
+|:--|:--|:--|:--|
+|{vTeamFullName}|**{v.points_leader.value}** {v.points_leader.name}|**{v.rebounds_leader.value}** {v.rebounds_leader.name}|**{v.assists_leader.value}** {v.assists_leader.name}|
+|{hTeamFullName}|**{h.points_leader.value}** {h.points_leader.name}|**{h.rebounds_leader.value}** {h.rebounds_leader.name}|**{h.assists_leader.value}** {h.assists_leader.name}|
+"""
+  body += f"""
+##### Player Stats
+
+**[](/{road.tri_code}) {vTeamFullName.rsplit(None, 1)[-1].upper()}**|**MIN**|**FGM-A**|**3PM-A**|**FTM-A**|**ORB**|**DRB**|**REB**|**AST**|**STL**|**BLK**|**TO**|**PF**|**+/-**|**PTS**|
+|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|
+"""
+  for player in boxscore.players:
+    if player.team_id == road.team_id:
+      body += legacy_player_row(player)
+  body += f"""\n**[](/{home.tri_code}) {hTeamFullName.rsplit(None, 1)[-1].upper()}**|**MIN**|**FGM-A**|**3PM-A**|**FTM-A**|**ORB**|**DRB**|**REB**|**AST**|**STL**|**BLK**|**TO**|**PF**|**+/-**|**PTS**|
+|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|
+"""
+  for player in boxscore.players:
+    if player.team_id != road.team_id:
+      body += legacy_player_row(player)
+  return body
+
+
+def table_tables(boxscore, vTeamFullName, hTeamFullName):
+  """The same sections rendered by the bot with tables.Table."""
+  game = boxscore.game
+  team_stats = (
+      vTeamFullName, boxscore.road_stats, hTeamFullName, boxscore.home_stats)
+  body = GameThreadBot._render_team_stats(*team_stats)
+  body += GameThreadBot._render_team_leaders(*team_stats)
+  body += GameThreadBot._render_player_stats(
+      game.road.team_id,
+      game.road.tri_code,
+      vTeamFullName,
+      game.home.tri_code,
+      hTeamFullName,
+      boxscore.players)
+  return body
+
+
+def peak_kib(render):
+  tracemalloc.start()
+  render()
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  return peak / 1024
+
+
+def per_run_us(render):
+  return min(timeit.repeat(render, number=ROUNDS, repeat=7)) / ROUNDS * 1e6
+
+
+if __name__ == '__main__':
+  logging.basicConfig(level=logging.ERROR)
+  nba_service = FakeNbaService()
+  teams = nba_service.teams('2020')
+  print(f'rounds: {ROUNDS}')
+  print(f'{"boxscore":>10} | {"players":>7} | {"+= (us)":>8} | '
+        f'{"Table (us)":>10} | {"+= peak":>9} | {"Table peak":>10}')
+  for game_id in BOXSCORES:
+    boxscore = nba_service.boxscore('2020', game_id)
+    game = boxscore.game
+    args = (
+        boxscore,
+        teams[game.road.team_id].full_name,
+        teams[game.home.team_id].full_name)
+    assert legacy_tables(*args) == table_tables(*args)
+    legacy = lambda: legacy_tables(*args)
+    table = lambda: table_tables(*args)
+    print(f'{game_id:>10} | {len(boxscore.players):7} | '
+          f'{per_run_us(legacy):8.1f} | {per_run_us(table):10.1f} | '
+          f'{peak_kib(legacy):7.1f} K | {peak_kib(table):8.1f} K')
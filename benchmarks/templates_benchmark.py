@@ -0,0 +1,72 @@
+"""
+Measures the thread templates on the testdata box scores: the one-time cost of
+compiling each template file, the cost of TemplateCache.get once it's compiled
+(a stat of the file) and the render time per template, next to formatting the
+same file text with str.format_map, which parses the template every time.
+
+    $ python3 -m benchmarks.templates_benchmark
+"""
+
+from datetime import datetime
+from game_thread_bot import GameThreadBot
+from services.fake_nba_service import FakeNbaService
+from thread_templates import TemplateCache, compile_template
+from unittest.mock import MagicMock
+
+import logging
+import sidebarbot
+import timeit
+
+ROUNDS = 2000
+NOW = datetime(2020, 12, 28, 3, 0, 0, 0, sidebarbot.UTC)
+BOXSCORES = ['0022000036', '0022000046', '0022000066']
+
+
+class RecordingTemplateCache(TemplateCache):
+  """Remembers the values each template was last rendered with."""
+
+  def __init__(self):
+    super().__init__()
+    self.values = {}
+
+  def render(self, subreddit_name, name, values):
+    self.values[name] = values
+    return super().render(subreddit_name, name, values)
+
+
+def per_run_us(fn):
+  return min(timeit.repeat(fn, number=ROUNDS, repeat=5)) / ROUNDS * 1e6
+
+
+def template_text(path):
+  with open(path, encoding='utf-8') as f:
+    text = f.read()
+  return text[:-1] if text.endswith('\n') else text
+
+
+if __name__ == '__main__':
+  logging.basicConfig(level=logging.ERROR)
+  logger = logging.getLogger(__name__)
+  nba_service = FakeNbaService(logger)
+  teams = nba_service.teams('2020')
+  print(f'rounds: {ROUNDS}')
+  print(f'{"boxscore":>10} | {"template":>27} | {"compile":>8} | '
+        f'{"get":>7} | {"render":>7} | {"format_map":>10}')
+  for game_id in BOXSCORES:
+    boxscore = nba_service.boxscore('2020', game_id)
+    templates = RecordingTemplateCache()
+    bot = GameThreadBot(
+        logger, nba_service, NOW, MagicMock(), 'NYKnicks', templates=templates)
+    bot._build_game_thread_text(boxscore, teams)
+    bot._build_postgame_thread_text(boxscore, teams)
+    for name, values in sorted(templates.values.items()):
+      path = templates.path('NYKnicks', name)
+      text = template_text(path)
+      render = templates.get('NYKnicks', name)
+      assert render(values) == text.format_map(values)
+      compile_us = per_run_us(lambda: compile_template(text, path))
+      get_us = per_run_us(lambda: templates.get('NYKnicks', name))
+      render_us = per_run_us(lambda: render(values))
+      format_us = per_run_us(lambda: text.format_map(values))
+      print(f'{game_id:>10} | {name:>27} | {compile_us:5.1f} us | '
+            f'{get_us:4.1f} us | {render_us:4.1f} us | {format_us:7.1f} us')
@@ -0,0 +1,68 @@
+"""
+Remembers what the bots last posted so unchanged content never reaches Reddit.
+
+Both bots render their text from scratch every minute and most of the time it
+comes out the same as the minute before. Comparing with Reddit meant fetching
+the thread or the whole sidebar first. Instead a SHA-256 of what was last
+posted (or found on Reddit) is kept per subreddit and section or thread, and a
+run whose render has the same hash skips Reddit entirely. Every
+verify_interval the comparison is done against Reddit again anyway, so edits
+made by moderators by hand are still caught.
+"""
+
+from datetime import timedelta
+
+import hashlib
+
+DEFAULT_VERIFY_INTERVAL = timedelta(hours=1)
+
+# Hashes that weren't verified for this long (e.g. of old game threads) are
+# dropped.
+MAX_AGE = timedelta(days=3)
+
+
+def content_hash(content):
+  return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class ContentHashes:
+
+  def __init__(self, store, verify_interval=DEFAULT_VERIFY_INTERVAL):
+    """
+    Parameters
+    ----------
+    store: services.state_store.StateStore
+      Where the hashes are kept.
+    verify_interval: datetime.timedelta
+      How long a hash is trusted after the content was last posted or
+      compared with Reddit.
+    """
+    self.store = store
+    self.verify_interval = verify_interval
+    self._hashes = None
+
+  def unchanged(self, key, content, now):
+    """Returns whether content is what was posted for key and that was
+    verified less than verify_interval before datetime now."""
+    entry = self._load().get(key)
+    return entry is not None \
+        and entry['sha256'] == content_hash(content) \
+        and now.timestamp() < entry['verified_at'] \
+            + self.verify_interval.total_seconds()
+
+  def record(self, key, content, now):
+    """Remembers that content is on Reddit for key as of datetime now."""
+    hashes = self._load()
+    hashes[key] = {
+      'sha256': content_hash(content),
+      'verified_at': now.timestamp(),
+    }
+    oldest = (now - MAX_AGE).timestamp()
+    for old_key in [k for k, v in hashes.items() if v['verified_at'] < oldest]:
+      del hashes[old_key]
+    self.store.save({'hashes': hashes})
+
+  def _load(self):
+    if self._hashes is None:
+      self._hashes = self.store.load().get('hashes', {})
+    return self._hashes
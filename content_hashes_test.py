@@ -0,0 +1,53 @@
+from constants import UTC
+from content_hashes import ContentHashes
+from datetime import datetime, timedelta
+from services.state_store import StateStore
+
+import os
+import tempfile
+import unittest
+
+
+class ContentHashesTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.store = StateStore(os.path.join(self.tmp_dir.name, 'hashes.json'))
+    self.hashes = ContentHashes(self.store, timedelta(hours=1))
+    self.now = datetime(2020, 12, 29, 12, 0, 0, 0, UTC)
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def test_unchanged_nothingRecorded_false(self):
+    self.assertFalse(self.hashes.unchanged('Roster', 'text', self.now))
+
+  def test_unchanged_sameContent_true(self):
+    self.hashes.record('Roster', 'text', self.now)
+
+    later = self.now + timedelta(minutes=59)
+    self.assertTrue(self.hashes.unchanged('Roster', 'text', later))
+    self.assertFalse(self.hashes.unchanged('Roster', 'other text', later))
+    self.assertFalse(self.hashes.unchanged('Schedule', 'text', later))
+
+  def test_unchanged_verifyIntervalPassed_false(self):
+    self.hashes.record('Roster', 'text', self.now)
+
+    later = self.now + timedelta(hours=1)
+    self.assertFalse(self.hashes.unchanged('Roster', 'text', later))
+
+  def test_record_persisted(self):
+    self.hashes.record('Roster', 'text', self.now)
+
+    hashes = ContentHashes(self.store)
+    self.assertTrue(hashes.unchanged('Roster', 'text', self.now))
+
+  def test_record_dropsOldEntries(self):
+    self.hashes.record('old thread', 'text', self.now)
+    self.hashes.record('Roster', 'text', self.now + timedelta(days=4))
+
+    self.assertEqual(list(self.store.load()['hashes']), ['Roster'])
+
+
+if __name__ == '__main__':
+  unittest.main()
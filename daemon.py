@@ -0,0 +1,64 @@
+"""
+Runs a bot in a loop instead of once per cron invocation.
+
+Each cycle does the bot's work and returns a WakePlan saying when the next
+cycle is needed, so the process sleeps through the hours where nothing can
+change and only polls often while a game is on. The bot's NbaService, its
+caches and the Reddit client are created once and reused by every cycle.
+"""
+
+from constants import EASTERN_TIMEZONE, UTC
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+import time
+import traceback
+
+# How long to wait before trying again after a cycle failed.
+ERROR_RETRY_INTERVAL = timedelta(minutes=1)
+
+
+class WakePlan(NamedTuple):
+  wake_at: datetime
+  reason: str
+
+
+def run_forever(
+    logger,
+    run_once,
+    now=lambda: datetime.now(UTC),
+    sleep=time.sleep,
+    max_cycles=None):
+  """Calls run_once over and over, sleeping until the time it asks for.
+
+  Parameters
+  ----------
+  logger: logging.Logger
+  run_once: function
+    Does one cycle of work for the datetime it is called with and returns the
+    WakePlan for the next cycle.
+  now: function
+    Returns the current datetime.
+  sleep: function
+    Waits the given number of seconds.
+  max_cycles: int
+    Stops after this many cycles. None runs forever.
+  """
+  cycles = 0
+  while max_cycles is None or cycles < max_cycles:
+    started = time.monotonic()
+    cycle_now = now()
+    try:
+      plan = run_once(cycle_now)
+    except Exception:
+      logger.error(traceback.format_exc())
+      plan = WakePlan(cycle_now + ERROR_RETRY_INTERVAL, 'retry after error')
+    latency_ms = (time.monotonic() - started) * 1000
+    delay = max(0.0, (plan.wake_at - now()).total_seconds())
+    wake_at = plan.wake_at.astimezone(EASTERN_TIMEZONE).strftime(
+        '%b %d %I:%M:%S %p %Z')
+    logger.info(
+        f'Cycle took {latency_ms:.0f} ms. Next wake-up at {wake_at} '
+        f'({plan.reason}), in {delay:.0f} s.')
+    cycles += 1
+    sleep(delay)
@@ -0,0 +1,56 @@
+from constants import UTC
+from daemon import WakePlan, run_forever
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import unittest
+
+
+class DaemonTest(unittest.TestCase):
+
+  def setUp(self):
+    self.now = datetime(2020, 12, 29, 12, 0, 0, 0, UTC)
+    self.sleeps = []
+    self.logger = MagicMock()
+
+  def sleep(self, seconds):
+    self.sleeps.append(seconds)
+    self.now += timedelta(seconds=seconds)
+
+  def test_run_forever_sleepsUntilWakeTime(self):
+    cycles = []
+
+    def run_once(now):
+      cycles.append(now)
+      return WakePlan(now + timedelta(minutes=len(cycles)), 'test')
+
+    run_forever(
+        self.logger, run_once, lambda: self.now, self.sleep, max_cycles=3)
+
+    self.assertEqual(self.sleeps, [60, 120, 180])
+    self.assertEqual(cycles[1], cycles[0] + timedelta(minutes=1))
+    self.assertEqual(self.logger.info.call_count, 3)
+
+  def test_run_forever_wakeTimePassed_doesNotSleep(self):
+    run_forever(
+        self.logger,
+        lambda now: WakePlan(now - timedelta(minutes=1), 'late'),
+        lambda: self.now,
+        self.sleep,
+        max_cycles=1)
+
+    self.assertEqual(self.sleeps, [0])
+
+  def test_run_forever_cycleFails_logsAndRetries(self):
+    def run_once(now):
+      raise ValueError('boom')
+
+    run_forever(
+        self.logger, run_once, lambda: self.now, self.sleep, max_cycles=2)
+
+    self.assertEqual(self.logger.error.call_count, 2)
+    self.assertEqual(self.sleeps, [60, 60])
+
+
+if __name__ == '__main__':
+  unittest.main()
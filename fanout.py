@@ -0,0 +1,335 @@
+"""
+Runs the sidebar and game thread jobs of many team subreddits in one process.
+
+Running a redditbot.py per subreddit would fetch teams.json, players.json and
+standings_conference.json once per team every cycle, and the box score of every
+game once for each of its two teams. Here all subreddits share one NbaService:
+the league-wide data is loaded once at the start of a cycle and the subreddits'
+jobs then run on a bounded thread pool, where they get it from memory, and
+concurrent requests for the same box score are coalesced into one. The game
+thread bots find their games on the day's league-wide scoreboard through one
+ScoreboardPlanner instead of each fetching its team's season schedule. The
+Reddit clients of all subreddits share one RateLimiter so together they stay
+within Reddit's request budget.
+"""
+
+from constants import UTC
+from daemon import WakePlan, run_forever
+from datetime import datetime, timedelta
+from game_thread_bot import GameThreadBot, thread_hashes, thread_store
+from render_cache import RenderCache
+from team_config import TEAMS, load_team
+from typing import NamedTuple
+
+import logging
+import sidebarbot
+import sys
+import time
+import traceback
+
+# How many subreddits are worked on at the same time.
+DEFAULT_WORKERS = 8
+
+# NbaService stats that count a response that was not fetched again because
+# this process or another bot already had it.
+DEDUP_STATS = ('memo.hit', 'singleflight.follower', 'shared.hit')
+
+
+class CycleReport(NamedTuple):
+  # (subreddit, daemon.WakePlan) for each subreddit, in the order they were
+  # given. The plan is None if the subreddit's jobs failed.
+  plans: tuple
+  elapsed_ms: float
+  # Requests sent to data.nba.net during the cycle.
+  requests: int
+  # Responses that were reused instead of fetched again (see DEDUP_STATS).
+  deduplicated: int
+
+  @property
+  def failed(self):
+    return sum(1 for _, plan in self.plans if plan is None)
+
+  @property
+  def subreddits_per_second(self):
+    return len(self.plans) / max(self.elapsed_ms / 1000, 1e-9)
+
+
+def load_league_data(nba_service, now, planner=None):
+  """Fetches the data that every subreddit's jobs read, so the jobs started
+  after this get it from nba_service's memory instead of all fetching it at
+  once. With a planner, also plans the games of all its teams."""
+  year = nba_service.season_year(now)
+  nba_service.teams(year, now)
+  nba_service.players(year, now)
+  nba_service.conference_standings()
+  if planner is not None:
+    planner.plans(now)
+
+
+def subreddit_job(
+    logger,
+    team,
+    selected,
+    tank_standings,
+    nba_service,
+    rate_limiter=None,
+    planner=None,
+    reuse_renders=False,
+    before_request=None):
+  """Returns a function that runs the selected bots for team's subreddit at the
+  datetime it is called with and returns the earliest daemon.WakePlan.
+
+  A bot that fails is logged and doesn't keep the other one from running, so
+  e.g. a Reddit error on the sidebar doesn't hold up the game thread. The
+  function only raises, with the last error, if every bot failed.
+
+  Parameters
+  ----------
+  logger: logging.Logger
+  team: team_config.TeamConfig
+  selected: list
+    Which bots to run: 'sidebar' and/or 'game_thread'.
+  tank_standings: bool
+    Passed on to the sidebar bot.
+  nba_service: NbaService
+    Shared with the other subreddits' jobs.
+  rate_limiter: rate_limiter.RateLimiter
+    Shared by the Reddit clients of all subreddits, if given.
+  planner: services.game_planner.ScoreboardPlanner
+    Shared by the game thread bots, if given.
+  reuse_renders: bool
+    Whether the game thread bot keeps the sections it rendered for its next
+    run, for jobs that are run many times by one process.
+  before_request: function
+    Called before every Reddit request of the job, e.g. to stop a job that
+    another worker took over (see worker.Heartbeat.check).
+  """
+  from reddit_auth import new_reddit
+
+  reddit = new_reddit(
+      team.username,
+      logger,
+      rate_limiter=rate_limiter,
+      before_request=before_request)
+  hashes = sidebarbot.sidebar_hashes(team.subreddit)
+  bot = GameThreadBot(
+      logger,
+      nba_service,
+      None,
+      reddit,
+      team.subreddit,
+      team,
+      thread_store(team.subreddit),
+      thread_hashes(team.subreddit),
+      planner=planner,
+      render_cache=RenderCache() if reuse_renders else None)
+
+  def sidebar(now):
+    return sidebarbot.execute(
+        logger,
+        now,
+        team.subreddit,
+        tank_standings,
+        team,
+        nba_service,
+        reddit,
+        hashes)
+
+  def game_thread(now):
+    bot.now = now
+    return bot.run()
+
+  bots = [
+    (name, run)
+    for name, run in (('sidebar', sidebar), ('game_thread', game_thread))
+    if name in selected]
+
+  def job(now):
+    plans = []
+    error = None
+    for name, run in bots:
+      try:
+        plans.append(run(now))
+      except Exception as e:
+        logger.error(
+            f'The {name} bot of {team.subreddit} failed: '
+            f'{traceback.format_exc()}')
+        error = e
+    if not plans:
+      raise error
+    return min(plans, key=lambda plan: plan.wake_at)
+
+  return job
+
+
+def run_cycle(logger, now, nba_service, jobs, executor, planner=None):
+  """Loads the league-wide data and then runs every subreddit's job on
+  executor. A failing job is logged and doesn't affect the others.
+
+  Parameters
+  ----------
+  logger: logging.Logger
+  now: datetime
+  nba_service: NbaService
+    The service all jobs share.
+  jobs: list
+    (subreddit, function) pairs. Each function is called with now and returns
+    a daemon.WakePlan.
+  executor: concurrent.futures.Executor
+    Runs the jobs; its number of workers bounds how many run at once.
+  planner: services.game_planner.ScoreboardPlanner
+    The planner the game thread jobs share, if any.
+
+  Returns
+  -------
+  CycleReport
+  """
+  stats = nba_service.stats
+  requests_before = stats['http.requests']
+  dedup_before = sum(stats[key] for key in DEDUP_STATS)
+  started = time.monotonic()
+
+  try:
+    load_league_data(nba_service, now, planner)
+  except Exception:
+    # The jobs will try again and fail on their own if the data is missing.
+    logger.error(traceback.format_exc())
+
+  futures = [(name, executor.submit(job, now)) for name, job in jobs]
+  plans = []
+  for name, future in futures:
+    try:
+      plans.append((name, future.result()))
+    except Exception:
+      logger.error(f'Jobs for r/{name} failed: {traceback.format_exc()}')
+      plans.append((name, None))
+
+  return CycleReport(
+      tuple(plans),
+      (time.monotonic() - started) * 1000,
+      stats['http.requests'] - requests_before,
+      sum(stats[key] for key in DEDUP_STATS) - dedup_before)
+
+
+def log_report(logger, report, rate_limiter=None):
+  """Logs the throughput of a cycle and what sharing one process saved."""
+  logger.info(
+      f'Updated {len(report.plans)} subreddits ({report.failed} failed) in '
+      f'{report.elapsed_ms:.0f} ms, {report.subreddits_per_second:.1f} '
+      f'subreddits per second. {report.requests} NBA Data requests, '
+      f'{report.deduplicated} fetches deduplicated.')
+  if rate_limiter is not None:
+    stats = rate_limiter.stats
+    logger.info(
+        f'Reddit requests: {stats["ratelimit.acquired"]}, '
+        f'{stats["ratelimit.waited"]} waited for the rate limit '
+        f'({stats["ratelimit.wait_ms"] / 1000:.1f} s in total).')
+
+
+def next_wake(now, report):
+  """Returns the earliest WakePlan of the cycle's subreddits, or a retry soon
+  if none of them succeeded."""
+  plans = [plan for _, plan in report.plans if plan is not None]
+  if not plans:
+    return WakePlan(now + timedelta(minutes=1), 'retry after errors')
+  return min(plans, key=lambda plan: plan.wake_at)
+
+
+if __name__ == '__main__':
+  from concurrent.futures import ThreadPoolExecutor
+  from optparse import OptionParser
+
+  import logging.config
+
+  parser = OptionParser(usage='%prog [options] subreddit...')
+  parser.add_option(
+      "-a",
+      "--all",
+      action="store_true",
+      dest="all",
+      default=False,
+      help="Run for the subreddits of all 30 teams.")
+  parser.add_option(
+      "-s",
+      "--sidebar",
+      action="store_true",
+      dest="sidebar",
+      default=False,
+      help="Update the sidebars.")
+  parser.add_option(
+      "-g",
+      "--game_thread",
+      action="store_true",
+      dest="game_thread",
+      default=False,
+      help="Create or update the game threads.")
+  parser.add_option(
+      "-t",
+      "--tank_standings",
+      dest="tank",
+      help="Print the race to be worst instead of best, if enabled.",
+      metavar='yes|no')
+  parser.add_option(
+      "-w",
+      "--workers",
+      dest="workers",
+      type="int",
+      default=DEFAULT_WORKERS,
+      help="How many subreddits to work on at the same time.")
+  parser.add_option(
+      "-d",
+      "--daemon",
+      action="store_true",
+      dest="daemon",
+      default=False,
+      help="Keep running and wake up whenever a subreddit may have work to do.")
+  (options, args) = parser.parse_args()
+
+  logging.config.fileConfig('logging.conf')
+  logger = logging.getLogger('fanout')
+
+  subreddit_names = [team.subreddit for team in TEAMS.values()] \
+      if options.all else args
+  if not subreddit_names:
+    raise SystemExit(f'Usage: {sys.argv[0]} [options] subreddit...')
+  try:
+    teams = [load_team(name) for name in subreddit_names]
+  except ValueError as e:
+    logger.error(e)
+    raise SystemExit(str(e))
+  selected = [
+    name for name in ('sidebar', 'game_thread') if getattr(options, name)] \
+      or ['sidebar', 'game_thread']
+  yes = set(['yes', 'y', 'true'])
+  tank_standings = bool(options.tank and options.tank.lower() in yes)
+  logger.info(
+      f'Running {", ".join(selected)} for {len(teams)} subreddits on '
+      f'{options.workers} workers.')
+
+  from rate_limiter import RateLimiter
+  from services.game_planner import ScoreboardPlanner
+  from services.nba_service import NbaService
+
+  nba_service = NbaService(logger)
+  rate_limiter = RateLimiter()
+  planner = ScoreboardPlanner(nba_service, [team.tri_code for team in teams]) \
+      if 'game_thread' in selected else None
+
+  jobs = [
+    (team.subreddit, subreddit_job(
+        logger, team, selected, tank_standings, nba_service, rate_limiter,
+        planner, options.daemon))
+    for team in teams]
+
+  def run_once(now):
+    nba_service.start_run()
+    report = run_cycle(logger, now, nba_service, jobs, executor, planner)
+    log_report(logger, report, rate_limiter)
+    nba_service.log_stats()
+    return next_wake(now, report)
+
+  with nba_service, ThreadPoolExecutor(options.workers) as executor:
+    if options.daemon:
+      run_forever(logger, run_once)
+    else:
+      run_once(datetime.now(UTC))
@@ -0,0 +1,131 @@
+from concurrent.futures import ThreadPoolExecutor
+from constants import UTC
+from datetime import datetime, timedelta
+from daemon import WakePlan
+from fanout import next_wake, run_cycle, subreddit_job
+from game_thread_bot import GameThreadBot
+from services.fake_nba_service import FakeNbaService
+from services.game_planner import ScoreboardPlanner
+from team_config import TEAMS
+from unittest.mock import MagicMock, patch
+
+import logging
+import unittest
+
+
+class FanoutTest(unittest.TestCase):
+
+  def setUp(self):
+    logging.basicConfig(level=logging.ERROR)
+    self.logger = logging.getLogger(__name__)
+    self.nba_service = FakeNbaService()
+    # 1 hour before NYK @ CLE, so both teams' game thread bots have work to do.
+    self.now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    self.executor = ThreadPoolExecutor(4)
+    self.addCleanup(self.executor.shutdown)
+
+  def game_thread_job(self, team, planner=None):
+    reddit = MagicMock()
+    reddit.subreddit.return_value.new.return_value = []
+    bot = GameThreadBot(
+        self.logger,
+        self.nba_service,
+        None,
+        reddit,
+        team.subreddit,
+        team,
+        planner=planner)
+
+    def job(now):
+      bot.now = now
+      return bot.run()
+
+    return team.subreddit, job
+
+  def test_run_cycle_sharesLeagueDataAndBoxscores(self):
+    jobs = [
+      self.game_thread_job(TEAMS['NYK']), self.game_thread_job(TEAMS['CLE'])]
+
+    report = run_cycle(
+        self.logger, self.now, self.nba_service, jobs, self.executor)
+
+    self.assertEqual(
+        [name for name, _ in report.plans], ['NYKnicks', 'clevelandcavs'])
+    self.assertEqual(report.failed, 0)
+    fetched = [url.split('/')[-1] for url in self.nba_service.fetched_urls]
+    for file_name in ('teams.json', 'players.json', '0022000046_boxscore.json'):
+      self.assertEqual(fetched.count(file_name), 1, file_name)
+    # Each team's schedule is its own request.
+    self.assertEqual(fetched.count('schedule.json'), 2)
+    self.assertGreaterEqual(report.deduplicated, 3)
+    self.assertGreater(report.subreddits_per_second, 0)
+
+  def test_run_cycle_withPlanner_fetchesScoreboardInsteadOfSchedules(self):
+    teams = [TEAMS['NYK'], TEAMS['CLE']]
+    planner = ScoreboardPlanner(
+        self.nba_service, [team.tri_code for team in teams])
+    jobs = [self.game_thread_job(team, planner) for team in teams]
+
+    report = run_cycle(
+        self.logger, self.now, self.nba_service, jobs, self.executor, planner)
+
+    self.assertEqual(report.failed, 0)
+    fetched = [url.split('/')[-1] for url in self.nba_service.fetched_urls]
+    self.assertEqual(fetched.count('scoreboard.json'), 1)
+    self.assertEqual(fetched.count('schedule.json'), 0)
+
+  def test_run_cycle_failingJob_runsTheRest(self):
+    def failing_job(now):
+      raise ValueError('boom')
+
+    report = run_cycle(
+        self.logger,
+        self.now,
+        self.nba_service,
+        [('broken', failing_job), self.game_thread_job(TEAMS['NYK'])],
+        self.executor)
+
+    self.assertEqual(report.failed, 1)
+    self.assertIsNone(report.plans[0][1])
+    self.assertIsNotNone(report.plans[1][1])
+
+  def subreddit_job(self, selected):
+    reddit = MagicMock()
+    reddit.subreddit.return_value.new.return_value = []
+    # No state files, and no Reddit login.
+    for target, value in [
+        ('reddit_auth.new_reddit', MagicMock(return_value=reddit)),
+        ('fanout.thread_store', lambda subreddit: None),
+        ('fanout.thread_hashes', lambda subreddit: None),
+        ('sidebarbot.sidebar_hashes', lambda subreddit: None)]:
+      patcher = patch(target, value)
+      patcher.start()
+      self.addCleanup(patcher.stop)
+    return subreddit_job(
+        self.logger, TEAMS['NYK'], selected, False, self.nba_service)
+
+  def test_subreddit_job_sidebarFails_gameThreadStillRuns(self):
+    job = self.subreddit_job(['sidebar', 'game_thread'])
+
+    with patch('sidebarbot.execute', side_effect=ValueError('no standings')):
+      plan = job(self.now)
+
+    self.assertEqual(plan.reason, 'game in progress')
+
+  def test_subreddit_job_everyBotFails_raises(self):
+    job = self.subreddit_job(['sidebar'])
+
+    with patch('sidebarbot.execute', side_effect=ValueError('no standings')):
+      with self.assertRaises(ValueError):
+        job(self.now)
+
+  def test_next_wake_earliestPlan(self):
+    soon = WakePlan(self.now + timedelta(seconds=10), 'game in progress')
+    later = WakePlan(self.now + timedelta(hours=1), 'no game soon')
+    report = MagicMock(plans=(('a', later), ('b', None), ('c', soon)))
+
+    self.assertEqual(next_wake(self.now, report), soon)
+
+
+if __name__ == '__main__':
+  unittest.main()
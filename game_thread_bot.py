@@ -1,23 +1,34 @@
 """
-A command line tool that manages game threads on the New York Knicks subreddit.
+A command line tool that manages game threads on an NBA team's subreddit.
 
 The tool is meant to be run as a cron job, but it also contains a reusable class
 that can be used in other contexts (i.e., an AppEngine/GCE web server). The tool
 will run once and then terminate. In many cases it will have nothing to do. To
-run this on a continuous basis, try using crontab (see the README.md).
+run this on a continuous basis, try using crontab (see the README.md) or the
+--daemon option. Between games a cron run exits before importing praw or the NBA
+service if the previous run said there can't be anything to do yet.
 """
 
 from constants import CENTRAL_TIMEZONE, DEFEAT_SYNONYMS, EASTERN_TIMEZONE
 from constants import GAME_THREAD_PREFIX, MOUNTAIN_TIMEZONE, PACIFIC_TIMEZONE
 from constants import POST_GAME_PREFIX, TEAM_SUB_MAP, UTC, YAHOO_TEAM_CODES
+from content_hashes import ContentHashes
+from daemon import WakePlan, run_forever
 from datetime import datetime, timedelta
-from enum import Enum
-from optparse import OptionParser
-from services.nba_service import NbaService
-
-import dateutil.parser
-import logging.config
-import praw
+from render_cache import RenderCache
+from run_gate import RunGate
+from services.game_planner import Action, GAME_THREAD_LEAD_TIME
+from services.game_planner import MAX_POST_AGE_HOURS, ScoreboardPlanner
+from services.http_cache import HttpCache
+from services.season_calendar import SeasonCalendar, is_final
+from services.state_store import DEFAULT_STATE_DIR, StateStore
+from tables import LEFT, Column, Table
+from team_config import KNICKS, TeamConfig, load_team
+from thread_templates import TemplateCache
+
+import functools
+import logging
+import os
 import random
 import sys
 import traceback
@@ -28,147 +39,254 @@ class GameThreadBot:
   def __init__(
       self,
       logger: logging.Logger,
-      nba_service: NbaService,
+      nba_service: 'NbaService',
       now: datetime,
-      reddit: praw.Reddit,
-      subreddit_name: str):
+      reddit: 'praw.Reddit',
+      subreddit_name: str,
+      team: TeamConfig = KNICKS,
+      thread_store: StateStore = None,
+      content_hashes: ContentHashes = None,
+      templates: TemplateCache = None,
+      planner: ScoreboardPlanner = None,
+      render_cache: RenderCache = None):
+    """
+    Parameters
+    ----------
+    logger: logging.Logger
+    nba_service: NbaService
+    now: datetime
+      The current time, preferably in UTC.
+    reddit: praw.Reddit
+      The Reddit client to post with. If None, one is created for the team's
+      bot account the first time the bot needs it, so runs with nothing to do
+      never import praw or log in.
+    subreddit_name: str
+      The subreddit to post to, usually team.subreddit.
+    team: team_config.TeamConfig
+      The team whose games get threads.
+    thread_store: services.state_store.StateStore
+      Remembers the IDs of the threads the bot created so later runs can fetch
+      them directly instead of scanning the newest posts. If None, they are only
+      remembered by this object.
+    content_hashes: content_hashes.ContentHashes
+      Remembers the text last posted to each thread so unchanged text doesn't
+      need any Reddit calls. If None, the thread is always fetched.
+    templates: thread_templates.TemplateCache
+      Where the layouts of the threads come from. If None, the files in
+      thread_templates.TEMPLATE_DIR are used.
+    planner: ScoreboardPlanner
+      Finds the team's game on the league-wide scoreboard, e.g. shared by the
+      bots of many teams. If None, the team's schedule is used.
+    render_cache: render_cache.RenderCache
+      Reuses the sections of the thread that didn't change since the last run
+      of this bot, for bots that keep running (e.g. with --daemon). It's only
+      in memory, so a cron run would start with an empty one: if None, every
+      section is rendered.
+    """
     self.logger = logger
     self.nba_service = nba_service
     self.now = now
-    self.reddit = reddit
-    self.subreddit = self.reddit.subreddit(subreddit_name)
+    self._reddit = reddit
+    self.subreddit_name = subreddit_name
+    self.team = team
+    self.thread_store = thread_store
+    self.content_hashes = content_hashes
+    self.render_cache = render_cache
+    self.templates = templates if templates is not None else TemplateCache()
+    self.planner = planner
+    self._thread_ids = None
+    self._subreddit = None
+
+  @property
+  def reddit(self):
+    if self._reddit is None:
+      from reddit_auth import new_reddit
+      self.logger.info('Logging in to reddit.')
+      self._reddit = new_reddit(self.team.username, self.logger)
+    return self._reddit
+
+  @property
+  def subreddit(self):
+    if self._subreddit is None:
+      self._subreddit = self.reddit.subreddit(self.subreddit_name)
+    return self._subreddit
 
   def run(self):
-    season_year = self.nba_service.current_year()
-    schedule = self.nba_service.schedule('knicks', season_year)
-    (action, game) = self._get_current_game(schedule)
+    """Creates or updates the thread for the current game, if any, and returns
+    a daemon.WakePlan for when this should run again.
+
+    With a planner, the game comes from the league-wide scoreboard and the
+    team's schedule is only fetched if the planner has no plan for the team."""
+    import asyncio
+
+    season_year = self.nba_service.season_year(self.now)
+    plan = self.planner.plan(self.now, self.team.tri_code) \
+        if self.planner is not None else None
+    recheck_at = None
+    if plan is None:
+      schedule = self.nba_service.schedule(
+          self.team.slug, season_year, self.now)
+      (action, game) = self._get_current_game(schedule)
+      next_game = self._next_game(schedule)
+    else:
+      action = plan.action
+      game = plan.game if action != Action.DO_NOTHING else None
+      next_game = plan.game if action == Action.DO_NOTHING else None
+      recheck_at = plan.recheck_at
 
     if action == Action.DO_NOTHING:
       self.logger.info('Nothing to do. Goodbye.')
-      return
-
-    boxscore = self._get_boxscore(game)
-    teams = self.nba_service.teams(season_year)
-    title, body = self._build_game_thread_text(boxscore, teams) \
-        if action == Action.DO_GAME_THREAD \
-        else self._build_postgame_thread_text(boxscore, teams)
-    self._create_or_update_game_thread(action, title, body)
-
-  def _get_boxscore(self, game):
-    game_start = game['startDateEastern']
-    game_id = game['gameId']
-    return self.nba_service.boxscore(game_start, game_id)
+    else:
+      (boxscore, teams) = asyncio.run(self._fetch_game_data(game, season_year))
+      title, body = self._build_game_thread_text(boxscore, teams) \
+          if action == Action.DO_GAME_THREAD \
+          else self._build_postgame_thread_text(boxscore, teams)
+      if self.render_cache is not None:
+        for line in self.render_cache.format_stats():
+          self.logger.info(line)
+      self._create_or_update_game_thread(action, game, title, body)
+    return self._plan_next_wake(next_game, action, recheck_at)
+
+  async def _fetch_game_data(self, game, season_year):
+    """Concurrently fetches the box score of game and the team metadata."""
+    import asyncio
+    from services.async_nba_service import AsyncNbaService
+
+    async_nba_service = AsyncNbaService(self.nba_service)
+    return await asyncio.gather(
+        async_nba_service.boxscore(game.start_date_eastern, game.game_id),
+        async_nba_service.teams(season_year, self.now))
 
   def _get_current_game(self, schedule):
-    """Returns the nba_data game object we want to focus on right now (or None)
+    """Returns the services.models.Game we want to focus on right now (or None)
     and an enum describing what we should do with it (create a game thread or
     post game thread or do nothing).
 
-    This implementation searches for a game that looks like it might be on the
-    same day. It relies heavily on NBA's lastStandardGamePlayedIndex field to
-    tell us  where to start looking, rather than scanning the entire schedule.
+    The game is the last one that tips off within the game thread lead time,
+    looked up by time in the schedule's SeasonCalendar rather than next to
+    NBA's lastStandardGamePlayedIndex, so games that were postponed or moved
+    don't throw it off.
     """
-    last_played_idx = schedule['league']['lastStandardGamePlayedIndex']
-    games = schedule['league']['standard']
-
-    # Check the game after lastStandardGamePlayedIndex. If we are an hour before
-    # tip-off or later and there's no score, then we want to make a game thread.
-    if len(games) > last_played_idx + 1:
-      game = games[last_played_idx + 1]
-      gametime = dateutil.parser.parse(game['startTimeUTC'])
-      has_score = bool(game['vTeam']['score']) or bool(game['hTeam']['score'])
-      if gametime - timedelta(hours=1) <= self.now and not has_score:
-        return Action.DO_GAME_THREAD, game
-
-    # If the previous game was finished 6 hours ago or less, then use that to
-    # make a post game thread.
-    game = games[last_played_idx]
-    gametime = dateutil.parser.parse(game['startTimeUTC'])
-    has_score = bool(game['vTeam']['score'] + game['hTeam']['score'])
-    if gametime + timedelta(hours=MAX_POST_AGE_HOURS) >= self.now and has_score:
+    game = SeasonCalendar.of(schedule).current_game(
+        self.now, GAME_THREAD_LEAD_TIME)
+    if game is None:
+      return Action.DO_NOTHING, None
+
+    # An hour before tip-off or later, until the game is over, we want a game
+    # thread.
+    if not is_final(game):
+      return Action.DO_GAME_THREAD, game
+
+    # If the game finished 6 hours ago or less, then use that to make a post
+    # game thread.
+    if game.start_time_utc + timedelta(hours=MAX_POST_AGE_HOURS) >= self.now:
       return Action.DO_POST_GAME_THREAD, game
 
     return Action.DO_NOTHING, None
 
+  def _next_game(self, schedule):
+    """Returns the first game of schedule that tips off after now, or None."""
+    return SeasonCalendar.of(schedule).next_game(self.now)
+
+  def _plan_next_wake(self, next_game, action, recheck_at=None):
+    """Returns when the next run could have something to do: soon while a
+    thread is being kept up to date, otherwise an hour before next_game's
+    tip-off or in an hour, whichever is sooner. Without a next_game, a
+    recheck_at from the planner (the end of a day without a game) is used
+    instead of the hour."""
+    if action == Action.DO_GAME_THREAD:
+      return WakePlan(self.now + LIVE_POLL_INTERVAL, 'game in progress')
+    if action == Action.DO_POST_GAME_THREAD:
+      return WakePlan(self.now + POST_GAME_POLL_INTERVAL, 'post game thread')
+    if next_game is None and recheck_at is not None:
+      return WakePlan(
+          max(recheck_at, self.now + LIVE_POLL_INTERVAL), 'no game today')
+
+    plan = WakePlan(self.now + IDLE_POLL_INTERVAL, 'no game soon')
+    if next_game is not None:
+      game_thread_time = next_game.start_time_utc - GAME_THREAD_LEAD_TIME
+      if game_thread_time < plan.wake_at:
+        # Never sooner than the live polling rate, e.g. while the schedule
+        # hasn't caught up with a game that already ended.
+        plan = WakePlan(
+            max(game_thread_time, self.now + LIVE_POLL_INTERVAL),
+            f'game thread for {next_game.game_url_code}')
+    return plan
+
   def _build_game_thread_text(self, boxscore, teams):
     """Builds the title and selftext for a game thread (not post game). This just
     builds strings and it doesn't actually interact with Reddit.
 
-    This is heavily inspired by https://bit.ly/3hBwfmC.
+    This is heavily inspired by https://bit.ly/3hBwfmC. The text is laid out by
+    the subreddit's game_thread_title.txt and game_thread.md templates.
     """
-    basic_game_data = boxscore['basicGameData']
-    hteam = basic_game_data['hTeam']
-    vteam = basic_game_data['vTeam']
+    game = boxscore.game
 
-    if hteam['triCode'] == 'NYK':
-      us = 'hTeam'
-      them = 'vteam'
+    if game.home.tri_code == self.team.tri_code:
+      us = game.home
+      them = game.road
+      team_broadcaster = boxscore.home_broadcaster
+      other_broadcaster = boxscore.road_broadcaster
       home_away_sign = 'vs'
     else:
-      us = 'vTeam'
-      them = 'hTeam'
+      us = game.road
+      them = game.home
+      team_broadcaster = boxscore.road_broadcaster
+      other_broadcaster = boxscore.home_broadcaster
       home_away_sign = '@'
 
-    broadcasters = basic_game_data['watch']['broadcast']['broadcasters']
-    national_broadcaster = 'N/A' if len(broadcasters['national']) == 0 \
-      else broadcasters['national'][0]['longName']
-    knicks_broadcaster = broadcasters[us][0]['longName']
-    other_broadcaster = broadcasters[them][0]['longName']
-
-    knicks_record = f"({basic_game_data[us]['win']}-{basic_game_data[us]['loss']})"
-    other_record = f"({basic_game_data[them]['win']}-{basic_game_data[them]['loss']})"
-    other_subreddit = TEAM_SUB_MAP[teams[basic_game_data[them]['teamId']]['nickname']]
-    other_team_name = teams[basic_game_data[them]['teamId']]['fullName']
-    other_team_nickname = teams[basic_game_data[them]['teamId']]['nickname']
-    location = self._build_location_string(basic_game_data)
-    arena = basic_game_data['arena']['name']
-    start_time_utc = dateutil.parser.parse(basic_game_data['startTimeUTC'])
+    team = teams[us.team_id]
+    other_team = teams[them.team_id]
 
     def time_str(timezone):
-      return start_time_utc.astimezone(timezone).strftime('%I:%M %p')
-
-    eastern = time_str(EASTERN_TIMEZONE)
-    central = time_str(CENTRAL_TIMEZONE)
-    mountain = time_str(MOUNTAIN_TIMEZONE)
-    pacific = time_str(PACIFIC_TIMEZONE)
+      return game.start_time_utc.astimezone(timezone).strftime('%I:%M %p')
 
     urlpart = (
-        f'{vteam["triCode"].lower()}-vs-{hteam["triCode"].lower()}-'
-        f'{basic_game_data["gameId"]}')
-    nba_pass_link = f'https://www.nba.com/game/{urlpart}?watch'
-    preview_link = f'https://www.nba.com/game/{urlpart}'
-    play_link = f'https://www.nba.com/game/{urlpart}/play-by-play'
-    box_link = f'https://www.nba.com/game/{urlpart}/box-score#box-score'
-
-    body = '##### General Information\n\n'
-    body += '**TIME**|**BROADCAST**|**Media**|**Location and Subreddit**|\n'
-    body += ':------------|:------------------------------------|:------------------------------------|:-------------------|\n'
-    body += f'{eastern} Eastern   | National Broadcast: {national_broadcaster}           |[Game Preview]({preview_link})| {location}|\n'
-    body += f'{central} Central   | Knicks Broadcast: {knicks_broadcaster}               |[Play By Play]({play_link})| {arena}|\n'
-    body += f'{mountain} Mountain | {other_team_nickname} Broadcast: {other_broadcaster} |[Box Score]({box_link})| r/NYKnicks|\n'
-    body += f'{pacific} Pacific   | [NBA League Pass]({nba_pass_link})                   || r/{other_subreddit}|\n'
+        f'{game.road.tri_code.lower()}-vs-{game.home.tri_code.lower()}-'
+        f'{game.game_id}')
 
     linescore = self._build_linescore(boxscore, teams)
-    if linescore is not None:
-      body += '\n##### Score\n\n'
-      body += f'{linescore}\n'
-
-    body += '\n-----\n\n'
-    body += '[Reddit Stream](https://reddit-stream.com/comments/auto) '
-    body += '(You must click this link from the comment page.)\n'
-
-    title = (f'{GAME_THREAD_PREFIX} The New York Knicks {knicks_record} ' +
-             f'{home_away_sign} The {other_team_name} {other_record} - ' +
-             f'({self.now.astimezone(EASTERN_TIMEZONE).strftime("%B %d, %Y")})')
-
+    values = {
+      'prefix': GAME_THREAD_PREFIX,
+      'team_name': team.full_name,
+      'team_nickname': team.nickname,
+      'team_record': f'({us.win}-{us.loss})',
+      'team_subreddit': TEAM_SUB_MAP[team.nickname],
+      'team_broadcaster': team_broadcaster,
+      'home_away_sign': home_away_sign,
+      'opponent_name': other_team.full_name,
+      'opponent_nickname': other_team.nickname,
+      'opponent_record': f'({them.win}-{them.loss})',
+      'opponent_subreddit': TEAM_SUB_MAP[other_team.nickname],
+      'opponent_broadcaster': other_broadcaster,
+      'national_broadcaster': boxscore.national_broadcaster or 'N/A',
+      'date': self.now.astimezone(EASTERN_TIMEZONE).strftime('%B %d, %Y'),
+      'eastern': time_str(EASTERN_TIMEZONE),
+      'central': time_str(CENTRAL_TIMEZONE),
+      'mountain': time_str(MOUNTAIN_TIMEZONE),
+      'pacific': time_str(PACIFIC_TIMEZONE),
+      'location': self._build_location_string(boxscore),
+      'arena': boxscore.arena_name,
+      'nba_pass_link': f'https://www.nba.com/game/{urlpart}?watch',
+      'preview_link': f'https://www.nba.com/game/{urlpart}',
+      'play_link': f'https://www.nba.com/game/{urlpart}/play-by-play',
+      'box_link': f'https://www.nba.com/game/{urlpart}/box-score#box-score',
+      'score': (
+          '' if linescore is None else f'\n##### Score\n\n{linescore}\n'),
+    }
+    title = self.templates.render(
+        self.subreddit_name, 'game_thread_title.txt', values)
+    body = self.templates.render(self.subreddit_name, 'game_thread.md', values)
     return title, body
 
+  @classmethod
+  def _build_location_string(cls, boxscore):
+    return cls._format_location(
+        boxscore.arena_city, boxscore.arena_state, boxscore.arena_country)
+
   @staticmethod
-  def _build_location_string(basic_game_data):
-    city = basic_game_data["arena"]["city"]
-    state = basic_game_data["arena"]["stateAbbr"]
+  def _format_location(city, state, country):
     location = f'{city}, {state}'
-    country = basic_game_data["arena"]["country"]
     return location if country == 'USA' else f'{location} {country}'
 
   def _build_postgame_thread_text(self, boxscore, teams):
@@ -181,50 +299,52 @@ class GameThreadBot:
 
     Ported from https://bit.ly/3rOmvdd.
     """
-    basic_game_data = boxscore['basicGameData']
-    home_team = basic_game_data["hTeam"]
-    road_team = basic_game_data["vTeam"]
-    defeat = self._build_defeat_synonym(basic_game_data, teams)
-
-    home_team_score = int(home_team["score"])
-    road_team_score = int(road_team["score"])
-    score = (f'{max(road_team_score, home_team_score)}-'
-             f'{min(road_team_score, home_team_score)}')
-
-    home_team_name = teams[home_team["teamId"]]['fullName']
-    home_team_record = f'{home_team["win"]}-{home_team["loss"]}'
-    road_team_name = teams[road_team["teamId"]]['fullName']
-    road_team_record = f'{road_team["win"]}-{road_team["loss"]}'
-    if home_team_score > road_team_score:
+    home_team = boxscore.game.home
+    road_team = boxscore.game.road
+    defeat = self._build_defeat_synonym(boxscore.game)
+
+    score = (f'{max(road_team.score, home_team.score)}-'
+             f'{min(road_team.score, home_team.score)}')
+
+    home_team_name = teams[home_team.team_id].full_name
+    home_team_record = f'{home_team.win}-{home_team.loss}'
+    road_team_name = teams[road_team.team_id].full_name
+    road_team_record = f'{road_team.win}-{road_team.loss}'
+    if home_team.score > road_team.score:
       winners = f'{home_team_name} ({home_team_record})'
       losers = f'{road_team_name} ({road_team_record})'
     else:
       losers = f'{home_team_name} ({home_team_record})'
       winners = f'{road_team_name} ({road_team_record})'
 
-    quarters = len(basic_game_data['vTeam']['linescore'])
+    quarters = len(road_team.linescore)
     maybe_overtime = ''
     if quarters == 5:
       maybe_overtime = ' in OT'
     elif quarters > 5:
       maybe_overtime = f' in {quarters - 4}OTs'
 
-    title = f'The {winners} {defeat} the {losers}{maybe_overtime}, {score}'
-    return f'{POST_GAME_PREFIX} {title}'
-
-  @staticmethod
-  def _build_defeat_synonym(basic_game_data, teams):
+    return self.templates.render(
+        self.subreddit_name, 'post_game_thread_title.txt', {
+          'prefix': POST_GAME_PREFIX,
+          'winners': winners,
+          'defeat': defeat,
+          'losers': losers,
+          'overtime': maybe_overtime,
+          'score': score,
+        })
+
+  def _build_defeat_synonym(self, game):
     """Says 'defeated' in creative and random ways.
 
     Ported from https://bit.ly/3o6QvPB."""
 
-    home_team_name = teams[basic_game_data['hTeam']['teamId']]['fullName']
-    if home_team_name == "knicks":
-      us_score = int(basic_game_data["hTeam"]["score"])
-      them_score = int(basic_game_data["vTeam"]["score"])
+    if game.home.tri_code == self.team.tri_code:
+      us_score = game.home.score
+      them_score = game.road.score
     else:
-      us_score = int(basic_game_data["vTeam"]["score"])
-      them_score = int(basic_game_data["hTeam"]["score"])
+      us_score = game.road.score
+      them_score = game.home.score
 
     if us_score > them_score:
       if them_score - us_score < 3:
@@ -240,304 +360,210 @@ class GameThreadBot:
 
     return random.choice(DEFEAT_SYNONYMS[:2])
 
+  def _render(self, section, build, inputs):
+    """Returns build(*inputs), through self.render_cache if there is one."""
+    if self.render_cache is None:
+      return build(*inputs)
+    return self.render_cache.render(section, build, inputs)
+
   def _build_boxscore_text(self, boxscore, teams):
     """Builds up the post game selftext.
 
-     Ported over from the Spurs bot (https://bit.ly/3n8HYdA).
-    """
+     Ported over from the Spurs bot (https://bit.ly/3n8HYdA). The sections are
+     laid out by the subreddit's post_game_thread.md template.
 
-    basicGameData = boxscore["basicGameData"]
-
-    # Header
-    hTeamBasicData = basicGameData["hTeam"]
-    hTeamFullName = teams[hTeamBasicData['teamId']]['fullName']
-    hTeamLogo = TEAM_SUB_MAP[teams[basicGameData['hTeam']['teamId']]['nickname']]
-    hTeamScore = hTeamBasicData["score"]
-    vTeamBasicData = basicGameData["vTeam"]
-    vTeamFullName = teams[vTeamBasicData['teamId']]['fullName']
-    vTeamLogo = TEAM_SUB_MAP[teams[basicGameData['vTeam']['teamId']]['nickname']]
-    vTeamScore = vTeamBasicData["score"]
-    nbaUrl = (f'https://www.nba.com/game/{vTeamBasicData["triCode"]}-vs-'
-              f'{hTeamBasicData["triCode"]}-{basicGameData["gameId"]}')
+    Each section is rendered from only the fields it reads through
+    self._render, so with a render_cache a section is rendered again only when
+    those changed.
+    """
+    game = boxscore.game
+    home = game.home
+    road = game.road
+    home_team = teams[home.team_id]
+    road_team = teams[road.team_id]
+
+    summary = self._render('summary', self._render_summary, (
+        game.game_id,
+        game.start_date_eastern,
+        game.start_time_utc,
+        road.tri_code,
+        road.score,
+        road_team.full_name,
+        road_team.nickname,
+        home.tri_code,
+        home.score,
+        home_team.full_name,
+        home_team.nickname,
+        boxscore.arena_name,
+        boxscore.arena_city,
+        boxscore.arena_state,
+        boxscore.arena_country,
+        boxscore.attendance,
+        boxscore.officials,
+        boxscore.duration_hours,
+        boxscore.duration_minutes))
+
+    team_stats = (
+        road_team.full_name,
+        boxscore.road_stats,
+        home_team.full_name,
+        boxscore.home_stats)
+    return self.templates.render(self.subreddit_name, 'post_game_thread.md', {
+      'summary': summary,
+      'line_score': self._build_linescore(boxscore, teams),
+      'team_stats': self._render(
+          'team_stats', self._render_team_stats, team_stats),
+      'team_leaders': self._render(
+          'team_leaders', self._render_team_leaders, team_stats),
+      'player_stats': self._render(
+          'player_stats', self._render_player_stats, (
+              road.team_id,
+              road.tri_code,
+              road_team.full_name,
+              home.tri_code,
+              home_team.full_name,
+              boxscore.players)),
+    })
+
+  def _render_summary(
+      self,
+      game_id,
+      start_date_eastern,
+      start_time_utc,
+      road_tri_code,
+      road_score,
+      vTeamFullName,
+      road_nickname,
+      home_tri_code,
+      home_score,
+      hTeamFullName,
+      home_nickname,
+      arena_name,
+      arena_city,
+      arena_state,
+      arena_country,
+      attendance,
+      officials,
+      duration_hours,
+      duration_minutes):
+    hTeamLogo = TEAM_SUB_MAP[home_nickname]
+    vTeamLogo = TEAM_SUB_MAP[road_nickname]
+    nbaUrl = (f'https://www.nba.com/game/{road_tri_code}-vs-'
+              f'{home_tri_code}-{game_id}')
     yahooUrl = ('http://sports.yahoo.com/nba/'
                 f'{vTeamFullName.lower().replace(" ", "-")}-'
                 f'{hTeamFullName.lower().replace(" ", "-")}-'
-                f'{basicGameData["startDateEastern"]}'
-                f'{YAHOO_TEAM_CODES[hTeamBasicData["triCode"]]}')
-    arena = basicGameData["arena"]["name"]
-    attendance = basicGameData["attendance"]
-    officials = ', '.join([o["firstNameLastName"]
-        for o in basicGameData["officials"]["formatted"]])
-    start_time_est = (dateutil.parser.parse(basicGameData['startTimeUTC'])
+                f'{start_date_eastern}'
+                f'{YAHOO_TEAM_CODES[home_tri_code]}')
+    officials = ', '.join(officials)
+    start_time_est = (start_time_utc
         .astimezone(EASTERN_TIMEZONE).strftime('%B %d, %Y %-I:%M %p %Z'))
-    duration = (f'{basicGameData["gameDuration"]["hours"]} hours and '
-                f'{basicGameData["gameDuration"]["minutes"]} minutes')
+    duration = f'{duration_hours} hours and {duration_minutes} minutes'
     duration = duration.replace(' and 0 minutes', '')
     duration = duration.replace(' and 1 minutes', ' and 1 minute')
+    location = self._format_location(arena_city, arena_state, arena_country)
+
+    summary = SUMMARY_TABLE.render([
+      ('**Score**',
+       f'[](/r/{vTeamLogo}) **{road_score} -  {home_score}** '
+       f'[](/r/{hTeamLogo})'),
+      ('**Box Score**', f'[NBA]({nbaUrl}), [Yahoo]({yahooUrl})'),
+      ('**Location**', location),
+      ('**Arena**', arena_name),
+      ('**Attendance**',
+       attendance if attendance != '0' else 'No in-person attendance'),
+      ('**Start Time**', start_time_est),
+      ('**Game Duration**', duration),
+      ('**Officials**', officials),
+    ])
+    return f'##### Game Summary\n\n{summary}\n'
 
-    # Game summary
-    body = f"""##### Game Summary
-
-|||
-|:--|:--|
-|**Score**|[](/r/{vTeamLogo}) **{vTeamScore} -  {hTeamScore}** [](/r/{hTeamLogo})|
-|**Box Score**|[NBA]({nbaUrl}), [Yahoo]({yahooUrl})|
-|**Location**|{self._build_location_string(basicGameData)}|
-|**Arena**|{arena}|
-|**Attendance**|{attendance if attendance != '0' else 'No in-person attendance'}|
-|**Start Time**|{start_time_est}|
-|**Game Duration**|{duration}|
-|**Officials**|{officials}|
-"""
+  @staticmethod
+  def _render_team_stats(vTeamFullName, v, hTeamFullName, h):
+    rows = ((vTeamFullName, v), (hTeamFullName, h))
+    text = '\n##### Team Stats\n\n'
+    text += TEAM_STATS_TABLE.render(rows)
+    text += '\n\n'
+    text += TEAM_HUSTLE_TABLE.render(rows)
+    text += '\n  '
+    return text
 
-    # Line score
-    body += '\n##### Line Score\n'
-    body += f'\n{self._build_linescore(boxscore, teams)}\n'
-
-    # Team stats
-    allStats = boxscore["stats"]
-    playerStats = allStats["activePlayers"]
-    body += """
-##### Team Stats
-
-|**Team**|**PTS**|**FG**|**FG%**|**3P**|**3P%**|**FT**|**FT%**|**OREB**|**TREB**|**AST**|**PF**|**STL**|**TO**|**BLK**|
-|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|
-|{vTeamName}|{vpts}|{vfgm}-{vfga}|{vfgp}%|{vtpm}-{vtpa}|{vtpp}%|{vftm}-{vfta}|{vftp}%|{voreb}|{vtreb}|{vast}|{vpf}|{vstl}|{vto}|{vblk}|
-|{hTeamName}|{hpts}|{hfgm}-{hfga}|{hfgp}%|{htpm}-{htpa}|{htpp}%|{hftm}-{hfta}|{hftp}%|{horeb}|{htreb}|{hast}|{hpf}|{hstl}|{hto}|{hblk}|
-
-|**Team**|**Biggest Lead**|**Longest Run**|**PTS: In Paint**|**PTS: Off TOs**|**PTS: Fastbreak**|
-|:--|:--|:--|:--|:--|:--|
-|{vTeamName}|{vlead}|{vrun}|{vpaint}|{vpto}|{vfb}|
-|{hTeamName}|{hlead}|{hrun}|{hpaint}|{hpto}|{hfb}|
-  """.format(
-      vTeamName=vTeamFullName,
-      vpts=allStats["vTeam"]["totals"]["points"],
-      vfgm=allStats["vTeam"]["totals"]["fgm"],
-      vfga=allStats["vTeam"]["totals"]["fga"],
-      vfgp=allStats["vTeam"]["totals"]["fgp"],
-      vtpm=allStats["vTeam"]["totals"]["tpm"],
-      vtpa=allStats["vTeam"]["totals"]["tpa"],
-      vtpp=allStats["vTeam"]["totals"]["tpp"],
-      vftm=allStats["vTeam"]["totals"]["ftm"],
-      vfta=allStats["vTeam"]["totals"]["fta"],
-      vftp=allStats["vTeam"]["totals"]["ftp"],
-      voreb=allStats["vTeam"]["totals"]["offReb"],
-      vtreb=allStats["vTeam"]["totals"]["totReb"],
-      vast=allStats["vTeam"]["totals"]["assists"],
-      vpf=allStats["vTeam"]["totals"]["pFouls"],
-      vstl=allStats["vTeam"]["totals"]["steals"],
-      vto=allStats["vTeam"]["totals"]["turnovers"],
-      vblk=allStats["vTeam"]["totals"]["blocks"],
-      hTeamName=hTeamFullName,
-      hpts=allStats["hTeam"]["totals"]["points"],
-      hfgm=allStats["hTeam"]["totals"]["fgm"],
-      hfga=allStats["hTeam"]["totals"]["fga"],
-      hfgp=allStats["hTeam"]["totals"]["fgp"],
-      htpm=allStats["hTeam"]["totals"]["tpm"],
-      htpa=allStats["hTeam"]["totals"]["tpa"],
-      htpp=allStats["hTeam"]["totals"]["tpp"],
-      hftm=allStats["hTeam"]["totals"]["ftm"],
-      hfta=allStats["hTeam"]["totals"]["fta"],
-      hftp=allStats["hTeam"]["totals"]["ftp"],
-      horeb=allStats["hTeam"]["totals"]["offReb"],
-      htreb=allStats["hTeam"]["totals"]["totReb"],
-      hast=allStats["hTeam"]["totals"]["assists"],
-      hpf=allStats["hTeam"]["totals"]["pFouls"],
-      hstl=allStats["hTeam"]["totals"]["steals"],
-      hto=allStats["hTeam"]["totals"]["turnovers"],
-      hblk=allStats["hTeam"]["totals"]["blocks"],
-      vlead=self._plusminus(allStats["vTeam"]["biggestLead"]),
-      vrun=allStats["vTeam"]["longestRun"],
-      vpaint=allStats["vTeam"]["pointsInPaint"],
-      vpto=allStats["vTeam"]["pointsOffTurnovers"],
-      vfb=allStats["vTeam"]["fastBreakPoints"],
-      hlead=self._plusminus(allStats["hTeam"]["biggestLead"]),
-      hrun=allStats["hTeam"]["longestRun"],
-      hpaint=allStats["hTeam"]["pointsInPaint"],
-      hpto=allStats["hTeam"]["pointsOffTurnovers"],
-      hfb=allStats["hTeam"]["fastBreakPoints"]
-    )
-
-    body += """
-##### Team Leaders
-
-|**Team**|**Points**|**Rebounds**|**Assists**|
-|:--|:--|:--|:--|
-|{vTeam}|**{vpts}** {vply1}|**{vreb}** {vply2}|**{vast}** {vply3}|
-|{hTeam}|**{hpts}** {hply1}|**{hreb}** {hply2}|**{hast}** {hply3}|
-""".format(
-      vTeam=vTeamFullName,
-      vpts=allStats["vTeam"]["leaders"]["points"]["value"],
-      vply1=allStats["vTeam"]["leaders"]["points"]["players"][0]["firstName"] + " " +
-            allStats["vTeam"]["leaders"]["points"]["players"][0]["lastName"],
-      vreb=allStats["vTeam"]["leaders"]["rebounds"]["value"],
-      vply2=allStats["vTeam"]["leaders"]["rebounds"]["players"][0]["firstName"] + " " +
-            allStats["vTeam"]["leaders"]["rebounds"]["players"][0]["lastName"],
-      vast=allStats["vTeam"]["leaders"]["assists"]["value"],
-      vply3=allStats["vTeam"]["leaders"]["assists"]["players"][0]["firstName"] + " " +
-            allStats["vTeam"]["leaders"]["assists"]["players"][0]["lastName"],
-      hTeam=hTeamFullName,
-      hpts=allStats["hTeam"]["leaders"]["points"]["value"],
-      hply1=allStats["hTeam"]["leaders"]["points"]["players"][0]["firstName"] + " " +
-            allStats["hTeam"]["leaders"]["points"]["players"][0]["lastName"],
-      hreb=allStats["hTeam"]["leaders"]["rebounds"]["value"],
-      hply2=allStats["hTeam"]["leaders"]["rebounds"]["players"][0]["firstName"] + " " +
-            allStats["hTeam"]["leaders"]["rebounds"]["players"][0]["lastName"],
-      hast=allStats["hTeam"]["leaders"]["assists"]["value"],
-      hply3=allStats["hTeam"]["leaders"]["assists"]["players"][0]["firstName"] + " " +
-            allStats["hTeam"]["leaders"]["assists"]["players"][0]["lastName"]
-    )
-
-    body += """
-##### Player Stats
-
-**[](/{vTeamLogo}) {vTeamName}**|**MIN**|**FGM-A**|**3PM-A**|**FTM-A**|**ORB**|**DRB**|**REB**|**AST**|**STL**|**BLK**|**TO**|**PF**|**+/-**|**PTS**|
-|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|
-""".format(
-      vTeamLogo=vTeamBasicData["triCode"],
-      vTeamName=vTeamFullName.rsplit(None, 1)[-1].upper()
-    )
-
-    # players stats are filled here, only starters have "pos" property (away team)
-    for i in range(len(playerStats)):
-      stats = playerStats[i]
-      if stats["teamId"] == vTeamBasicData["teamId"] and stats["pos"] != "":
-        body += "|{pname}^{pos}|{min}|{fgm}-{fga}|{tpm}-{tpa}|{ftm}-{fta}|{oreb}|{dreb}|{treb}|{ast}|{stl}|{blk}|{to}|{pf}|{pm}|{pts}|\n".format(
-          pname=stats["firstName"] + " " + stats["lastName"],
-          pos=stats["pos"],
-          min=stats["min"],
-          fgm=stats["fgm"],
-          fga=stats["fga"],
-          tpm=stats["tpm"],
-          tpa=stats["tpa"],
-          ftm=stats["ftm"],
-          fta=stats["fta"],
-          oreb=stats["offReb"],
-          dreb=stats["defReb"],
-          treb=stats["totReb"],
-          ast=stats["assists"],
-          stl=stats["steals"],
-          blk=stats["blocks"],
-          to=stats["turnovers"],
-          pf=stats["pFouls"],
-          pm=self._plusminus(stats["plusMinus"]),
-          pts=stats["points"]
-        )
-      elif stats["teamId"] == vTeamBasicData["teamId"]:
-        body += "|{pname}|{min}|{fgm}-{fga}|{tpm}-{tpa}|{ftm}-{fta}|{oreb}|{dreb}|{treb}|{ast}|{stl}|{blk}|{to}|{pf}|{pm}|{pts}|\n".format(
-          pname=stats["firstName"] + " " + stats["lastName"],
-          min=stats["min"],
-          fgm=stats["fgm"],
-          fga=stats["fga"],
-          tpm=stats["tpm"],
-          tpa=stats["tpa"],
-          ftm=stats["ftm"],
-          fta=stats["fta"],
-          oreb=stats["offReb"],
-          dreb=stats["defReb"],
-          treb=stats["totReb"],
-          ast=stats["assists"],
-          stl=stats["steals"],
-          blk=stats["blocks"],
-          to=stats["turnovers"],
-          pf=stats["pFouls"],
-          pm=self._plusminus(stats["plusMinus"]),
-          pts=stats["points"]
-        )
-    body += """\n**[](/{hTeamLogo}) {hTeamName}**|**MIN**|**FGM-A**|**3PM-A**|**FTM-A**|**ORB**|**DRB**|**REB**|**AST**|**STL**|**BLK**|**TO**|**PF**|**+/-**|**PTS**|
-|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|:--|
-""".format(
-      hTeamLogo=hTeamBasicData["triCode"],
-      hTeamName=hTeamFullName.rsplit(None, 1)[-1].upper()
-    )
-    # home team players
-    for i in range(len(playerStats)):
-      stats = playerStats[i]
-      if stats["teamId"] != vTeamBasicData["teamId"] and stats["pos"] != "":
-        body += "|{pname}^{pos}|{min}|{fgm}-{fga}|{tpm}-{tpa}|{ftm}-{fta}|{oreb}|{dreb}|{treb}|{ast}|{stl}|{blk}|{to}|{pf}|{pm}|{pts}|\n".format(
-          pname=stats["firstName"] + " " + stats["lastName"],
-          pos=stats["pos"],
-          min=stats["min"],
-          fgm=stats["fgm"],
-          fga=stats["fga"],
-          tpm=stats["tpm"],
-          tpa=stats["tpa"],
-          ftm=stats["ftm"],
-          fta=stats["fta"],
-          oreb=stats["offReb"],
-          dreb=stats["defReb"],
-          treb=stats["totReb"],
-          ast=stats["assists"],
-          stl=stats["steals"],
-          blk=stats["blocks"],
-          to=stats["turnovers"],
-          pf=stats["pFouls"],
-          pm=self._plusminus(stats["plusMinus"]),
-          pts=stats["points"]
-        )
-      elif playerStats[i]["teamId"] != vTeamBasicData["teamId"] and playerStats[i]["pos"] == "":
-        body += "|{pname}|{min}|{fgm}-{fga}|{tpm}-{tpa}|{ftm}-{fta}|{oreb}|{dreb}|{treb}|{ast}|{stl}|{blk}|{to}|{pf}|{pm}|{pts}|\n".format(
-          pname=stats["firstName"] + " " + stats["lastName"],
-          min=stats["min"],
-          fgm=stats["fgm"],
-          fga=stats["fga"],
-          tpm=stats["tpm"],
-          tpa=stats["tpa"],
-          ftm=stats["ftm"],
-          fta=stats["fta"],
-          oreb=stats["offReb"],
-          dreb=stats["defReb"],
-          treb=stats["totReb"],
-          ast=stats["assists"],
-          stl=stats["steals"],
-          blk=stats["blocks"],
-          to=stats["turnovers"],
-          pf=stats["pFouls"],
-          pm=self._plusminus(stats["plusMinus"]),
-          pts=stats["points"]
-        )
-    return body
+  @staticmethod
+  def _render_team_leaders(vTeamFullName, v, hTeamFullName, h):
+    rows = ((vTeamFullName, v), (hTeamFullName, h))
+    return f'\n##### Team Leaders\n\n{TEAM_LEADERS_TABLE.render(rows)}\n'
+
+  @staticmethod
+  def _render_player_stats(
+      road_team_id,
+      road_tri_code,
+      vTeamFullName,
+      home_tri_code,
+      hTeamFullName,
+      players):
+    road_players = []
+    home_players = []
+    for player in players:
+      (road_players if player.team_id == road_team_id
+       else home_players).append(player)
+
+    def render(tri_code, team_name, team_players):
+      headers = [column.header for column in PLAYER_STATS_TABLE.columns]
+      nickname = team_name.rsplit(None, 1)[-1].upper()
+      headers[0] = f'**[](/{tri_code}) {nickname}**'
+      return PLAYER_STATS_TABLE.render(team_players, headers)
+
+    # Each table is added to the text as soon as it's rendered, so only one
+    # of them is held apart from it at a time.
+    text = '\n##### Player Stats\n\n'
+    text += render(road_tri_code, vTeamFullName, road_players)
+    text += '\n\n'
+    text += render(home_tri_code, hTeamFullName, home_players)
+    text += '\n'
+    return text
 
   def _build_linescore(self, boxscore, teams):
     """Builds a table of points scored in each quarter, including overtime.
 
     Will return None if there's no data, otherwise it will always print a table
     with at least 4 quarters even if some columns are blank."""
-
-    basic_game_data = boxscore["basicGameData"]
-    current_period = int(basic_game_data['period']['current'])
-
-    home_team = basic_game_data["hTeam"]
-    home_score = home_team["linescore"]
-    home_team_name = teams[home_team['teamId']]['fullName']
-
-    road_team = basic_game_data["vTeam"]
-    road_score = road_team["linescore"]
-    road_team_name = teams[road_team['teamId']]['fullName']
-
+    home_team = boxscore.game.home
+    road_team = boxscore.game.road
+    return self._render('linescore', self._render_linescore, (
+        boxscore.period,
+        home_team.linescore,
+        home_team.score,
+        teams[home_team.team_id].full_name,
+        road_team.linescore,
+        road_team.score,
+        teams[road_team.team_id].full_name))
+
+  def _render_linescore(
+      self,
+      current_period,
+      home_score,
+      home_total,
+      home_team_name,
+      road_score,
+      road_total,
+      road_team_name):
     assert len(home_score) == len(road_score)
     num_periods = len(home_score)
     if num_periods == 0:
       return None
 
-    header1 = """|**Team**|"""
-    header2 = '|:---|'
-    home_team_line = f'|{home_team_name}|'
-    road_team_line = f'|{road_team_name}|'
-    for i in range(0, max(4, num_periods)):
-      period = i + 1
-      header1 += f'**Q{period}**|' if period < 5 else f'**OT{period - 4}**|'
-      header2 += ':--:|'
-      home_team_line += f'{self._points(home_score, current_period, period)}|'
-      road_team_line += f'{self._points(road_score, current_period, period)}|'
+    periods = max(4, num_periods)
+    home_row = [home_team_name]
+    road_row = [road_team_name]
+    for period in range(1, periods + 1):
+      home_row.append(self._points(home_score, current_period, period))
+      road_row.append(self._points(road_score, current_period, period))
 
     # Totals
-    header1 += '**Total**|'
-    header2 += ':--:|'
-    home_team_line += f'{home_team["score"]}|'
-    road_team_line += f'{road_team["score"]}|'
+    home_row.append(home_total)
+    road_row.append(road_total)
 
-    return f'{header1}\n{header2}\n{road_team_line}\n{home_team_line}'
+    return _linescore_table(periods).render((road_row, home_row))
 
   @staticmethod
   def _plusminus(someStat):
@@ -552,66 +578,250 @@ class GameThreadBot:
 
     Parameters
     ----------
-    linescore: object
-      NBA data object for the linescore.
+    linescore: tuple
+      The points scored in each period so far (TeamLine.linescore).
     current_period: int
       The period/quarter NBA says the game is currently in.
     requested_period: int
       The period the caller wants to display.
     """
-    points = linescore[(requested_period - 1)]['score'] \
+    points = linescore[(requested_period - 1)] \
       if len(linescore) > requested_period - 1 else '-'
     # Display a hyphen for quarters that haven't started yet even though they
     # report it with a score of 0. Always display overtime data if present.
-    if (points == '0'
+    if (points == 0
             and requested_period > current_period
             and current_period <= 4):
       points = '-'
     return points
 
-  def _create_or_update_game_thread(self, act, title, body):
-    thread = None
-    username = self.reddit.user.me(False).name
+  def _create_or_update_game_thread(self, act, game, title, body):
+    key = f'{game.game_id}:{act.name}'
+    if self.content_hashes is not None \
+        and self.content_hashes.unchanged(key, body, self.now):
+      self.logger.info(f'Text for {key} did not change. Not querying reddit.')
+      return
 
-    # Unfortunately subreddit.search sometimes lags by as much as 2-3 minutes.
-    # This introduces a risk of spamming the sub with autogenerated posts because
-    # this algorithm will create a new thread if doesn't find an already existing
-    # one. Instead it's using subreddit.new() which seems to work better but does
-    # does return a lot of extraneous results.
-    q = GAME_THREAD_PREFIX if act == Action.DO_GAME_THREAD else POST_GAME_PREFIX
-    for submission in self.subreddit.new(limit=50):
-      # Need to make sure that we don't incorrectly update an old/obsolete post.
-      created_utc = datetime.fromtimestamp(submission.created_utc, UTC)
-      is_obsolete = created_utc + timedelta(hours=MAX_POST_AGE_HOURS) < self.now
-      is_bot_post = submission.author == username
-      if submission.title.startswith(q) and is_bot_post and not is_obsolete:
-        thread = submission
-        break
+    thread = self._find_stored_thread(key)
+    if thread is None:
+      self.logger.info(
+          f'No thread stored for {key}. Scanning the newest posts instead.')
+      thread = self._scan_for_thread(act)
+      if thread is not None:
+        self._store_thread(key, thread)
 
     if thread is None:
       thread = self.subreddit.submit(title, selftext=body, send_replies=False)
       thread.mod.distinguish(how="yes")
       thread.mod.sticky()
       thread.mod.suggested_sort('new')
+      self._store_thread(key, thread)
       self.logger.info(f'Created a new thread with title "{thread.title}".')
     elif thread.selftext.strip() == body.strip():
       self.logger.info(f'Text of "{thread.title}" did not change. Not updating.')
     else:
       thread.edit(body)
       self.logger.info(f'Updated "{thread.title}".')
+    if self.content_hashes is not None:
+      self.content_hashes.record(key, body, self.now)
 
+  def _find_stored_thread(self, key):
+    """Returns the thread this bot created for key (game ID and thread type)
+    according to the thread store, or None if there is none or it's gone."""
+    from praw.exceptions import PRAWException
+    from prawcore import PrawcoreException
 
-# Will ignore posts older than this many hours
-MAX_POST_AGE_HOURS = 6
+    thread_id = self._stored_thread_ids().get(key, {}).get('id')
+    if thread_id is None:
+      return None
+    thread = self.reddit.submission(id=thread_id)
+    try:
+      # Reading an attribute fetches the submission.
+      is_deleted = thread.author is None
+    except (PRAWException, PrawcoreException):
+      self.logger.warning(f'Could not fetch stored thread {thread_id}.')
+      return None
+    if is_deleted:
+      self.logger.info(f'Stored thread {thread_id} was deleted.')
+      return None
+    self.logger.info(f'Found thread {thread_id} for {key} in the thread store.')
+    return thread
 
+  def _scan_for_thread(self, act):
+    """Looks for this bot's recent thread of type act among the newest posts.
+    This lists 50 posts, so it's only used when the thread store has nothing
+    (e.g. it was lost or the thread was created by another machine)."""
+    username = self.reddit.user.me(False).name
 
-class Action(Enum):
-  DO_GAME_THREAD = 1
-  DO_POST_GAME_THREAD = 2
-  DO_NOTHING = 3
+    # Unfortunately subreddit.search sometimes lags by as much as 2-3 minutes.
+    # This introduces a risk of spamming the sub with autogenerated posts because
+    # this algorithm will create a new thread if doesn't find an already existing
+    # one. Instead it's using subreddit.new() which seems to work better but does
+    # does return a lot of extraneous results.
+    q = GAME_THREAD_PREFIX if act == Action.DO_GAME_THREAD else POST_GAME_PREFIX
+    for submission in self.subreddit.new(limit=50):
+      # Need to make sure that we don't incorrectly update an old/obsolete post.
+      created_utc = datetime.fromtimestamp(submission.created_utc, UTC)
+      is_obsolete = created_utc + timedelta(hours=MAX_POST_AGE_HOURS) < self.now
+      is_bot_post = submission.author == username
+      if submission.title.startswith(q) and is_bot_post and not is_obsolete:
+        return submission
+    return None
+
+  def _stored_thread_ids(self):
+    if self._thread_ids is None:
+      self._thread_ids = self.thread_store.load().get('threads', {}) \
+          if self.thread_store is not None else {}
+    return self._thread_ids
+
+  def _store_thread(self, key, thread):
+    threads = self._stored_thread_ids()
+    threads[key] = {'id': thread.id, 'stored_at': self.now.timestamp()}
+    # Forget threads of games that are long over.
+    oldest = (self.now - timedelta(days=THREAD_STORE_DAYS)).timestamp()
+    for old_key in [k for k, v in threads.items() if v['stored_at'] < oldest]:
+      del threads[old_key]
+    if self.thread_store is not None:
+      self.thread_store.save({'threads': threads})
+
+
+# How long the IDs of the threads the bot created are remembered.
+THREAD_STORE_DAYS = 3
+
+# How often the daemon updates the game thread while a game is on, the post
+# game thread after it ends, and checks the schedule otherwise.
+LIVE_POLL_INTERVAL = timedelta(seconds=10)
+POST_GAME_POLL_INTERVAL = timedelta(minutes=1)
+IDLE_POLL_INTERVAL = timedelta(hours=1)
+
+
+def _team_stats_cells(team_name, t):
+  return [
+    team_name, f'{t.points}', f'{t.fgm}-{t.fga}', f'{t.fgp}%',
+    f'{t.tpm}-{t.tpa}', f'{t.tpp}%', f'{t.ftm}-{t.fta}', f'{t.ftp}%',
+    f'{t.off_reb}', f'{t.tot_reb}', f'{t.assists}', f'{t.p_fouls}',
+    f'{t.steals}', f'{t.turnovers}', f'{t.blocks}']
+
+
+def _team_hustle_cells(team_name, t):
+  return [
+    team_name, GameThreadBot._plusminus(t.biggest_lead), f'{t.longest_run}',
+    f'{t.points_in_paint}', f'{t.points_off_turnovers}',
+    f'{t.fast_break_points}']
+
+
+def _team_leaders_cells(team_name, t):
+  return [
+    team_name,
+    f'**{t.points_leader.value}** {t.points_leader.name}',
+    f'**{t.rebounds_leader.value}** {t.rebounds_leader.name}',
+    f'**{t.assists_leader.value}** {t.assists_leader.name}']
+
+
+def _player_stats_cells(p):
+  return [
+    # Only starters have a position, which is shown next to their name.
+    f'{p.name}^{p.pos}' if p.pos else p.name, f'{p.min}', f'{p.fgm}-{p.fga}',
+    f'{p.tpm}-{p.tpa}', f'{p.ftm}-{p.fta}', f'{p.off_reb}', f'{p.def_reb}',
+    f'{p.tot_reb}', f'{p.assists}', f'{p.steals}', f'{p.blocks}',
+    f'{p.turnovers}', f'{p.p_fouls}', GameThreadBot._plusminus(p.plus_minus),
+    f'{p.points}']
+
+
+def _bold_columns(*headers):
+  return [Column(f'**{header}**' if header else '', LEFT) for header in headers]
+
+
+@functools.lru_cache(maxsize=None)
+def _linescore_table(periods):
+  """The linescore table with a column for each of periods (4 quarters, then
+  overtimes), whose rows are sequences. There is one per number of periods
+  and it's only built the first time a game gets that far."""
+  return Table(
+      [Column('**Team**', ':---')]
+      + [Column(f'**Q{period}**' if period < 5 else f'**OT{period - 4}**')
+         for period in range(1, periods + 1)]
+      + [Column('**Total**')],
+      leading_pipe=True,
+      trailing_pipe=True)
+
+
+SUMMARY_TABLE = Table(
+    [Column('', LEFT), Column('', LEFT)], leading_pipe=True, trailing_pipe=True)
+
+# The rows of the team tables are (team name, TeamStatLine).
+TEAM_STATS_TABLE = Table(
+    _bold_columns(
+        'Team', 'PTS', 'FG', 'FG%', '3P', '3P%', 'FT', 'FT%', 'OREB', 'TREB',
+        'AST', 'PF', 'STL', 'TO', 'BLK'),
+    leading_pipe=True,
+    trailing_pipe=True,
+    cells=lambda row: _team_stats_cells(*row))
+
+TEAM_HUSTLE_TABLE = Table(
+    _bold_columns(
+        'Team', 'Biggest Lead', 'Longest Run', 'PTS: In Paint',
+        'PTS: Off TOs', 'PTS: Fastbreak'),
+    leading_pipe=True,
+    trailing_pipe=True,
+    cells=lambda row: _team_hustle_cells(*row))
+
+TEAM_LEADERS_TABLE = Table(
+    _bold_columns('Team', 'Points', 'Rebounds', 'Assists'),
+    leading_pipe=True,
+    trailing_pipe=True,
+    cells=lambda row: _team_leaders_cells(*row))
+
+# The first header is replaced with the team's name when rendering.
+PLAYER_STATS_TABLE = Table(
+    _bold_columns(
+        '', 'MIN', 'FGM-A', '3PM-A', 'FTM-A', 'ORB', 'DRB', 'REB', 'AST', 'STL',
+        'BLK', 'TO', 'PF', '+/-', 'PTS'),
+    leading_pipe=True,
+    trailing_pipe=True,
+    header_leading_pipe=False,
+    cells=_player_stats_cells)
+
+
+def thread_store(subreddit_name):
+  """Returns the StateStore that remembers the threads created in
+  subreddit_name."""
+  return StateStore(
+      os.path.join(DEFAULT_STATE_DIR, f'game_threads.{subreddit_name}.json'))
+
+
+def thread_hashes(subreddit_name):
+  """Returns the ContentHashes of the threads last posted to subreddit_name."""
+  return ContentHashes(StateStore(os.path.join(
+      DEFAULT_STATE_DIR, f'game_thread_hashes.{subreddit_name}.json')))
+
+
+def run_gate(subreddit_name):
+  """Returns the RunGate that lets cron runs for subreddit_name skip the hours
+  where nothing can happen. It never stays closed longer than the daemon would
+  sleep, and opens early when a new version of a watched response (see
+  gate_watched) is in the HTTP cache."""
+  path = os.path.join(
+      DEFAULT_STATE_DIR, f'game_thread_bot.{subreddit_name}.json')
+  return RunGate(
+      StateStore(path),
+      subreddit_name,
+      IDLE_POLL_INTERVAL,
+      HttpCache().validators)
+
+
+def gate_watched(nba_service, team, now):
+  """Returns the URLs whose change should open the run gate of team's game
+  thread bot: its schedule, which has the game times the gate was closed for."""
+  from services.nba_service import schedule_url
+  return [schedule_url(team.slug, nba_service.season_year(now))]
 
 
 if __name__ == '__main__':
+  from optparse import OptionParser
+
+  import logging.config
+
   parser = OptionParser()
   parser.add_option(
       "-u",
@@ -619,8 +829,37 @@ if __name__ == '__main__':
       dest="username",
       help="Reddit account for the bot to run as.",
       metavar='[username]')
+  parser.add_option(
+      "--team",
+      dest="team",
+      help="The team whose games get threads, by tri code, name or subreddit. "
+           "Defaults to the team of the subreddit.",
+      metavar='[team]')
+  parser.add_option(
+      "-d",
+      "--daemon",
+      action="store_true",
+      dest="daemon",
+      default=False,
+      help="Keep running and wake up whenever there may be work to do.")
+  parser.add_option(
+      "-f",
+      "--force",
+      action="store_true",
+      dest="force",
+      default=False,
+      help="Run even if the last run said there is nothing to do yet.")
   (options, args) = parser.parse_args()
 
+  # Most cron runs have nothing to do. Find out before paying for the imports
+  # and clients below.
+  now = datetime.now(UTC)
+  gate = run_gate(args[0]) if len(args) == 1 else None
+  if gate and not options.daemon and not options.force and gate.is_closed(now):
+    raise SystemExit(0)
+
+  from services.nba_service import NbaService
+
   logging.config.fileConfig('logging.conf')
   logger = logging.getLogger('game_thread_bot')
 
@@ -629,16 +868,48 @@ if __name__ == '__main__':
     raise SystemExit(f'Usage: {sys.argv[0]} subreddit')
 
   subreddit_name = args[0]
-  username = options.username if options.username else 'nyknicks-automod'
-  logger.info(f'Using subreddit "{subreddit_name}" and user "{username}".')
+  try:
+    team = load_team(options.team or subreddit_name, options.username)
+  except ValueError as e:
+    logger.error(e)
+    raise SystemExit(f'{e} Pass --team for subreddits of no team.')
+  logger.info(
+      f'Using subreddit "{subreddit_name}", team {team.tri_code} and user '
+      f'"{team.username}".')
 
-  now = datetime.now(UTC)
   # now = datetime(2021, 1, 1, 4, 4, 0, 0, UTC)
   nba_service = NbaService(logger)
-  reddit = praw.Reddit(username)
-
-  try:
-    bot = GameThreadBot(logger, nba_service, now, reddit, subreddit_name)
-    bot.run()
-  except:
-    logger.error(traceback.format_exc())
+  bot = GameThreadBot(
+      logger,
+      nba_service,
+      now,
+      None,
+      subreddit_name,
+      team,
+      thread_store(subreddit_name),
+      thread_hashes(subreddit_name),
+      render_cache=RenderCache() if options.daemon else None)
+
+  with nba_service:
+    if options.daemon:
+      def run_once(now):
+        nba_service.start_run()
+        bot.now = now
+        try:
+          return bot.run()
+        finally:
+          nba_service.log_stats()
+
+      run_forever(logger, run_once)
+    else:
+      try:
+        plan = bot.run()
+        gate.close_until(
+            now,
+            plan.wake_at,
+            plan.reason,
+            gate_watched(nba_service, team, now))
+      except:
+        logger.error(traceback.format_exc())
+        gate.open()
+      nba_service.log_stats()
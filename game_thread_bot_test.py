@@ -1,11 +1,19 @@
 from constants import GAME_THREAD_PREFIX, POST_GAME_PREFIX, UTC
+from content_hashes import ContentHashes
 from datetime import datetime, timedelta
-from game_thread_bot import Action, GameThreadBot
+from game_thread_bot import Action, GameThreadBot, LIVE_POLL_INTERVAL
 from services.fake_nba_service import FakeNbaService
+from services.game_planner import GamePlan, ScoreboardPlanner
+from services.models import Game, Schedule, TeamLine
 from services.nba_service import NbaService
+from render_cache import RenderCache
+from services.state_store import StateStore
+from team_config import TEAMS
 from unittest.mock import MagicMock, patch
 
 import logging.config
+import os
+import tempfile
 import unittest
 
 
@@ -17,7 +25,7 @@ class GameThreadBotTest(unittest.TestCase):
     self.logger = logging.getLogger(__name__)
     self.fake_nba_service = FakeNbaService()
     self.mock_praw = mock_praw
-    self.mock_reddit = MagicMock(['subreddit', 'user'])
+    self.mock_reddit = MagicMock(['submission', 'subreddit', 'user'])
     self.mock_reddit.user = FakeUser('nyknicks-automod')
     self.mock_praw.return_value = self.mock_reddit
     self.mock_subreddit = MagicMock(['new', 'search', 'submit'])
@@ -28,13 +36,15 @@ class GameThreadBotTest(unittest.TestCase):
     self.mock_reddit.reset_mock()
     self.mock_subreddit.reset_mock()
 
-  def bot(self, now: datetime):
+  def bot(self, now: datetime, thread_store=None, content_hashes=None):
     return GameThreadBot(
         logger=self.logger,
         nba_service=self.fake_nba_service,
         now=now,
         reddit=self.mock_reddit,
-        subreddit_name='test_NYKnicks')
+        subreddit_name='test_NYKnicks',
+        thread_store=thread_store,
+        content_hashes=content_hashes)
 
   def test_get_current_game_tooEarly_doNothing(self):
     # Previous game (20201227/MILNYK) started at 2020-12-28T00:30:00.000Z.
@@ -52,7 +62,7 @@ class GameThreadBotTest(unittest.TestCase):
     schedule = self.fake_nba_service.schedule('knicks', '2020')
     (action, game) = self.bot(now)._get_current_game(schedule)
     self.assertEqual(action, Action.DO_GAME_THREAD)
-    self.assertEqual(game['gameUrlCode'], '20201229/NYKCLE')
+    self.assertEqual(game.game_url_code, '20201229/NYKCLE')
 
   def test_get_current_game_gameStarted_doGameThread(self):
     # Previous game (20201227/MILNYK) started at 2020-12-28T00:30:00.000Z.
@@ -61,16 +71,16 @@ class GameThreadBotTest(unittest.TestCase):
     schedule = self.fake_nba_service.schedule('knicks', '2020')
     (action, game) = self.bot(now)._get_current_game(schedule)
     self.assertEqual(action, Action.DO_GAME_THREAD)
-    self.assertEqual(game['gameUrlCode'], '20201229/NYKCLE')
+    self.assertEqual(game.game_url_code, '20201229/NYKCLE')
 
   def test_get_current_game_afterGame_postGameThread(self):
     # Previous game (20201227/MILNYK) started at 2020-12-28T00:30:00.000Z.
     # Next game (20201229/NYKCLE) starts at 2020-12-30T00:00:00.000Z.
-    now = datetime(2020, 12, 27, 3, 0, 0, 0, UTC)
+    now = datetime(2020, 12, 28, 3, 0, 0, 0, UTC)
     schedule = self.fake_nba_service.schedule('knicks', '2020')
     (action, game) = self.bot(now)._get_current_game(schedule)
     self.assertEqual(action, Action.DO_POST_GAME_THREAD)
-    self.assertEqual(game['gameUrlCode'], '20201227/MILNYK')
+    self.assertEqual(game.game_url_code, '20201227/MILNYK')
 
   def test_get_current_game_tooLate_doNothing(self):
     # Previous game (20201227/MILNYK) started at 2020-12-28T00:30:00.000Z.
@@ -83,24 +93,84 @@ class GameThreadBotTest(unittest.TestCase):
 
   def test_get_current_game_seasonOver_doNothing(self):
     now = datetime(2021, 2, 10, 12, 0, 0, 0, UTC)
-    schedule = {
-      "league": {
-        "lastStandardGamePlayedIndex": 0,
-        "standard": [
-          {
-            'gameUrlCode': '20201231/NYKTOR',
-            'startTimeUTC': '2021-01-01T00:30:00.000Z',
-            'statusNum': 3,
-            'vTeam': {'score': '83'},
-            'hTeam': {'score': '100'},
-          },
-        ],
-      }
-    }
+    schedule = Schedule(
+        last_played_index=0,
+        games=[
+          Game(
+              game_id='0022000066',
+              game_url_code='20201231/NYKTOR',
+              start_date_eastern='20201231',
+              start_time_utc=datetime(2021, 1, 1, 0, 30, 0, 0, UTC),
+              home=TeamLine(team_id='1610612761', score=100),
+              road=TeamLine(team_id='1610612752', score=83)),
+        ])
     (action, game) = self.bot(now)._get_current_game(schedule)
     self.assertEqual(action, Action.DO_NOTHING)
     self.assertIsNone(game)
 
+  def test_get_current_game_postponedGameAndStaleIndex_usesTipOffTimes(self):
+    # The index still points at the first game, the second was postponed and
+    # the third is on now.
+    now = datetime(2021, 1, 5, 1, 0, 0, 0, UTC)
+    games = [
+      Game(
+          game_id=str(i),
+          game_url_code=f'2021010{i}/NYKTOR',
+          start_date_eastern=f'2021010{i}',
+          start_time_utc=datetime(2021, 1, 2 * i + 1, 0, 30, 0, 0, UTC),
+          home=TeamLine(team_id='1610612761', score=score),
+          road=TeamLine(team_id='1610612752', score=score))
+      for i, score in ((0, 100), (1, None), (2, None))]
+    schedule = Schedule(last_played_index=0, games=games)
+
+    (action, game) = self.bot(now)._get_current_game(schedule)
+
+    self.assertEqual(action, Action.DO_GAME_THREAD)
+    self.assertEqual(game.game_id, '2')
+
+  def test_plan_next_wake_offDay_wakesHourly(self):
+    # Next game (20201229/NYKCLE) starts at 2020-12-30T00:00:00.000Z.
+    now = datetime(2020, 12, 29, 12, 0, 0, 0, UTC)
+    schedule = self.fake_nba_service.schedule('knicks', '2020')
+    bot = self.bot(now)
+
+    plan = bot._plan_next_wake(bot._next_game(schedule), Action.DO_NOTHING)
+
+    self.assertEqual(plan.wake_at, now + timedelta(hours=1))
+
+  def test_plan_next_wake_gameSoon_wakesHourBeforeTipOff(self):
+    now = datetime(2020, 12, 29, 22, 30, 0, 0, UTC)
+    schedule = self.fake_nba_service.schedule('knicks', '2020')
+    bot = self.bot(now)
+
+    plan = bot._plan_next_wake(bot._next_game(schedule), Action.DO_NOTHING)
+
+    self.assertEqual(plan.wake_at, datetime(2020, 12, 29, 23, 0, 0, 0, UTC))
+    self.assertEqual(plan.reason, 'game thread for 20201229/NYKCLE')
+
+  def test_plan_next_wake_gameThread_pollsOften(self):
+    now = datetime(2020, 12, 30, 0, 30, 0, 0, UTC)
+    schedule = self.fake_nba_service.schedule('knicks', '2020')
+    bot = self.bot(now)
+
+    plan = bot._plan_next_wake(bot._next_game(schedule), Action.DO_GAME_THREAD)
+
+    self.assertEqual(plan.wake_at, now + LIVE_POLL_INTERVAL)
+
+  @patch('praw.Reddit')
+  def test_run_nothingToDo_doesNotLogIn(self, mock_praw):
+    now = datetime(2020, 12, 29, 12, 0, 0, 0, UTC)
+    bot = GameThreadBot(
+        logger=self.logger,
+        nba_service=self.fake_nba_service,
+        now=now,
+        reddit=None,
+        subreddit_name='test_NYKnicks')
+
+    bot.run()
+
+    mock_praw.assert_not_called()
+
   def test_run_createGameThread(self):
     # 1 hour before tip-off.
     now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
@@ -129,6 +199,43 @@ class GameThreadBotTest(unittest.TestCase):
     mock_submit_mod.sticky.assert_called_once()
     mock_submit_mod.suggested_sort.assert_called_once_with('new')
 
+  def test_run_withPlanner_gameFromScoreboard(self):
+    # 1 hour before tip-off.
+    now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    self.mock_subreddit.new.return_value = []
+    self.mock_subreddit.submit.return_value = MagicMock(
+      mod=MagicMock(['distinguish', 'sticky', 'suggested_sort']),
+      title='game thread')
+    bot = self.bot(now)
+    bot.planner = ScoreboardPlanner(self.fake_nba_service, ['NYK'])
+
+    plan = bot.run()
+
+    self.assertEqual(plan.wake_at, now + LIVE_POLL_INTERVAL)
+    self.mock_subreddit.submit.assert_called_once_with(
+        '[Game Thread] The New York Knicks (2-2) @ The Cleveland Cavaliers '
+        '(3-1) - (December 29, 2020)',
+        selftext=EXPECTED_GAMETHREAD_TEXT,
+        send_replies=False)
+    self.assertFalse(any(
+        url.endswith('schedule.json')
+        for url in self.fake_nba_service.fetched_urls))
+
+  def test_run_plannerOffDay_sleepsUntilRecheckWithoutSchedule(self):
+    now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    midnight = datetime(2020, 12, 30, 5, 0, 0, 0, UTC)
+    bot = self.bot(now)
+    bot.planner = MagicMock()
+    bot.planner.plan.return_value = GamePlan(Action.DO_NOTHING, None, midnight)
+
+    plan = bot.run()
+
+    self.assertEqual(plan.wake_at, midnight)
+    self.assertFalse(any(
+        url.endswith('schedule.json')
+        for url in self.fake_nba_service.fetched_urls))
+    self.mock_subreddit.submit.assert_not_called()
+
   def test_run_updateGameThread(self):
     # 1 hour before tip-off.
     now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
@@ -160,10 +267,81 @@ class GameThreadBotTest(unittest.TestCase):
     self.assertEqual(shitpost.selftext, 'better shut up')
     self.assertEqual(otherthread.selftext, "it's happening!")
 
+  def test_run_createGameThread_storesThreadId(self):
+    now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    self.mock_subreddit.new.return_value = []
+    self.mock_subreddit.submit.return_value = MagicMock(id='new123')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      store = StateStore(os.path.join(tmp_dir, 'threads.json'))
+      self.bot(now, store).run()
+
+      threads = store.load()['threads']
+      self.assertEqual(threads['0022000046:DO_GAME_THREAD']['id'], 'new123')
+
+  def test_run_storedThread_fetchedWithoutScanning(self):
+    now = datetime(2020, 12, 29, 23, 5, 0, 0, UTC)
+    gamethread = FakeThread(
+        author='nyknicks-automod',
+        created_utc=now,
+        selftext='we did it!',
+        title=f'{GAME_THREAD_PREFIX} A classic match of Good vs. Evil',
+        id='stored1')
+    self.mock_reddit.submission.return_value = gamethread
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      store = StateStore(os.path.join(tmp_dir, 'threads.json'))
+      store.save({'threads': {'0022000046:DO_GAME_THREAD': {
+        'id': 'stored1', 'stored_at': now.timestamp()}}})
+      self.bot(now, store).run()
+
+    self.mock_reddit.submission.assert_called_once_with(id='stored1')
+    self.mock_subreddit.new.assert_not_called()
+    self.mock_subreddit.submit.assert_not_called()
+    self.assertEqual(gamethread.selftext, EXPECTED_GAMETHREAD_TEXT)
+
+  def test_run_storedThreadDeleted_scansNewestPosts(self):
+    now = datetime(2020, 12, 29, 23, 5, 0, 0, UTC)
+    self.mock_reddit.submission.return_value = FakeThread(
+        author=None, created_utc=now, id='deleted1')
+    gamethread = FakeThread(
+        author='nyknicks-automod',
+        created_utc=now,
+        title=f'{GAME_THREAD_PREFIX} A classic match of Good vs. Evil',
+        id='found1')
+    self.mock_subreddit.new.return_value = [gamethread]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      store = StateStore(os.path.join(tmp_dir, 'threads.json'))
+      store.save({'threads': {'0022000046:DO_GAME_THREAD': {
+        'id': 'deleted1', 'stored_at': now.timestamp()}}})
+      self.bot(now, store).run()
+
+      threads = store.load()['threads']
+      self.assertEqual(threads['0022000046:DO_GAME_THREAD']['id'], 'found1')
+
+    self.mock_subreddit.new.assert_called_once()
+    self.mock_subreddit.submit.assert_not_called()
+    self.assertEqual(gamethread.selftext, EXPECTED_GAMETHREAD_TEXT)
+
+  def test_run_sameTextAsLastRun_skipsReddit(self):
+    now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    self.mock_subreddit.new.return_value = []
+    self.mock_subreddit.submit.return_value = MagicMock(id='new123')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      hashes = ContentHashes(StateStore(os.path.join(tmp_dir, 'hashes.json')))
+      self.bot(now, content_hashes=hashes).run()
+      self.bot(now + timedelta(minutes=1), content_hashes=hashes).run()
+
+    self.mock_subreddit.new.assert_called_once()
+    self.mock_subreddit.submit.assert_called_once()
+    self.mock_reddit.submission.assert_not_called()
+
   @patch('random.choice')
   def test_run_createPostGameThread(self, mock_random):
     # 3.5 hours after tip-off.
-    now = datetime(2020, 12, 27, 3, 0, 0, 0, UTC)
+    now = datetime(2020, 12, 28, 4, 0, 0, 0, UTC)
 
     mock_random.return_value = 'defeat'
 
@@ -194,7 +372,7 @@ class GameThreadBotTest(unittest.TestCase):
   @patch('random.choice')
   def test_run_updatePostGameThread(self, mock_random):
     # 3.5 hours after tip-off.
-    now = datetime(2020, 12, 27, 3, 0, 0, 0, UTC)
+    now = datetime(2020, 12, 28, 4, 0, 0, 0, UTC)
 
     mock_random.return_value = 'defeat'
 
@@ -228,7 +406,7 @@ class GameThreadBotTest(unittest.TestCase):
   @patch('random.choice')
   def test_run_withObsoletePost_createNewPostGameThread(self, mock_random):
     # 3.5 hours after tip-off.
-    now = datetime(2020, 12, 27, 3, 0, 0, 0, UTC)
+    now = datetime(2020, 12, 28, 4, 0, 0, 0, UTC)
 
     mock_random.return_value = 'defeat'
 
@@ -275,14 +453,61 @@ class GameThreadBotTest(unittest.TestCase):
   # - will most likely need to call _build_postgame_thread_text directly for that
   #   in order to mock out the nba data API calls
 
+  def test_build_boxscore_text_unchangedSections_reused(self):
+    teams = self.fake_nba_service.teams('2020')
+    now = datetime(2020, 12, 27, 3, 0, 0, 0, UTC)
+    boxscore = self.fake_nba_service.boxscore('20201227', '0022000036')
+    bot = self.bot(now)
+    bot.render_cache = RenderCache()
+
+    first = bot._build_boxscore_text(boxscore, teams)
+    players = boxscore.players
+    changed = boxscore._replace(
+        players=(players[0]._replace(points='99'),) + players[1:])
+    second = bot._build_boxscore_text(changed, teams)
+
+    self.assertNotEqual(first, second)
+    self.assertEqual(second, self.bot(now)._build_boxscore_text(changed, teams))
+    stats = bot.render_cache.stats
+    for section in ('summary', 'linescore', 'team_stats', 'team_leaders'):
+      self.assertEqual(stats[f'render.hit.{section}'], 1, section)
+    self.assertEqual(stats['render.hit.player_stats'], 0)
+    self.assertEqual(stats['render.miss.player_stats'], 2)
+
+  def test_build_game_thread_text_otherTeam_writtenForThatTeam(self):
+    teams = self.fake_nba_service.teams('2020')
+    now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    # NYK @ TOR.
+    boxscore = self.fake_nba_service.boxscore('20201229', '0022000066')
+    bot = GameThreadBot(
+        self.logger,
+        self.fake_nba_service,
+        now,
+        self.mock_reddit,
+        'test_torontoraptors',
+        TEAMS['TOR'])
+
+    title, body = bot._build_game_thread_text(boxscore, teams)
+
+    self.assertEqual(
+        title,
+        '[Game Thread] The Toronto Raptors (0-3) vs The New York Knicks (2-2) '
+        '- (December 29, 2020)')
+    self.assertIn('| Raptors Broadcast: Sportsnet ', body)
+    self.assertIn('| Knicks Broadcast: MSG |', body)
+    self.assertIn('| r/torontoraptors|\n', body)
+    self.assertIn('|| r/NYKnicks|\n', body)
+
   def test_build_linescore_withNoData_returnNone(self):
     teams = self.fake_nba_service.teams('2020')
     now = datetime(2020, 12, 27, 3, 0, 0, 0, UTC)
 
     # Read a real boxscore response and modify it for our test case.
     boxscore = self.fake_nba_service.boxscore('20201227', '0022000036')
-    boxscore['basicGameData']['vTeam']['linescore'] = []
-    boxscore['basicGameData']['hTeam']['linescore'] = []
+    game = boxscore.game
+    boxscore = boxscore._replace(game=game._replace(
+        home=game.home._replace(linescore=()),
+        road=game.road._replace(linescore=())))
 
     linescore = self.bot(now)._build_linescore(boxscore, teams)
 
@@ -389,19 +614,20 @@ class GameThreadBotTest(unittest.TestCase):
 
   @staticmethod
   def update_boxscore(boxscore, home_scores, road_scores, period):
-    def score(scores):
-      return [{'score': str(s)} for s in scores]
-    boxscore['basicGameData']['vTeam']['linescore'] = score(home_scores)
-    boxscore['basicGameData']['hTeam']['linescore'] = score(road_scores)
-    boxscore['basicGameData']['vTeam']['score'] = str(sum(home_scores))
-    boxscore['basicGameData']['hTeam']['score'] = str(sum(road_scores))
-    boxscore['basicGameData']['period']['current'] = period
-    return boxscore
+    game = boxscore.game
+    game = game._replace(
+        road=game.road._replace(
+            linescore=tuple(home_scores), score=sum(home_scores)),
+        home=game.home._replace(
+            linescore=tuple(road_scores), score=sum(road_scores)))
+    return boxscore._replace(game=game, period=period)
 
 
 class FakeThread:
-  def __init__(self, author, created_utc: datetime, selftext='', title=''):
+  def __init__(
+      self, author, created_utc: datetime, selftext='', title='', id='abc123'):
     self.author = author
+    self.id = id
     self.created_utc = created_utc.timestamp()
     self.selftext = selftext
     self.title = title
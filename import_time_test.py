@@ -0,0 +1,71 @@
+"""
+Guards the start-up cost of the bots. Cron starts them every minute and most
+runs have nothing to do, so importing an entry point must not pull in praw,
+requests or the NBA service, and has to stay within a time budget.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+# Microseconds an entry point may take to import (including everything it
+# imports), measured with -X importtime in a fresh interpreter. Today they take
+# about a third of this.
+IMPORT_BUDGET_US = 150000
+
+# Modules that are only needed once there is work to do.
+HEAVY_MODULES = (
+  'asyncio',
+  'logging.config',
+  'praw',
+  'requests',
+  'services.nba_service',
+)
+
+
+def import_times(module):
+  """Imports module in a new interpreter and returns a dict mapping every
+  module that got imported to its cumulative import time in microseconds."""
+  result = subprocess.run(
+      [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+      cwd=os.path.dirname(os.path.abspath(__file__)),
+      capture_output=True,
+      text=True,
+      check=True)
+  times = {}
+  for line in result.stderr.splitlines():
+    if not line.startswith('import time:') or 'cumulative' in line:
+      continue
+    _, cumulative, name = line.split('|')
+    times[name.strip()] = int(cumulative)
+  return times
+
+
+class ImportTimeTest(unittest.TestCase):
+
+  def assert_cheap_import(self, module):
+    # The fastest of a few runs, so a busy machine doesn't fail the test.
+    runs = [import_times(module) for _ in range(3)]
+    imported = runs[0]
+    for heavy in HEAVY_MODULES:
+      self.assertNotIn(heavy, imported, f'{module} imports {heavy}')
+    elapsed = min(times[module] for times in runs)
+    self.assertLess(
+        elapsed, IMPORT_BUDGET_US, f'{module} took {elapsed} us to import')
+
+  def test_import_game_thread_bot(self):
+    self.assert_cheap_import('game_thread_bot')
+
+  def test_import_sidebarbot(self):
+    self.assert_cheap_import('sidebarbot')
+
+  def test_import_redditbot(self):
+    self.assert_cheap_import('redditbot')
+
+  def test_import_nba_data(self):
+    self.assert_cheap_import('services.nba_data')
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,219 @@
+"""
+A queue of per-subreddit jobs in SQLite that several worker processes share.
+
+fanout.py runs every subreddit in one process, which is one machine's worth of
+capacity and stops everything when that machine does. With a JobQueue, any
+number of worker processes (see worker.py), on one host or on several hosts
+that share a file system, take turns at the subreddits' jobs.
+
+Each job is a row with the time it is next due. A worker claims a due job by
+taking a lease on it: its name and a random token go in the row together with
+when the lease expires. While a job runs its worker renews the lease (a
+heartbeat), and when the job is done it records when the job is next due and
+gives the lease back. A job is only claimable while nobody holds an unexpired
+lease on it, so no two workers ever work on the same subreddit's threads at
+once, and when a worker dies its jobs become claimable again as soon as its
+leases expire. Every update after the claim must match the token, so a worker
+whose lease expired (e.g. after a long pause) can't overwrite the work of the
+worker that took the job over.
+
+Claims run in an IMMEDIATE transaction, which takes SQLite's write lock up
+front so two claims never pick the same row. The database keeps SQLite's
+default rollback journal rather than WAL, because WAL doesn't work when the
+file is on a network file system.
+"""
+
+from constants import UTC
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+import os
+import secrets
+import sqlite3
+import threading
+
+# How long a lease lasts unless it is renewed.
+DEFAULT_LEASE = timedelta(seconds=60)
+
+# How long to wait for another process's transaction before giving up.
+BUSY_TIMEOUT_SECONDS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+  name TEXT PRIMARY KEY,
+  due_at REAL NOT NULL,
+  owner TEXT,
+  token TEXT,
+  lease_expires_at REAL,
+  runs INTEGER NOT NULL DEFAULT 0,
+  failures INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_due_at ON jobs (due_at);
+"""
+
+
+class Lease(NamedTuple):
+  name: str
+  owner: str
+  token: str
+  expires_at: datetime
+
+
+class JobState(NamedTuple):
+  name: str
+  due_at: datetime
+  # The worker holding a lease on the job, if any (it may have expired).
+  owner: Optional[str]
+  lease_expires_at: Optional[datetime]
+  runs: int
+  failures: int
+  last_error: Optional[str]
+
+
+def _datetime(timestamp):
+  return None if timestamp is None else datetime.fromtimestamp(timestamp, UTC)
+
+
+class JobQueue:
+
+  def __init__(self, path, now=lambda: datetime.now(UTC)):
+    """
+    Parameters
+    ----------
+    path: str
+      The SQLite database. It and its directory are created if needed.
+    now: function
+      Returns the current datetime. All processes sharing a queue need clocks
+      that roughly agree, since leases expire by it.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+      os.makedirs(directory, exist_ok=True)
+    self.path = path
+    self.now = now
+    # isolation_level=None leaves transactions to the explicit BEGINs below.
+    self._db = sqlite3.connect(
+        path,
+        timeout=BUSY_TIMEOUT_SECONDS,
+        isolation_level=None,
+        check_same_thread=False)
+    # The connection is shared with the worker's heartbeat thread.
+    self._lock = threading.Lock()
+    with self._lock:
+      self._db.executescript(_SCHEMA)
+
+  def close(self):
+    with self._lock:
+      self._db.close()
+
+  @contextmanager
+  def _transaction(self):
+    """Runs the statements of the block in one transaction that holds the
+    database's write lock from the start."""
+    with self._lock:
+      self._db.execute('BEGIN IMMEDIATE')
+      try:
+        yield
+      except BaseException:
+        self._db.execute('ROLLBACK')
+        raise
+      self._db.execute('COMMIT')
+
+  def _write(self, sql, params):
+    """Runs one statement in its own transaction and returns how many rows it
+    changed."""
+    with self._lock:
+      return self._db.execute(sql, params).rowcount
+
+  def add(self, names, due_at=None):
+    """Adds a job for each of names that isn't in the queue yet, due at due_at
+    (default now). Jobs already in the queue keep their schedule."""
+    due_at = (due_at if due_at is not None else self.now()).timestamp()
+    with self._transaction():
+      self._db.executemany(
+          'INSERT OR IGNORE INTO jobs (name, due_at) VALUES (?, ?)',
+          [(name, due_at) for name in names])
+
+  def remove(self, name):
+    """Removes a job. A worker running it can still finish, but its result is
+    dropped."""
+    return self._write('DELETE FROM jobs WHERE name = ?', (name,)) == 1
+
+  def claim(self, owner, lease=DEFAULT_LEASE):
+    """Takes a lease on the job that has been due the longest and returns it,
+    or returns None if no job is due and unleased.
+
+    Parameters
+    ----------
+    owner: str
+      Identifies the worker, e.g. in logs and JobState.
+    lease: timedelta
+      How long the lease lasts unless renewed with heartbeat.
+    """
+    now = self.now()
+    expires_at = now + lease
+    token = secrets.token_hex(16)
+    with self._transaction():
+      row = self._db.execute(
+          'SELECT name FROM jobs WHERE due_at <= ? '
+          'AND (token IS NULL OR lease_expires_at <= ?) '
+          'ORDER BY due_at LIMIT 1',
+          (now.timestamp(), now.timestamp())).fetchone()
+      if row is not None:
+        self._db.execute(
+            'UPDATE jobs SET owner = ?, token = ?, lease_expires_at = ? '
+            'WHERE name = ?',
+            (owner, token, expires_at.timestamp(), row[0]))
+    return Lease(row[0], owner, token, expires_at) if row is not None else None
+
+  def heartbeat(self, lease, extend_by=DEFAULT_LEASE):
+    """Extends lease to extend_by from now and returns the renewed Lease, or
+    None if the lease was lost (it expired and was taken over, or the job was
+    removed)."""
+    expires_at = self.now() + extend_by
+    changed = self._write(
+        'UPDATE jobs SET lease_expires_at = ? WHERE name = ? AND token = ?',
+        (expires_at.timestamp(), lease.name, lease.token))
+    return lease._replace(expires_at=expires_at) if changed else None
+
+  def complete(self, lease, next_due_at):
+    """Records a successful run of lease's job, schedules the next one and
+    releases the lease. Returns False (and changes nothing) if the lease was
+    lost."""
+    return self._write(
+        'UPDATE jobs SET due_at = ?, owner = NULL, token = NULL, '
+        'lease_expires_at = NULL, runs = runs + 1, last_error = NULL '
+        'WHERE name = ? AND token = ?',
+        (next_due_at.timestamp(), lease.name, lease.token)) == 1
+
+  def fail(self, lease, retry_at, error):
+    """Records a failed run of lease's job, schedules a retry and releases the
+    lease. Returns False (and changes nothing) if the lease was lost."""
+    return self._write(
+        'UPDATE jobs SET due_at = ?, owner = NULL, token = NULL, '
+        'lease_expires_at = NULL, failures = failures + 1, last_error = ? '
+        'WHERE name = ? AND token = ?',
+        (retry_at.timestamp(), error, lease.name, lease.token)) == 1
+
+  def next_available_at(self):
+    """Returns the earliest time a job can be claimed (which may be in the
+    past), or None if the queue is empty. A leased job is available once its
+    lease expires, in case its worker died."""
+    with self._lock:
+      (timestamp,) = self._db.execute(
+          'SELECT MIN(CASE WHEN token IS NULL THEN due_at '
+          'ELSE MAX(due_at, lease_expires_at) END) FROM jobs').fetchone()
+    return _datetime(timestamp)
+
+  def jobs(self):
+    """Returns the JobState of every job, by name."""
+    with self._lock:
+      rows = self._db.execute(
+          'SELECT name, due_at, owner, lease_expires_at, runs, failures, '
+          'last_error FROM jobs ORDER BY name').fetchall()
+    return [
+      JobState(name, _datetime(due_at), owner, _datetime(expires_at), runs,
+               failures, last_error)
+      for (name, due_at, owner, expires_at, runs, failures, last_error) in rows]
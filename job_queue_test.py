@@ -0,0 +1,122 @@
+from constants import UTC
+from datetime import datetime, timedelta
+from job_queue import JobQueue
+
+import os
+import tempfile
+import unittest
+
+LEASE = timedelta(seconds=60)
+
+
+class JobQueueTest(unittest.TestCase):
+
+  def setUp(self):
+    temp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(temp_dir.cleanup)
+    self.path = os.path.join(temp_dir.name, 'queue', 'jobs.sqlite3')
+    self.now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    self.queue = self.new_queue()
+
+  def new_queue(self):
+    queue = JobQueue(self.path, now=lambda: self.now)
+    self.addCleanup(queue.close)
+    return queue
+
+  def test_claim_emptyQueue_none(self):
+    self.assertIsNone(self.queue.claim('a', LEASE))
+    self.assertIsNone(self.queue.next_available_at())
+
+  def test_claim_longestDueFirst(self):
+    self.queue.add(['later'], self.now - timedelta(minutes=1))
+    self.queue.add(['earlier'], self.now - timedelta(minutes=2))
+    self.queue.add(['future'], self.now + timedelta(minutes=1))
+
+    claims = [self.queue.claim('a', LEASE) for _ in range(3)]
+
+    self.assertEqual(
+        [lease.name if lease else None for lease in claims],
+        ['earlier', 'later', None])
+    self.assertEqual(claims[0].expires_at, self.now + LEASE)
+
+  def test_claim_leasedJob_notClaimedByAnotherWorker(self):
+    self.queue.add(['NYKnicks'])
+    self.assertIsNotNone(self.queue.claim('a', LEASE))
+
+    # Another process, with its own connection.
+    self.assertIsNone(self.new_queue().claim('b', LEASE))
+
+  def test_add_existingJob_keepsSchedule(self):
+    self.queue.add(['NYKnicks'], self.now + timedelta(hours=1))
+    self.queue.add(['NYKnicks'])
+
+    self.assertEqual(
+        self.queue.jobs()[0].due_at, self.now + timedelta(hours=1))
+
+  def test_complete_schedulesNextRunAndReleases(self):
+    self.queue.add(['NYKnicks'])
+    lease = self.queue.claim('a', LEASE)
+
+    self.assertTrue(
+        self.queue.complete(lease, self.now + timedelta(seconds=10)))
+
+    job = self.queue.jobs()[0]
+    self.assertEqual(job.due_at, self.now + timedelta(seconds=10))
+    self.assertIsNone(job.owner)
+    self.assertEqual(job.runs, 1)
+    self.assertIsNone(self.queue.claim('a', LEASE))
+    self.now += timedelta(seconds=10)
+    self.assertEqual(self.queue.claim('b', LEASE).name, 'NYKnicks')
+
+  def test_fail_recordsErrorAndRetries(self):
+    self.queue.add(['NYKnicks'])
+    lease = self.queue.claim('a', LEASE)
+
+    self.assertTrue(
+        self.queue.fail(lease, self.now + timedelta(minutes=1), 'boom'))
+
+    job = self.queue.jobs()[0]
+    self.assertEqual((job.runs, job.failures, job.last_error), (0, 1, 'boom'))
+    self.assertEqual(job.due_at, self.now + timedelta(minutes=1))
+
+  def test_claim_expiredLease_takenOver(self):
+    self.queue.add(['NYKnicks'])
+    stale = self.queue.claim('a', LEASE)
+    self.assertEqual(self.queue.next_available_at(), self.now + LEASE)
+
+    self.now += LEASE
+    lease = self.queue.claim('b', LEASE)
+
+    self.assertEqual(lease.name, 'NYKnicks')
+    self.assertEqual(self.queue.jobs()[0].owner, 'b')
+    # The worker that lost the lease can't renew it or record its results.
+    self.assertIsNone(self.queue.heartbeat(stale, LEASE))
+    self.assertFalse(self.queue.complete(stale, self.now + timedelta(hours=1)))
+    self.assertFalse(self.queue.fail(stale, self.now, 'late'))
+    self.assertTrue(self.queue.complete(lease, self.now + timedelta(hours=2)))
+    self.assertEqual(
+        self.queue.jobs()[0].due_at, self.now + timedelta(hours=2))
+
+  def test_heartbeat_extendsLease(self):
+    self.queue.add(['NYKnicks'])
+    lease = self.queue.claim('a', LEASE)
+
+    self.now += timedelta(seconds=50)
+    lease = self.queue.heartbeat(lease, LEASE)
+    self.now += timedelta(seconds=50)
+
+    self.assertEqual(lease.expires_at, self.now + timedelta(seconds=10))
+    self.assertIsNone(self.queue.claim('b', LEASE))
+
+  def test_remove_dropsResultOfRunningJob(self):
+    self.queue.add(['NYKnicks'])
+    lease = self.queue.claim('a', LEASE)
+
+    self.assertTrue(self.queue.remove('NYKnicks'))
+
+    self.assertFalse(self.queue.complete(lease, self.now))
+    self.assertEqual(self.queue.jobs(), [])
+
+
+if __name__ == '__main__':
+  unittest.main()
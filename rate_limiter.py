@@ -0,0 +1,69 @@
+"""
+Shares one request budget between every Reddit client in a process.
+
+Reddit allows an OAuth client about 60 requests a minute. When one process runs
+the bots of many subreddits at the same time, their clients together must stay
+under the budget or they all get throttled. RateLimiter is a token bucket:
+requests can go out in a burst of up to `burst` at once, after which they are
+spaced out to `rate` per second. It is safe to share between threads.
+"""
+
+from collections import Counter
+
+import threading
+import time
+
+# Reddit's documented limit for OAuth clients.
+DEFAULT_REQUESTS_PER_MINUTE = 60
+
+# How many requests may be sent at once after a quiet period.
+DEFAULT_BURST = 10
+
+
+class RateLimiter:
+
+  def __init__(
+      self,
+      rate=DEFAULT_REQUESTS_PER_MINUTE / 60,
+      burst=DEFAULT_BURST,
+      clock=time.monotonic,
+      sleep=time.sleep):
+    """
+    Parameters
+    ----------
+    rate: float
+      Requests per second allowed over time.
+    burst: int
+      The most requests allowed at once; the bucket starts full.
+    clock: function
+      Returns the current time in seconds.
+    sleep: function
+      Waits the given number of seconds.
+    """
+    self.rate = rate
+    self.burst = burst
+    self.clock = clock
+    self.sleep = sleep
+    self.stats = Counter()
+    self._tokens = float(burst)
+    self._updated = clock()
+    self._lock = threading.Lock()
+
+  def acquire(self):
+    """Takes a token, waiting until one is available, and returns the seconds
+    waited. Callers waiting together are served in turn: each one reserves its
+    token (possibly going into debt) and then sleeps until it is due."""
+    with self._lock:
+      now = self.clock()
+      self._tokens = min(
+          self.burst, self._tokens + (now - self._updated) * self.rate)
+      self._updated = now
+      self._tokens -= 1
+      wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+      self.stats['ratelimit.acquired'] += 1
+      if wait > 0:
+        self.stats['ratelimit.waited'] += 1
+        self.stats['ratelimit.wait_ms'] += wait * 1000
+    if wait > 0:
+      self.sleep(wait)
+    return wait
@@ -0,0 +1,48 @@
+from rate_limiter import RateLimiter
+
+import threading
+import unittest
+
+
+class RateLimiterTest(unittest.TestCase):
+
+  def setUp(self):
+    self.now = 0.0
+    self.sleeps = []
+    self.limiter = RateLimiter(
+        rate=2, burst=3, clock=lambda: self.now, sleep=self.sleeps.append)
+
+  def test_acquire_withinBurst_doesNotWait(self):
+    self.assertEqual([self.limiter.acquire() for _ in range(3)], [0, 0, 0])
+    self.assertEqual(self.sleeps, [])
+
+  def test_acquire_pastBurst_spacesRequestsOut(self):
+    waits = [self.limiter.acquire() for _ in range(5)]
+
+    self.assertEqual(waits, [0, 0, 0, 0.5, 1.0])
+    self.assertEqual(self.limiter.stats['ratelimit.waited'], 2)
+    self.assertEqual(self.limiter.stats['ratelimit.wait_ms'], 1500)
+
+  def test_acquire_refillsOverTime(self):
+    for _ in range(3):
+      self.limiter.acquire()
+    self.now += 1.0
+
+    self.assertEqual([self.limiter.acquire() for _ in range(3)], [0, 0, 0.5])
+
+  def test_acquire_fromManyThreads_countsEveryRequest(self):
+    limiter = RateLimiter(rate=1000, burst=1000, sleep=lambda seconds: None)
+    threads = [
+      threading.Thread(target=lambda: [limiter.acquire() for _ in range(100)])
+      for _ in range(8)
+    ]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    self.assertEqual(limiter.stats['ratelimit.acquired'], 800)
+
+
+if __name__ == '__main__':
+  unittest.main()
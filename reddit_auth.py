@@ -0,0 +1,200 @@
+"""
+Creates praw.Reddit clients that keep their OAuth access token between runs.
+
+praw exchanges the bot's password for an access token before its first real
+request, so every cron run paid for an extra round trip to Reddit. Tokens are
+valid for an hour: TokenCache saves them (readable by the owner only) and new
+clients reuse a saved token until shortly before it expires. The number of
+tokens fetched per day is kept alongside to show how often that still happens.
+"""
+
+from datetime import date
+from services.state_store import DEFAULT_STATE_DIR, StateStore
+
+import logging
+import os
+import threading
+import time
+
+# The tokens get a directory of their own: the state directory is shared with
+# files anyone may read.
+DEFAULT_TOKEN_PATH = os.path.join(DEFAULT_STATE_DIR, 'reddit', 'tokens.json')
+
+# A saved token is no longer used this many seconds before it expires, so a run
+# never starts with a token that runs out half way.
+EXPIRY_MARGIN = 300
+
+# How many days of token fetch counts are kept.
+FETCH_HISTORY_DAYS = 7
+
+_SAVE_LOCK = threading.Lock()
+
+
+class TokenCache:
+
+  def __init__(
+      self, path=DEFAULT_TOKEN_PATH, clock=time.time, today=date.today):
+    """
+    Parameters
+    ----------
+    path: str
+      The JSON file the tokens are kept in. It's created with mode 0600, and
+      its directory is made readable by the owner only, so it shouldn't hold
+      anything else.
+    clock: function
+      Returns the current unix time in seconds.
+    today: function
+      Returns the current datetime.date, used to count fetches per day.
+    """
+    self.store = StateStore(path)
+    self.clock = clock
+    self.today = today
+
+  def load(self, key):
+    """Returns the saved token for key as a dict with "access_token",
+    "expires_at" (unix time) and "scopes" keys, or None if there is none that
+    is valid for at least another EXPIRY_MARGIN seconds."""
+    token = self.store.load().get('tokens', {}).get(key)
+    if not token or token.get('expires_at', 0) - EXPIRY_MARGIN <= self.clock():
+      return None
+    return token
+
+  def save(self, key, access_token, expires_at, scopes):
+    """Saves a token that was just fetched for key and returns how many tokens
+    were fetched today, this one included."""
+    # Clients of several accounts may fetch tokens at once in one process.
+    with _SAVE_LOCK:
+      return self._save(key, access_token, expires_at, scopes)
+
+  def _save(self, key, access_token, expires_at, scopes):
+    state = self.store.load()
+    state.setdefault('tokens', {})[key] = {
+      'access_token': access_token,
+      'expires_at': expires_at,
+      'scopes': sorted(scopes or ()),
+    }
+    fetches = state.setdefault('fetches', {})
+    today = self.today().isoformat()
+    fetches[today] = fetches.get(today, 0) + 1
+    for day in sorted(fetches)[:-FETCH_HISTORY_DAYS]:
+      del fetches[day]
+    directory = os.path.dirname(self.store.path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # makedirs leaves the mode of an existing directory alone.
+    os.chmod(directory, 0o700)
+    # StateStore writes through a temporary file created with mode 0600.
+    self.store.save(state)
+    return fetches[today]
+
+  def fetches(self):
+    """Returns a dict mapping ISO dates to the number of tokens fetched."""
+    return self.store.load().get('fetches', {})
+
+
+def install_token_cache(reddit, cache, logger=None):
+  """Makes reddit reuse a token saved in cache and save the tokens it fetches.
+
+  Only password ("script") logins are supported; other clients are left alone.
+
+  Parameters
+  ----------
+  reddit: praw.Reddit
+  cache: TokenCache
+  logger: logging.Logger
+
+  Returns
+  -------
+  bool
+    Whether the cache was installed.
+  """
+  from prawcore import ScriptAuthorizer
+
+  logger = logger if logger is not None else logging.getLogger(__name__)
+  core = getattr(reddit, '_authorized_core', None)
+  authorizer = getattr(core, '_authorizer', None)
+  if not isinstance(authorizer, ScriptAuthorizer):
+    return False
+
+  key = f'{reddit.config.client_id}:{reddit.config.username}'
+  caching_authorizer = token_caching_authorizer(cache, key, logger)(
+      authorizer._authenticator, reddit.config.username, reddit.config.password)
+  token = cache.load(key)
+  if token is not None:
+    caching_authorizer.reuse(token)
+    minutes = (token['expires_at'] - cache.clock()) / 60
+    logger.info(
+        f'Reusing the saved Reddit access token, valid for {minutes:.0f} '
+        f'more minutes.')
+  # The session praw sends its authorized requests through.
+  core._authorizer = caching_authorizer
+  return True
+
+
+def token_caching_authorizer(cache, key, logger):
+  """Returns a prawcore.ScriptAuthorizer class that saves the tokens it fetches
+  in cache (a TokenCache) under key and can reuse a saved one.
+
+  prawcore keeps a token's expiry in ScriptAuthorizer._expiration_timestamp and
+  has no public way to set or read it, so this class is the only place that
+  touches it. requirements.txt pins prawcore to a version that does, and
+  reddit_auth_test fails if that changes.
+  """
+  from prawcore import ScriptAuthorizer
+
+  class TokenCachingAuthorizer(ScriptAuthorizer):
+
+    def reuse(self, token):
+      """Uses a token loaded from the cache instead of fetching one."""
+      self.access_token = token['access_token']
+      # prawcore fetches a new token once this has passed.
+      self._expiration_timestamp = token['expires_at'] - EXPIRY_MARGIN
+      self.scopes = set(token['scopes'])
+
+    def refresh(self):
+      super().refresh()
+      fetched_today = cache.save(
+          key, self.access_token, self._expiration_timestamp, self.scopes)
+      logger.info(f'Fetched a Reddit access token ({fetched_today} today).')
+
+  return TokenCachingAuthorizer
+
+
+def rate_limited_requestor(rate_limiter, before_request=None):
+  """Returns a prawcore.Requestor class that takes a token from rate_limiter
+  (a rate_limiter.RateLimiter, or None) before every request it sends to
+  Reddit, after calling before_request() if given."""
+  from prawcore import Requestor
+
+  class RateLimitedRequestor(Requestor):
+
+    def request(self, *args, **kwargs):
+      if before_request is not None:
+        before_request()
+      if rate_limiter is not None:
+        rate_limiter.acquire()
+      return super().request(*args, **kwargs)
+
+  return RateLimitedRequestor
+
+
+def new_reddit(
+    username,
+    logger=None,
+    token_path=DEFAULT_TOKEN_PATH,
+    rate_limiter=None,
+    before_request=None):
+  """Returns a praw.Reddit client for the praw.ini entry username that keeps
+  its access token in token_path (see TokenCache). If rate_limiter is given,
+  the client's requests count against it, e.g. to share one budget between the
+  clients of many subreddits. If before_request is given, it's called before
+  every request and can stop it by raising."""
+  import praw
+
+  if rate_limiter is None and before_request is None:
+    reddit = praw.Reddit(username)
+  else:
+    reddit = praw.Reddit(
+        username,
+        requestor_class=rate_limited_requestor(rate_limiter, before_request))
+  install_token_cache(reddit, TokenCache(token_path), logger)
+  return reddit
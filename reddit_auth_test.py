@@ -0,0 +1,163 @@
+from datetime import date
+from reddit_auth import EXPIRY_MARGIN, TokenCache, install_token_cache
+from reddit_auth import rate_limited_requestor
+from unittest.mock import MagicMock
+
+import os
+import praw
+import stat
+import tempfile
+import time
+import unittest
+
+
+def script_reddit():
+  """Returns a praw.Reddit that logs in with a password, whose token endpoint
+  answers without going to the network."""
+  reddit = praw.Reddit(
+      client_id='client',
+      client_secret='secret',
+      username='nyknicks-automod',
+      password='hunter2',
+      user_agent='test')
+  authenticator = reddit._authorized_core._authorizer._authenticator
+  response = MagicMock()
+  response.json.return_value = {
+    'access_token': 'token-1', 'expires_in': 3600, 'scope': '*'}
+  authenticator._post = MagicMock(return_value=response)
+  return reddit
+
+
+class TokenCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.path = os.path.join(self.tmp_dir.name, 'state', 'tokens.json')
+    self.now = time.time()
+    self.cache = TokenCache(
+        self.path, clock=lambda: self.now, today=lambda: date(2020, 12, 29))
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def test_save_thenLoad(self):
+    self.cache.save('key', 'token-1', self.now + 3600, {'*'})
+
+    token = self.cache.load('key')
+
+    self.assertEqual(token['access_token'], 'token-1')
+    self.assertEqual(token['scopes'], ['*'])
+    self.assertIsNone(self.cache.load('other key'))
+
+  def test_save_onlyOwnerCanRead(self):
+    self.cache.save('key', 'token-1', self.now + 3600, {'*'})
+
+    self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+  def test_save_existingDirectory_onlyOwnerCanList(self):
+    # As created by another StateStore before any token was saved.
+    os.makedirs(os.path.dirname(self.path), mode=0o755)
+
+    self.cache.save('key', 'token-1', self.now + 3600, {'*'})
+
+    self.assertEqual(
+        stat.S_IMODE(os.stat(os.path.dirname(self.path)).st_mode), 0o700)
+
+  def test_load_aboutToExpire_none(self):
+    self.cache.save('key', 'token-1', self.now + EXPIRY_MARGIN, {'*'})
+
+    self.assertIsNone(self.cache.load('key'))
+
+  def test_save_countsFetchesPerDay(self):
+    self.assertEqual(self.cache.save('key', 'token-1', self.now, {'*'}), 1)
+    self.assertEqual(self.cache.save('key', 'token-2', self.now, {'*'}), 2)
+
+    self.assertEqual(self.cache.fetches(), {'2020-12-29': 2})
+
+
+class InstallTokenCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.cache = TokenCache(os.path.join(self.tmp_dir.name, 'tokens.json'))
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def test_install_token_cache_fetchedTokenIsReusedByNextClient(self):
+    first = script_reddit()
+    self.assertTrue(install_token_cache(first, self.cache))
+    first._authorized_core._set_header_callback()
+
+    second = script_reddit()
+    install_token_cache(second, self.cache)
+    headers = second._authorized_core._set_header_callback()
+
+    self.assertEqual(headers, {'Authorization': 'bearer token-1'})
+    second_authenticator = second._authorized_core._authorizer._authenticator
+    second_authenticator._post.assert_not_called()
+    self.assertEqual(sum(self.cache.fetches().values()), 1)
+
+  def test_install_token_cache_nothingSaved_fetches(self):
+    reddit = script_reddit()
+    install_token_cache(reddit, self.cache)
+
+    reddit._authorized_core._set_header_callback()
+
+    authenticator = reddit._authorized_core._authorizer._authenticator
+    authenticator._post.assert_called_once()
+
+  def test_install_token_cache_expiryKeptWherePrawcoreReadsIt(self):
+    # Fails if prawcore no longer keeps the token's expiry in
+    # _expiration_timestamp (see token_caching_authorizer).
+    reddit = script_reddit()
+    install_token_cache(reddit, self.cache)
+    fetched_after = time.time()
+    reddit._authorized_core._set_header_callback()
+    saved = self.cache.load(
+        f'{reddit.config.client_id}:{reddit.config.username}')
+    self.assertGreater(saved['expires_at'], fetched_after + 3500)
+
+    reused = script_reddit()
+    install_token_cache(reused, self.cache)
+    authorizer = reused._authorized_core._authorizer
+    self.assertTrue(authorizer.is_valid())
+    authorizer.reuse(dict(saved, expires_at=time.time() + EXPIRY_MARGIN))
+    self.assertFalse(authorizer.is_valid())
+
+  def test_install_token_cache_notAScriptLogin_doesNothing(self):
+    self.assertFalse(install_token_cache(MagicMock(), self.cache))
+    self.assertEqual(self.cache.fetches(), {})
+
+
+class RateLimitedRequestorTest(unittest.TestCase):
+
+  def test_request_beforeRequestRaises_notSent(self):
+    session = MagicMock()
+    rate_limiter = MagicMock()
+
+    def before_request():
+      raise RuntimeError('stop')
+
+    requestor = rate_limited_requestor(rate_limiter, before_request)(
+        'redditbot tests', session=session)
+
+    with self.assertRaises(RuntimeError):
+      requestor.request('GET', 'https://oauth.reddit.com/api/v1/me')
+    session.request.assert_not_called()
+    rate_limiter.acquire.assert_not_called()
+
+  def test_request_takesRateLimiterToken(self):
+    session = MagicMock()
+    rate_limiter = MagicMock()
+    requestor = rate_limited_requestor(rate_limiter)(
+        'redditbot tests', session=session)
+
+    requestor.request('GET', 'https://oauth.reddit.com/api/v1/me')
+
+    rate_limiter.acquire.assert_called_once_with()
+    session.request.assert_called_once()
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,251 @@
+"""
+Runs the sidebar and game thread jobs for a subreddit in one process.
+
+Running sidebarbot.py and game_thread_bot.py from two cron lines starts two
+interpreters, logs in to Reddit twice and fetches the same schedule and team
+data from data.nba.net twice every minute. Here the jobs share one NbaService
+(so the second job reuses the responses the first one memoized) and one Reddit
+client. Each job can be turned on by flag; with no flag both run.
+"""
+
+from constants import UTC
+from daemon import run_forever
+from datetime import datetime
+from game_thread_bot import GameThreadBot, gate_watched, run_gate
+from game_thread_bot import thread_hashes, thread_store
+from render_cache import RenderCache
+from team_config import load_team
+from typing import NamedTuple
+
+import logging
+import sidebarbot
+import sys
+import time
+import traceback
+
+JOB_NAMES = ('sidebar', 'game_thread')
+
+
+class JobResult(NamedTuple):
+  name: str
+  # None if the job failed.
+  plan: object
+  elapsed_ms: float
+  # Requests the job sent to data.nba.net.
+  requests: int
+  # Responses the job got from memory or from a concurrent identical request
+  # instead of fetching them again.
+  reused: int
+
+
+def run_jobs(logger, now, jobs, stats):
+  """Runs each job in turn and measures it. A failing job is logged and doesn't
+  stop the ones after it.
+
+  Parameters
+  ----------
+  logger: logging.Logger
+  now: datetime
+  jobs: list
+    (name, function) pairs. Each function is called with now and returns a
+    daemon.WakePlan.
+  stats: services.stats.Stats
+    The stats of the NbaService the jobs share.
+
+  Returns
+  -------
+  list
+    A JobResult per job, in the same order.
+  """
+  results = []
+  for name, job in jobs:
+    requests_before = stats['http.requests']
+    reused_before = stats['memo.hit'] + stats['singleflight.follower']
+    started = time.monotonic()
+    try:
+      plan = job(now)
+    except Exception:
+      logger.error(traceback.format_exc())
+      plan = None
+    results.append(JobResult(
+        name,
+        plan,
+        (time.monotonic() - started) * 1000,
+        stats['http.requests'] - requests_before,
+        stats['memo.hit'] + stats['singleflight.follower'] - reused_before))
+  return results
+
+
+def log_report(logger, results, elapsed_ms):
+  """Logs how long the run and each job took, and what sharing one process
+  saved compared with running the jobs separately."""
+  for result in results:
+    status = 'failed' if result.plan is None else 'done'
+    logger.info(
+        f'Job {result.name} {status} in {result.elapsed_ms:.0f} ms: '
+        f'{result.requests} NBA Data requests, '
+        f'{result.reused} responses reused.')
+  # Responses the first job reused would have been reused by a separate run too.
+  saved = sum(result.reused for result in results[1:])
+  logger.info(
+      f'Ran {len(results)} jobs in {elapsed_ms:.0f} ms. Sharing one process '
+      f'saved {saved} NBA Data fetches and {max(0, len(results) - 1)} '
+      f'interpreter start-ups and Reddit logins.')
+
+
+if __name__ == '__main__':
+  from optparse import OptionParser
+
+  import logging.config
+
+  parser = OptionParser(usage='%prog [options] subreddit')
+  parser.add_option(
+      "-s",
+      "--sidebar",
+      action="store_true",
+      dest="sidebar",
+      default=False,
+      help="Update the sidebar.")
+  parser.add_option(
+      "-g",
+      "--game_thread",
+      action="store_true",
+      dest="game_thread",
+      default=False,
+      help="Create or update the game thread.")
+  parser.add_option(
+      "-t",
+      "--tank_standings",
+      dest="tank",
+      help="Print the race to be worst instead of best, if enabled.",
+      metavar='yes|no')
+  parser.add_option(
+      "-u",
+      "--user",
+      dest="username",
+      help="Reddit account for the bots to run as.",
+      metavar='[username]')
+  parser.add_option(
+      "--team",
+      dest="team",
+      help="The team the bots run for, by tri code, name or subreddit. "
+           "Defaults to the team of the subreddit.",
+      metavar='[team]')
+  parser.add_option(
+      "-d",
+      "--daemon",
+      action="store_true",
+      dest="daemon",
+      default=False,
+      help="Keep running and wake up whenever a job may have work to do.")
+  parser.add_option(
+      "-f",
+      "--force",
+      action="store_true",
+      dest="force",
+      default=False,
+      help="Run the game thread job even if its last run said there is "
+           "nothing to do yet.")
+  (options, args) = parser.parse_args()
+
+  logging.config.fileConfig('logging.conf')
+  logger = logging.getLogger('redditbot')
+
+  if len(args) != 1:
+    logger.error(f'Invalid command line arguments: {args}')
+    raise SystemExit(f'Usage: {sys.argv[0]} [options] subreddit')
+
+  subreddit_name = args[0]
+  try:
+    team = load_team(options.team or subreddit_name, options.username)
+  except ValueError as e:
+    logger.error(e)
+    raise SystemExit(f'{e} Pass --team for subreddits of no team.')
+  selected = [
+    name for name in JOB_NAMES if getattr(options, name)] or list(JOB_NAMES)
+  yes = set(['yes', 'y', 'true'])
+  tank_standings = bool(options.tank and options.tank.lower() in yes)
+  logger.info(
+      f'Using subreddit "{subreddit_name}", team {team.tri_code} and user '
+      f'"{team.username}". '
+      f'Jobs: {", ".join(selected)}.')
+
+  gate = run_gate(subreddit_name)
+  if selected == ['game_thread'] and not options.daemon and not options.force \
+      and gate.is_closed(datetime.now(UTC)):
+    raise SystemExit(0)
+
+  from services.nba_service import NbaService
+
+  nba_service = NbaService(logger)
+  # The sidebar job always needs Reddit. Without it the game thread bot logs in
+  # only when it has something to post.
+  reddit = None
+  if 'sidebar' in selected:
+    from reddit_auth import new_reddit
+    reddit = new_reddit(team.username, logger)
+  hashes = sidebarbot.sidebar_hashes(subreddit_name)
+  bot = GameThreadBot(
+      logger,
+      nba_service,
+      None,
+      reddit,
+      subreddit_name,
+      team,
+      thread_store(subreddit_name),
+      thread_hashes(subreddit_name),
+      render_cache=RenderCache() if options.daemon else None)
+
+  def sidebar_job(now):
+    return sidebarbot.execute(
+        logger,
+        now,
+        subreddit_name,
+        tank_standings,
+        team,
+        nba_service,
+        reddit,
+        hashes)
+
+  def game_thread_job(now):
+    bot.now = now
+    return bot.run()
+
+  all_jobs = {'sidebar': sidebar_job, 'game_thread': game_thread_job}
+
+  def run_once(now):
+    nba_service.start_run()
+    jobs = [(name, all_jobs[name]) for name in selected]
+    if not options.daemon and not options.force and gate.is_closed(now):
+      logger.info('Skipping the game thread job: nothing to do yet.')
+      jobs = [job for job in jobs if job[0] != 'game_thread']
+    if not jobs:
+      return None
+    started = time.monotonic()
+    results = run_jobs(logger, now, jobs, nba_service.stats)
+    log_report(logger, results, (time.monotonic() - started) * 1000)
+    nba_service.log_stats()
+
+    for result in results:
+      if result.name == 'game_thread' and not options.daemon:
+        if result.plan is None:
+          gate.open()
+        else:
+          gate.close_until(
+              now,
+              result.plan.wake_at,
+              result.plan.reason,
+              gate_watched(nba_service, team, now))
+    plans = [result.plan for result in results if result.plan is not None]
+    if not plans:
+      raise RuntimeError('Every job failed.')
+    return min(plans, key=lambda plan: plan.wake_at)
+
+  with nba_service:
+    if options.daemon:
+      run_forever(logger, run_once)
+    else:
+      try:
+        run_once(datetime.now(UTC))
+      except:
+        logger.error(traceback.format_exc())
@@ -0,0 +1,84 @@
+from constants import UTC
+from datetime import datetime
+from game_thread_bot import GameThreadBot
+from redditbot import log_report, run_jobs
+from services.fake_nba_service import FakeNbaService
+from unittest.mock import MagicMock
+
+import logging
+import sidebarbot
+import unittest
+
+
+class RedditBotTest(unittest.TestCase):
+
+  def setUp(self):
+    logging.basicConfig(level=logging.ERROR)
+    self.logger = logging.getLogger(__name__)
+    self.nba_service = FakeNbaService()
+    self.reddit = MagicMock()
+    subreddit = self.reddit.subreddit.return_value
+    subreddit.mod.settings.return_value = {'description': ''}
+    subreddit.new.return_value = []
+    # 1 hour before tip-off, so the game thread bot has work to do.
+    self.now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+
+  def sidebar_job(self, now):
+    return sidebarbot.execute(
+        self.logger,
+        now,
+        'test_NYKnicks',
+        False,
+        nba_service=self.nba_service,
+        reddit=self.reddit)
+
+  def game_thread_job(self, now):
+    return GameThreadBot(
+        self.logger, self.nba_service, now, self.reddit, 'test_NYKnicks').run()
+
+  def test_run_jobs_secondJobReusesResponses(self):
+    results = run_jobs(
+        self.logger,
+        self.now,
+        [('sidebar', self.sidebar_job), ('game_thread', self.game_thread_job)],
+        self.nba_service.stats)
+
+    self.assertEqual([r.name for r in results], ['sidebar', 'game_thread'])
+    self.assertTrue(all(r.plan is not None for r in results))
+    self.assertEqual(results[0].reused, 0)
+    # The schedule and the teams.
+    self.assertEqual(results[1].reused, 2)
+    # Only the box score was fetched for the game thread.
+    self.assertTrue(
+        self.nba_service.fetched_urls[-1].endswith('_boxscore.json'))
+    self.assertEqual(len(self.nba_service.fetched_urls), 7)
+
+  def test_run_jobs_failingJob_runsTheRest(self):
+    def failing_job(now):
+      raise ValueError('boom')
+
+    results = run_jobs(
+        self.logger,
+        self.now,
+        [('failing', failing_job), ('sidebar', self.sidebar_job)],
+        self.nba_service.stats)
+
+    self.assertIsNone(results[0].plan)
+    self.assertIsNotNone(results[1].plan)
+
+  def test_log_report(self):
+    results = run_jobs(
+        self.logger,
+        self.now,
+        [('sidebar', self.sidebar_job), ('game_thread', self.game_thread_job)],
+        self.nba_service.stats)
+    logger = MagicMock()
+
+    log_report(logger, results, 12.3)
+
+    self.assertIn(
+        'saved 2 NBA Data fetches', logger.info.call_args_list[-1][0][0])
+
+
+if __name__ == '__main__':
+  unittest.main()
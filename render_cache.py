@@ -0,0 +1,60 @@
+"""
+Reuses rendered sections of a thread whose inputs haven't changed.
+
+A section is rendered by a function from a tuple of exactly the (immutable)
+values it reads, e.g. the team names and the two TeamStatLines. The cache keeps
+the last inputs and text of every section and only calls the function again
+when the inputs differ. Because the inputs themselves are the key, a section
+can't be reused from data it didn't see.
+
+The cache is only kept in memory, so it only pays off for bots that keep
+running: the game thread bot's --daemon mode, redditbot.py --daemon, fanout.py
+--daemon and worker.py. Cron runs don't get one.
+"""
+
+from collections import Counter
+
+import time
+
+
+class RenderCache:
+
+  def __init__(self, clock=time.perf_counter):
+    """
+    Parameters
+    ----------
+    clock: function
+      Returns the current time in seconds; used to time renders.
+    """
+    self.clock = clock
+    self.stats = Counter()
+    self._sections = {}
+
+  def render(self, section, build, inputs):
+    """Returns build(*inputs), or the text it returned last time for section if
+    inputs are equal to the ones it was built from."""
+    cached = self._sections.get(section)
+    if cached is not None and cached[0] == inputs:
+      self.stats[f'render.hit.{section}'] += 1
+      return cached[1]
+    started = self.clock()
+    text = build(*inputs)
+    self.stats[f'render.ms.{section}'] += (self.clock() - started) * 1000
+    self.stats[f'render.miss.{section}'] += 1
+    self._sections[section] = (inputs, text)
+    return text
+
+  def format_stats(self):
+    """Returns a line per section with its hit rate and mean render time."""
+    sections = sorted(
+        key[len('render.miss.'):] for key in self.stats
+        if key.startswith('render.miss.'))
+    lines = []
+    for section in sections:
+      hits = self.stats[f'render.hit.{section}']
+      misses = self.stats[f'render.miss.{section}']
+      ms = self.stats[f'render.ms.{section}'] / misses
+      lines.append(
+          f'Section {section}: reused {hits} of {hits + misses} times, '
+          f'{ms:.2f} ms per render.')
+    return lines
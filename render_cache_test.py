@@ -0,0 +1,53 @@
+from render_cache import RenderCache
+
+import unittest
+
+
+class RenderCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    self.now = 0.0
+    self.cache = RenderCache(clock=lambda: self.now)
+    self.builds = []
+
+  def build(self, name, score):
+    self.builds.append((name, score))
+    self.now += 0.002
+    return f'{name}: {score}'
+
+  def test_render_sameInputs_reused(self):
+    self.assertEqual(
+        self.cache.render('score', self.build, ('NYK', 1)), 'NYK: 1')
+    self.assertEqual(
+        self.cache.render('score', self.build, ('NYK', 1)), 'NYK: 1')
+
+    self.assertEqual(self.builds, [('NYK', 1)])
+    self.assertEqual(self.cache.stats['render.hit.score'], 1)
+    self.assertEqual(self.cache.stats['render.miss.score'], 1)
+
+  def test_render_changedInputs_renderedAgain(self):
+    self.cache.render('score', self.build, ('NYK', 1))
+    self.assertEqual(
+        self.cache.render('score', self.build, ('NYK', 2)), 'NYK: 2')
+
+    self.assertEqual(len(self.builds), 2)
+
+  def test_render_sectionsAreIndependent(self):
+    self.cache.render('home', self.build, ('NYK', 1))
+    self.cache.render('road', self.build, ('CLE', 1))
+    self.cache.render('home', self.build, ('NYK', 1))
+
+    self.assertEqual(self.builds, [('NYK', 1), ('CLE', 1)])
+
+  def test_format_stats(self):
+    self.cache.render('score', self.build, ('NYK', 1))
+    self.cache.render('score', self.build, ('NYK', 1))
+    self.cache.render('score', self.build, ('NYK', 1))
+
+    self.assertEqual(
+        self.cache.format_stats(),
+        ['Section score: reused 2 of 3 times, 2.00 ms per render.'])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,86 @@
+"""
+Lets a cron job skip runs that can't have anything to do.
+
+After a full run the bot records the earliest time it could next need to act
+(its daemon.WakePlan). The next cron invocations read that one small file
+before importing praw or the NBA service and exit straight away while the time
+hasn't come.
+
+The gate also remembers the version (e.g. the ETag) of the responses the plan
+was made from, such as the team's schedule, and opens as soon as another
+version of any of them is cached: when the sidebar bot, or any other bot
+sharing the HTTP cache, fetches a schedule that moved a game earlier, the next
+cron run of the game thread bot is a full one. If nothing fetches them, the
+gate is still only trusted for max_horizon after it was written. A missing or
+unreadable file, a file written for another configuration or a clock that went
+backwards all open the gate, and a failed run opens it explicitly.
+"""
+
+from datetime import datetime
+
+# Bump to ignore gates written by older versions.
+GATE_VERSION = 1
+
+
+class RunGate:
+
+  def __init__(self, store, key, max_horizon, version_of=None):
+    """
+    Parameters
+    ----------
+    store: services.state_store.StateStore
+      Where the gate is kept.
+    key: str
+      Identifies the configuration (e.g. the subreddit) the gate is for.
+    max_horizon: datetime.timedelta
+      The longest the gate stays closed after it was written.
+    version_of: function
+      Returns the current version of a response by URL (anything that can be
+      stored as JSON, e.g. services.http_cache.HttpCache.validators), reading
+      only local files. Without it, responses aren't watched.
+    """
+    self.store = store
+    self.key = key
+    self.max_horizon = max_horizon
+    self.version_of = version_of
+
+  def is_closed(self, now):
+    """Returns whether a run at datetime now can be skipped."""
+    state = self.store.load()
+    if state.get('version') != GATE_VERSION or state.get('key') != self.key:
+      return False
+    try:
+      written_at = datetime.fromisoformat(state['written_at'])
+      open_at = datetime.fromisoformat(state['open_at'])
+    except (KeyError, TypeError, ValueError):
+      return False
+    if written_at > now or open_at - written_at > self.max_horizon:
+      return False
+    if now >= open_at:
+      return False
+    versions = state.get('versions') or {}
+    return self.version_of is None or all(
+        self.version_of(url) == version for url, version in versions.items())
+
+  def close_until(self, now, open_at, reason='', watched=()):
+    """Skips the runs between datetimes now and open_at (capped at
+    max_horizon), unless a new version of one of the watched URLs is cached
+    before then."""
+    open_at = min(open_at, now + self.max_horizon)
+    if open_at <= now:
+      self.open()
+      return
+    state = {
+      'version': GATE_VERSION,
+      'key': self.key,
+      'written_at': now.isoformat(),
+      'open_at': open_at.isoformat(),
+      'reason': reason,
+    }
+    if self.version_of is not None and watched:
+      state['versions'] = {url: self.version_of(url) for url in watched}
+    self.store.save(state)
+
+  def open(self):
+    """Makes the next run a full one."""
+    self.store.clear()
@@ -0,0 +1,91 @@
+from constants import UTC
+from datetime import datetime, timedelta
+from run_gate import RunGate
+from services.state_store import StateStore
+
+import os
+import tempfile
+import unittest
+
+
+class RunGateTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.store = StateStore(os.path.join(self.tmp_dir.name, 'gate.json'))
+    self.gate = RunGate(self.store, 'NYKnicks', timedelta(hours=1))
+    self.now = datetime(2020, 12, 29, 12, 0, 0, 0, UTC)
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def test_is_closed_nothingWritten_open(self):
+    self.assertFalse(self.gate.is_closed(self.now))
+
+  def test_is_closed_beforeOpenTime_closed(self):
+    self.gate.close_until(self.now, self.now + timedelta(minutes=30))
+
+    self.assertTrue(self.gate.is_closed(self.now + timedelta(minutes=29)))
+    self.assertFalse(self.gate.is_closed(self.now + timedelta(minutes=30)))
+
+  def test_close_until_cappedAtMaxHorizon(self):
+    self.gate.close_until(self.now, self.now + timedelta(days=1))
+
+    self.assertTrue(self.gate.is_closed(self.now + timedelta(minutes=59)))
+    self.assertFalse(self.gate.is_closed(self.now + timedelta(hours=1)))
+
+  def test_close_until_inThePast_opens(self):
+    self.gate.close_until(self.now, self.now + timedelta(minutes=30))
+    self.gate.close_until(self.now, self.now - timedelta(minutes=1))
+
+    self.assertFalse(self.gate.is_closed(self.now))
+
+  def test_is_closed_otherKey_open(self):
+    self.gate.close_until(self.now, self.now + timedelta(minutes=30))
+    other = RunGate(self.store, 'test_NYKnicks', timedelta(hours=1))
+
+    self.assertFalse(other.is_closed(self.now))
+
+  def test_is_closed_clockWentBackwards_open(self):
+    self.gate.close_until(self.now, self.now + timedelta(minutes=30))
+
+    self.assertFalse(self.gate.is_closed(self.now - timedelta(minutes=1)))
+
+  def test_is_closed_horizonShortened_open(self):
+    self.gate.close_until(self.now, self.now + timedelta(minutes=30))
+    shorter = RunGate(self.store, 'NYKnicks', timedelta(minutes=10))
+
+    self.assertFalse(shorter.is_closed(self.now))
+
+  def test_is_closed_corruptState_open(self):
+    self.store.save({'version': 1, 'key': 'NYKnicks', 'open_at': 'soon'})
+    self.assertFalse(self.gate.is_closed(self.now))
+
+  def test_is_closed_watchedResponseChanged_open(self):
+    versions = {'schedule.json': {'etag': '"1"', 'last_modified': None}}
+    gate = RunGate(self.store, 'NYKnicks', timedelta(hours=1), versions.get)
+    gate.close_until(
+        self.now, self.now + timedelta(minutes=30), watched=['schedule.json'])
+    self.assertTrue(gate.is_closed(self.now))
+
+    # E.g. the sidebar bot fetched a schedule that moved a game earlier.
+    versions['schedule.json'] = {'etag': '"2"', 'last_modified': None}
+
+    self.assertFalse(gate.is_closed(self.now))
+
+  def test_is_closed_watchedResponseNotCached_closed(self):
+    gate = RunGate(self.store, 'NYKnicks', timedelta(hours=1), {}.get)
+    gate.close_until(
+        self.now, self.now + timedelta(minutes=30), watched=['schedule.json'])
+
+    self.assertTrue(gate.is_closed(self.now))
+
+  def test_open(self):
+    self.gate.close_until(self.now, self.now + timedelta(minutes=30))
+    self.gate.open()
+
+    self.assertFalse(self.gate.is_closed(self.now))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,70 @@
+"""
+An asyncio flavor of NbaService. It has the same methods, but each one returns
+an awaitable so callers can fetch independent endpoints concurrently, e.g.
+
+    players, teams = await asyncio.gather(
+        async_service.players(year), async_service.teams(year))
+
+requests is a blocking library, so each call runs the wrapped NbaService method
+on an executor thread. All calls therefore share the wrapped service's
+keep-alive connection pool, caches and stats.
+
+Every NbaService method that returns NBA data is wrapped. The ones in
+NOT_WRAPPED manage the service itself (its run budget, stats and connections)
+and never wait on the network, so they're called on the wrapped service.
+"""
+
+from services.nba_service import NbaService
+
+import asyncio
+import functools
+
+NOT_WRAPPED = frozenset(['close', 'log_stats', 'start_run'])
+
+
+class AsyncNbaService:
+
+  def __init__(self, nba_service: NbaService, executor=None):
+    """
+    Parameters
+    ----------
+    nba_service: NbaService
+      The service that does the actual work.
+    executor: concurrent.futures.Executor
+      Where the blocking calls run. If None, the event loop's default executor
+      is used.
+    """
+    self.nba_service = nba_service
+    self.executor = executor
+
+  async def boxscore(self, start_date_est, game_id):
+    return await self._call(self.nba_service.boxscore, start_date_est, game_id)
+
+  async def conference_standings(self):
+    return await self._call(self.nba_service.conference_standings)
+
+  async def current_year(self):
+    return await self._call(self.nba_service.current_year)
+
+  async def players(self, year, now=None):
+    return await self._call(self.nba_service.players, year, now)
+
+  async def season_year(self, now):
+    return await self._call(self.nba_service.season_year, now)
+
+  async def roster(self, team, year, now=None):
+    return await self._call(self.nba_service.roster, team, year, now)
+
+  async def schedule(self, team, year, now=None):
+    return await self._call(self.nba_service.schedule, team, year, now)
+
+  async def scoreboard(self, start_date_est):
+    return await self._call(self.nba_service.scoreboard, start_date_est)
+
+  async def teams(self, year, now=None):
+    return await self._call(self.nba_service.teams, year, now)
+
+  async def _call(self, method, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        self.executor, functools.partial(method, *args))
@@ -0,0 +1,87 @@
+from constants import UTC
+from datetime import datetime
+from services.async_nba_service import NOT_WRAPPED, AsyncNbaService
+from services.fake_nba_service import FakeNbaService
+from services.nba_service import NbaService
+
+import asyncio
+import logging.config
+import time
+import unittest
+
+
+class SlowFakeNbaService(FakeNbaService):
+  """Takes 200ms to answer each request, like a slow network."""
+
+  def _download(self, endpoint, url):
+    time.sleep(0.2)
+    return super()._download(endpoint, url)
+
+
+class AsyncNbaServiceTest(unittest.TestCase):
+
+  def setUp(self):
+    logging.basicConfig(level=logging.ERROR)
+
+  def test_publicMethods_allWrapped(self):
+    public = {
+      name for name in dir(NbaService)
+      if not name.startswith('_') and callable(getattr(NbaService, name))}
+
+    self.assertEqual(
+        {name for name in public if not hasattr(AsyncNbaService, name)},
+        NOT_WRAPPED)
+
+  def test_methods_matchSyncService(self):
+    now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    nba_service = FakeNbaService()
+    async_nba_service = AsyncNbaService(FakeNbaService())
+
+    async def games(schedule):
+      # Schedules compare by identity.
+      return list((await schedule).games)
+
+    async def fetch_all():
+      return await asyncio.gather(
+          async_nba_service.boxscore('20201227', '0022000036'),
+          async_nba_service.conference_standings(),
+          async_nba_service.current_year(),
+          async_nba_service.players('2020'),
+          async_nba_service.roster('knicks', '2020'),
+          games(async_nba_service.schedule('knicks', '2020')),
+          async_nba_service.scoreboard('20201229'),
+          async_nba_service.season_year(now),
+          async_nba_service.teams('2020'))
+
+    self.assertEqual(asyncio.run(fetch_all()), [
+      nba_service.boxscore('20201227', '0022000036'),
+      nba_service.conference_standings(),
+      nba_service.current_year(),
+      nba_service.players('2020'),
+      nba_service.roster('knicks', '2020'),
+      list(nba_service.schedule('knicks', '2020').games),
+      nba_service.scoreboard('20201229'),
+      nba_service.season_year(now),
+      nba_service.teams('2020'),
+    ])
+
+  def test_gather_fetchesConcurrently(self):
+    async_nba_service = AsyncNbaService(SlowFakeNbaService())
+
+    async def fetch_all():
+      return await asyncio.gather(
+          async_nba_service.players('2020'),
+          async_nba_service.roster('knicks', '2020'),
+          async_nba_service.teams('2020'),
+          async_nba_service.conference_standings())
+
+    start = time.perf_counter()
+    asyncio.run(fetch_all())
+    elapsed = time.perf_counter() - start
+
+    # Sequentially this would take at least 800ms.
+    self.assertLess(elapsed, 0.6)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -1,44 +1,32 @@
 """
+A stand-in for NbaService that serves responses from services/testdata instead
+of the network. Everything above the transport (response parsing, TTLs,
+memoization and the optional shared cache) is inherited from NbaService so
+tests exercise the same code.
 """
 
 from services.nba_service import NbaService
 
-import json
+import logging
 
 
 class FakeNbaService(NbaService):
 
-  def __init__(self, logger=None):
-    pass
-
-  def boxscore(self, start_date_est, game_id):
-    return self._json(f'{game_id}_boxscore.json')
-
-  def conference_standings(self):
-    return self._json('standings_conference.json')['league']['standard']
-
-  def current_year(self):
-    return '2020'
-
-  def players(self, year):
-    return self._json('players.json')['league']['standard']
-
-  def roster(self, team, year):
-    data = self._json('roster.json')
-    return set(
-      map(lambda p: p['personId'], data['league']['standard']['players']))
-
-  def schedule(self, team, year):
-    return self._json('schedule.json')
-
-  def teams(self, year):
-    teams = self._json('teams.json')
-    teams_map = dict()
-    for team in teams['league']['standard']:
-      teams_map[team['teamId']] = team
-    return teams_map
-
-  @staticmethod
-  def _json(file_name):
-    with open(f'services/testdata/{file_name}', 'r') as f:
-      return json.loads(f.read().encode('utf-8'))
+  def __init__(
+      self, logger=None, ttls=None, memo_size=None, clock=None, cache_dir=None):
+    kwargs = {'ttls': ttls}
+    if memo_size is not None:
+      kwargs['memo_size'] = memo_size
+    if clock is not None:
+      kwargs['clock'] = clock
+    super().__init__(
+        logger if logger is not None else logging.getLogger(__name__),
+        cache_dir=cache_dir,
+        **kwargs)
+    # Every URL that went past the memo to the (fake) network, in order.
+    self.fetched_urls = []
+
+  def _download(self, endpoint, url):
+    self.fetched_urls.append(url)
+    with open(f'services/testdata/{url.split("/")[-1]}', 'rb') as f:
+      return f.read()
@@ -0,0 +1,136 @@
+"""
+Decides what the game thread bots of many teams should do from the league-wide
+scoreboard instead of each team's schedule.
+
+A team's schedule.json is about 240 KB and lists the whole season, but all a
+run needs to know is whether the team plays around now. The daily scoreboard
+lists every game of the day with its status, so one request answers that for
+every team. ScoreboardPlanner fetches the scoreboards of the days that can
+matter right now (usually just today, Eastern time) and computes the action of
+every configured team in one pass. A team that isn't on the scoreboard has no
+game today, and its plan says to check again at midnight (Eastern time), when
+the next day's scoreboard is the one that matters. Only the bots of teams the
+planner doesn't know about fall back to their team's schedule.
+"""
+
+from constants import EASTERN_TIMEZONE
+from datetime import datetime, time, timedelta
+from enum import Enum
+from services.models import GAME_FINAL
+from services.season_calendar import is_postponed
+from typing import NamedTuple, Optional
+
+# A game thread is created this long before tip-off.
+GAME_THREAD_LEAD_TIME = timedelta(hours=1)
+
+# Will ignore posts older than this many hours
+MAX_POST_AGE_HOURS = 6
+
+
+class Action(Enum):
+  DO_GAME_THREAD = 1
+  DO_POST_GAME_THREAD = 2
+  DO_NOTHING = 3
+
+
+class GamePlan(NamedTuple):
+  action: Action
+  # The game of the thread. With DO_NOTHING, the team's next game on the
+  # scoreboard, if any, which says when there will be something to do.
+  game: Optional['services.models.Game']
+  # With DO_NOTHING and no game: when the scoreboards can next have one.
+  recheck_at: Optional[datetime] = None
+
+
+def plan_games(games, tri_codes, now):
+  """Returns a dict mapping each of tri_codes to its GamePlan at now. Postponed
+  games (see season_calendar.is_postponed) are skipped. A team that has nothing
+  left to do in games is rechecked at next_midnight(now).
+
+  Parameters
+  ----------
+  games: iterable
+    services.models.Game from scoreboards, with their status.
+  tri_codes: iterable
+    The teams to plan for.
+  now: datetime
+  """
+  tri_codes = set(tri_codes)
+  games_by_team = {}
+  for game in sorted(games, key=lambda game: game.start_time_utc):
+    if is_postponed(game, now):
+      continue
+    for side in (game.home, game.road):
+      if side.tri_code in tri_codes:
+        games_by_team.setdefault(side.tri_code, []).append(game)
+
+  off_day = GamePlan(Action.DO_NOTHING, None, next_midnight(now))
+  plans = {}
+  post_age = timedelta(hours=MAX_POST_AGE_HOURS)
+  for tri_code in tri_codes:
+    plan = off_day
+    for game in games_by_team.get(tri_code, ()):
+      if game.status == GAME_FINAL:
+        if game.start_time_utc + post_age >= now:
+          plan = GamePlan(Action.DO_POST_GAME_THREAD, game)
+      elif game.start_time_utc - GAME_THREAD_LEAD_TIME <= now:
+        plan = GamePlan(Action.DO_GAME_THREAD, game)
+        break
+      else:
+        # The next game. An earlier post game thread is still kept up to date.
+        if plan is off_day:
+          plan = GamePlan(Action.DO_NOTHING, game)
+        break
+    plans[tri_code] = plan
+  return plans
+
+
+def next_midnight(now):
+  """Returns the start of the day after now's, Eastern time."""
+  tomorrow = now.astimezone(EASTERN_TIMEZONE).date() + timedelta(days=1)
+  return EASTERN_TIMEZONE.localize(datetime.combine(tomorrow, time()))
+
+
+def scoreboard_dates(now):
+  """Returns the days (yyyyMMdd, Eastern time) whose games can need a thread at
+  now: today's, and yesterday's while its late games may still need a post game
+  thread."""
+  return sorted({
+      (now - timedelta(hours=MAX_POST_AGE_HOURS))
+          .astimezone(EASTERN_TIMEZONE).strftime('%Y%m%d'),
+      now.astimezone(EASTERN_TIMEZONE).strftime('%Y%m%d'),
+  })
+
+
+class ScoreboardPlanner:
+
+  def __init__(self, nba_service, tri_codes):
+    """
+    Parameters
+    ----------
+    nba_service: NbaService
+    tri_codes: iterable
+      The teams whose bots use this planner.
+    """
+    self.nba_service = nba_service
+    self.tri_codes = frozenset(tri_codes)
+    self._last = None
+
+  def plans(self, now):
+    """Returns a dict mapping the tri code of every configured team to its
+    GamePlan at now. Calls with the same now (e.g. from the bots of
+    one fan-out cycle) share one computation."""
+    if self._last is not None and self._last[0] == now:
+      return self._last[1]
+    games = {}
+    for start_date_est in scoreboard_dates(now):
+      for game in self.nba_service.scoreboard(start_date_est):
+        games[game.game_id] = game
+    plans = plan_games(games.values(), self.tri_codes, now)
+    self._last = (now, plans)
+    return plans
+
+  def plan(self, now, tri_code):
+    """Returns the GamePlan of one team, or None if it isn't one of the
+    configured teams."""
+    return self.plans(now).get(tri_code)
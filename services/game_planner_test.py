@@ -0,0 +1,103 @@
+from constants import UTC
+from datetime import datetime, timedelta
+from services.fake_nba_service import FakeNbaService
+from services.game_planner import Action, GamePlan, ScoreboardPlanner
+from services.game_planner import next_midnight, plan_games, scoreboard_dates
+from services.models import GAME_POSTPONED
+
+import logging
+import unittest
+
+# services/testdata/scoreboard.json has four games on 20201229: ORL@OKC at
+# 20:00 UTC (final), LAL@SAS at 22:30 (in progress), NYK@CLE at 00:00 and
+# BOS@MEM at 01:00 (both scheduled).
+NOW = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+
+
+class GamePlannerTest(unittest.TestCase):
+
+  def setUp(self):
+    logging.basicConfig(level=logging.ERROR)
+    self.nba_service = FakeNbaService()
+    self.games = self.nba_service.scoreboard('20201229')
+
+  def planner(self, tri_codes):
+    return ScoreboardPlanner(self.nba_service, tri_codes)
+
+  def test_plan_finalGame_postGameThread(self):
+    for tri_code in ('ORL', 'OKC'):
+      plan = self.planner([tri_code]).plan(NOW, tri_code)
+      self.assertEqual(plan.action, Action.DO_POST_GAME_THREAD)
+      self.assertEqual(plan.game.game_url_code, '20201229/ORLOKC')
+
+  def test_plan_gameInProgress_gameThread(self):
+    plan = self.planner(['SAS']).plan(NOW, 'SAS')
+    self.assertEqual(plan.action, Action.DO_GAME_THREAD)
+    self.assertEqual(plan.game.game_url_code, '20201229/LALSAS')
+
+  def test_plan_1HourBefore_gameThread(self):
+    plan = self.planner(['NYK']).plan(NOW, 'NYK')
+    self.assertEqual(plan.action, Action.DO_GAME_THREAD)
+    self.assertEqual(plan.game.game_url_code, '20201229/NYKCLE')
+
+  def test_plan_tooEarly_doNothingWithNextGame(self):
+    plan = self.planner(['BOS']).plan(NOW, 'BOS')
+    self.assertEqual(plan.action, Action.DO_NOTHING)
+    self.assertEqual(plan.game.game_url_code, '20201229/BOSMEM')
+
+  def test_plan_notOnScoreboard_recheckAtMidnight(self):
+    planner = self.planner(['NYK', 'TOR'])
+
+    self.assertEqual(
+        planner.plan(NOW, 'TOR'),
+        GamePlan(
+            Action.DO_NOTHING, None, datetime(2020, 12, 30, 5, 0, 0, 0, UTC)))
+    self.assertIsNone(planner.plan(NOW, 'BOS'))
+
+  def test_plan_games_finalTooOld_doNothing(self):
+    plans = plan_games(self.games, ['ORL'], NOW + timedelta(hours=4))
+    self.assertEqual(
+        plans,
+        {'ORL': GamePlan(Action.DO_NOTHING, None, next_midnight(NOW))})
+
+  def test_plan_games_postponedGame_skipped(self):
+    games = [
+      game._replace(extended_status=GAME_POSTPONED)
+      if game.game_url_code == '20201229/NYKCLE' else game
+      for game in self.games]
+
+    plans = plan_games(games, ['NYK', 'CLE', 'SAS'], NOW)
+
+    self.assertIsNone(plans['NYK'].game)
+    self.assertIsNone(plans['CLE'].game)
+    self.assertEqual(plans['SAS'].action, Action.DO_GAME_THREAD)
+
+  def test_plans_manyTeams_fetchesScoreboardOnce(self):
+    nba_service = FakeNbaService()
+    planner = ScoreboardPlanner(
+        nba_service, ['ORL', 'OKC', 'LAL', 'SAS', 'NYK', 'CLE', 'TOR'])
+
+    plans = {
+        tri_code: planner.plan(NOW, tri_code) for tri_code in planner.tri_codes}
+
+    self.assertEqual(
+        nba_service.fetched_urls,
+        ['http://data.nba.net/prod/v2/20201229/scoreboard.json'])
+    self.assertEqual(
+        sorted(
+            tri_code for tri_code, plan in plans.items()
+            if plan.recheck_at is None),
+        ['CLE', 'LAL', 'NYK', 'OKC', 'ORL', 'SAS'])
+
+  def test_scoreboard_dates_evening_today(self):
+    self.assertEqual(scoreboard_dates(NOW), ['20201229'])
+
+  def test_scoreboard_dates_afterMidnight_includesYesterday(self):
+    # 01:30 Eastern on Dec 30th: the late games of Dec 29th may still need a
+    # post game thread.
+    now = datetime(2020, 12, 30, 6, 30, 0, 0, UTC)
+    self.assertEqual(scoreboard_dates(now), ['20201229', '20201230'])
+
+
+if __name__ == '__main__':
+  unittest.main()
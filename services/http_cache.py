@@ -0,0 +1,128 @@
+"""
+A persistent, on-disk HTTP cache for conditional GET requests.
+
+For every URL it stores the response body along with its ETag and Last-Modified
+validators. Callers send the validators back as If-None-Match and
+If-Modified-Since headers and reuse the stored body when the server answers
+304 Not Modified.
+"""
+
+from collections import Counter
+
+import hashlib
+import json
+import os
+import tempfile
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.redditbot', 'cache')
+
+
+class HttpCache:
+
+  def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+    self.cache_dir = cache_dir
+
+  def get(self, url):
+    """Returns the cached entry for url as a dict with "etag", "last_modified"
+    and "body" (bytes) keys, or None if nothing usable is cached."""
+    path = self._path(url)
+    try:
+      with open(f'{path}.json', 'r') as f:
+        entry = json.load(f)
+      with open(f'{path}.body', 'rb') as f:
+        entry['body'] = f.read()
+    except (OSError, ValueError):
+      return None
+    return entry if entry.get('url') == url else None
+
+  def validators(self, url):
+    """Returns the cached {"etag", "last_modified"} of url without reading its
+    body, or None if nothing is cached. They change whenever a new version of
+    the response is cached."""
+    try:
+      with open(f'{self._path(url)}.json', 'r') as f:
+        entry = json.load(f)
+    except (OSError, ValueError):
+      return None
+    if entry.get('url') != url:
+      return None
+    return {
+      'etag': entry.get('etag'),
+      'last_modified': entry.get('last_modified'),
+    }
+
+  def put(self, url, headers, body):
+    """Stores body for url if the response carries at least one validator.
+
+    Parameters
+    ----------
+    url: str
+    headers: dict
+      The response headers, used to read the ETag and Last-Modified values.
+    body: bytes
+      The raw response body.
+    """
+    etag = headers.get('ETag')
+    last_modified = headers.get('Last-Modified')
+    if etag is None and last_modified is None:
+      return
+    path = self._path(url)
+    # Write the body before the metadata so a reader never sees validators that
+    # belong to a different body.
+    self._write(f'{path}.body', body)
+    entry = {'url': url, 'etag': etag, 'last_modified': last_modified}
+    self._write(f'{path}.json', json.dumps(entry).encode('utf-8'))
+
+  @staticmethod
+  def conditional_headers(entry):
+    """Returns the request headers that revalidate a cached entry."""
+    headers = {}
+    if entry is None:
+      return headers
+    if entry.get('etag'):
+      headers['If-None-Match'] = entry['etag']
+    if entry.get('last_modified'):
+      headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+  def add_daily_stats(self, day, stats):
+    """Adds stats to the running totals kept for day and returns the totals.
+
+    Parameters
+    ----------
+    day: datetime.date
+    stats: collections.Counter
+      Counters to add, e.g. "cache.hit.schedule" or "cache.bytes_saved.teams".
+    """
+    path = os.path.join(self.cache_dir, 'stats', f'{day.isoformat()}.json')
+    try:
+      with open(path, 'r') as f:
+        totals = Counter(json.load(f))
+    except (OSError, ValueError):
+      totals = Counter()
+    totals.update(stats)
+    self._write(path, json.dumps(totals, sort_keys=True).encode('utf-8'))
+    return totals
+
+  def _path(self, url):
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(self.cache_dir, digest)
+
+  @staticmethod
+  def _write(path, data):
+    write_atomically(path, data)
+
+
+def write_atomically(path, data):
+  """Replaces the file at path with data (bytes) so that readers see either
+  the old or the new contents, never a partial write."""
+  directory = os.path.dirname(path)
+  os.makedirs(directory, exist_ok=True)
+  fd, tmp_path = tempfile.mkstemp(dir=directory)
+  try:
+    with os.fdopen(fd, 'wb') as f:
+      f.write(data)
+    os.replace(tmp_path, path)
+  except:
+    os.unlink(tmp_path)
+    raise
@@ -0,0 +1,77 @@
+from collections import Counter
+from datetime import date
+from services.http_cache import HttpCache
+
+import tempfile
+import unittest
+
+URL = 'http://data.nba.net/10s/prod/v1/today.json'
+
+
+class HttpCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.http_cache = HttpCache(self.tmp_dir.name)
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def test_get_nothingCached_returnsNone(self):
+    self.assertIsNone(self.http_cache.get(URL))
+
+  def test_put_withValidators_storesBody(self):
+    self.http_cache.put(
+        URL,
+        {'ETag': '"abc"', 'Last-Modified': 'Tue, 29 Dec 2020 15:05:41 GMT'},
+        b'{"seasonScheduleYear": 2020}')
+
+    entry = self.http_cache.get(URL)
+
+    self.assertEqual(entry['body'], b'{"seasonScheduleYear": 2020}')
+    self.assertEqual(HttpCache.conditional_headers(entry), {
+      'If-None-Match': '"abc"',
+      'If-Modified-Since': 'Tue, 29 Dec 2020 15:05:41 GMT',
+    })
+
+  def test_put_withoutValidators_doesNotStore(self):
+    self.http_cache.put(URL, {}, b'{}')
+    self.assertIsNone(self.http_cache.get(URL))
+
+  def test_put_replacesPreviousEntry(self):
+    self.http_cache.put(URL, {'ETag': '"v1"'}, b'1')
+    self.http_cache.put(URL, {'ETag': '"v2"'}, b'2')
+
+    entry = self.http_cache.get(URL)
+
+    self.assertEqual(entry['body'], b'2')
+    self.assertEqual(entry['etag'], '"v2"')
+
+  def test_validators_changeWithNewVersion(self):
+    self.assertIsNone(self.http_cache.validators(URL))
+
+    self.http_cache.put(URL, {'ETag': '"abc"'}, b'{}')
+    self.assertEqual(
+        self.http_cache.validators(URL),
+        {'etag': '"abc"', 'last_modified': None})
+
+    self.http_cache.put(URL, {'ETag': '"def"'}, b'{}')
+    self.assertEqual(self.http_cache.validators(URL)['etag'], '"def"')
+
+  def test_conditional_headers_noEntry_isEmpty(self):
+    self.assertEqual(HttpCache.conditional_headers(None), {})
+
+  def test_add_daily_stats_accumulatesPerDay(self):
+    today = date(2020, 12, 29)
+    self.http_cache.add_daily_stats(today, Counter({'cache.hit.teams': 1}))
+    totals = self.http_cache.add_daily_stats(
+        today, Counter({'cache.hit.teams': 2, 'cache.miss.teams': 1}))
+    other_day = self.http_cache.add_daily_stats(date(2020, 12, 30), Counter())
+
+    self.assertEqual(
+        totals, Counter({'cache.hit.teams': 3, 'cache.miss.teams': 1}))
+    self.assertEqual(other_day, Counter())
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,333 @@
+"""
+Immutable models for the NBA Data API responses.
+
+NbaService turns each JSON response into these once, when it's parsed, so the
+bots work with attributes, ints and datetimes instead of nested string-keyed
+dicts. They're NamedTuples: tuple-backed with empty __slots__, so they're
+compact, hashable and can't be modified by the callers that share them.
+Stats that are only ever displayed (minutes, percentages, plus/minus...) are
+kept as the strings the API returns.
+"""
+
+from constants import UTC
+from datetime import datetime
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+
+def parse_time_utc(value):
+  """Parses the API's "2020-12-30T00:00:00.000Z" timestamps."""
+  # Much faster than strptime; fromisoformat only accepts the "Z" since 3.11.
+  return datetime.fromisoformat(value.rstrip('Z')).replace(tzinfo=UTC)
+
+
+def _int_or_none(value):
+  return int(value) if value not in (None, '') else None
+
+
+class Team(NamedTuple):
+  team_id: str
+  tri_code: str
+  full_name: str
+  nickname: str
+  url_name: str
+
+  @classmethod
+  def from_json(cls, data):
+    return cls(
+        team_id=data['teamId'],
+        tri_code=data['tricode'],
+        full_name=data['fullName'],
+        nickname=data['nickname'],
+        url_name=data['urlName'])
+
+
+class Player(NamedTuple):
+  person_id: str
+  first_name: str
+  last_name: str
+  jersey: str
+  pos: str
+
+  @property
+  def name(self):
+    return f'{self.first_name} {self.last_name}'
+
+  @classmethod
+  def from_json(cls, data):
+    return cls(
+        person_id=data['personId'],
+        first_name=data['firstName'],
+        last_name=data['lastName'],
+        jersey=data['jersey'],
+        pos=data['pos'])
+
+
+class TeamLine(NamedTuple):
+  """One team's side of a game. The schedule API only provides team_id and
+  score, the box score API provides everything."""
+  team_id: str
+  score: Optional[int]  # None until the game starts.
+  tri_code: Optional[str] = None
+  win: Optional[int] = None
+  loss: Optional[int] = None
+  linescore: Tuple[int, ...] = ()
+
+  @property
+  def has_score(self):
+    return self.score is not None
+
+  @classmethod
+  def from_json(cls, data):
+    return cls(
+        team_id=data['teamId'],
+        score=_int_or_none(data['score']),
+        tri_code=data.get('triCode'),
+        win=_int_or_none(data.get('win')),
+        loss=_int_or_none(data.get('loss')),
+        linescore=tuple(int(p['score']) for p in data.get('linescore', ())))
+
+
+# The values of a game's statusNum.
+GAME_SCHEDULED = 1
+GAME_IN_PROGRESS = 2
+GAME_FINAL = 3
+
+# The extendedStatusNum of a game that was postponed.
+GAME_POSTPONED = 2
+
+
+class Game(NamedTuple):
+  game_id: str
+  game_url_code: str
+  start_date_eastern: str
+  start_time_utc: datetime
+  home: TeamLine
+  road: TeamLine
+  # Only set in a team's schedule: whether that team is the home team.
+  is_home_team: Optional[bool] = None
+  # GAME_SCHEDULED, GAME_IN_PROGRESS or GAME_FINAL.
+  status: Optional[int] = None
+  # E.g. GAME_POSTPONED.
+  extended_status: Optional[int] = None
+
+  @classmethod
+  def from_json(cls, data):
+    return cls(
+        game_id=data['gameId'],
+        game_url_code=data['gameUrlCode'],
+        start_date_eastern=data['startDateEastern'],
+        start_time_utc=parse_time_utc(data['startTimeUTC']),
+        home=TeamLine.from_json(data['hTeam']),
+        road=TeamLine.from_json(data['vTeam']),
+        is_home_team=data.get('isHomeTeam'),
+        status=data.get('statusNum'),
+        extended_status=data.get('extendedStatusNum'))
+
+
+class Schedule(NamedTuple):
+  last_played_index: int
+  # A sequence of Game that may be decoded lazily (see schedule_parser).
+  games: Sequence[Game]
+  # A services.season_calendar.SeasonCalendar of games, if one was built with
+  # the schedule.
+  calendar: Optional['SeasonCalendar'] = None
+
+
+class Leader(NamedTuple):
+  value: str
+  name: str
+
+  @classmethod
+  def from_json(cls, data):
+    player = data['players'][0]
+    return cls(
+        value=data['value'], name=f'{player["firstName"]} {player["lastName"]}')
+
+
+class TeamStatLine(NamedTuple):
+  """A team's box score totals and leaders."""
+  points: str
+  fgm: str
+  fga: str
+  fgp: str
+  tpm: str
+  tpa: str
+  tpp: str
+  ftm: str
+  fta: str
+  ftp: str
+  off_reb: str
+  tot_reb: str
+  assists: str
+  p_fouls: str
+  steals: str
+  turnovers: str
+  blocks: str
+  biggest_lead: str
+  longest_run: str
+  points_in_paint: str
+  points_off_turnovers: str
+  fast_break_points: str
+  points_leader: Leader
+  rebounds_leader: Leader
+  assists_leader: Leader
+
+  @classmethod
+  def from_json(cls, data):
+    totals = data['totals']
+    leaders = data['leaders']
+    return cls(
+        points=totals['points'],
+        fgm=totals['fgm'],
+        fga=totals['fga'],
+        fgp=totals['fgp'],
+        tpm=totals['tpm'],
+        tpa=totals['tpa'],
+        tpp=totals['tpp'],
+        ftm=totals['ftm'],
+        fta=totals['fta'],
+        ftp=totals['ftp'],
+        off_reb=totals['offReb'],
+        tot_reb=totals['totReb'],
+        assists=totals['assists'],
+        p_fouls=totals['pFouls'],
+        steals=totals['steals'],
+        turnovers=totals['turnovers'],
+        blocks=totals['blocks'],
+        biggest_lead=data['biggestLead'],
+        longest_run=data['longestRun'],
+        points_in_paint=data['pointsInPaint'],
+        points_off_turnovers=data['pointsOffTurnovers'],
+        fast_break_points=data['fastBreakPoints'],
+        points_leader=Leader.from_json(leaders['points']),
+        rebounds_leader=Leader.from_json(leaders['rebounds']),
+        assists_leader=Leader.from_json(leaders['assists']))
+
+
+class PlayerStatLine(NamedTuple):
+  team_id: str
+  name: str
+  pos: str  # Only starters have a position.
+  min: str
+  fgm: str
+  fga: str
+  tpm: str
+  tpa: str
+  ftm: str
+  fta: str
+  off_reb: str
+  def_reb: str
+  tot_reb: str
+  assists: str
+  steals: str
+  blocks: str
+  turnovers: str
+  p_fouls: str
+  plus_minus: str
+  points: str
+
+  @classmethod
+  def from_json(cls, data):
+    return cls(
+        team_id=data['teamId'],
+        name=f'{data["firstName"]} {data["lastName"]}',
+        pos=data['pos'],
+        min=data['min'],
+        fgm=data['fgm'],
+        fga=data['fga'],
+        tpm=data['tpm'],
+        tpa=data['tpa'],
+        ftm=data['ftm'],
+        fta=data['fta'],
+        off_reb=data['offReb'],
+        def_reb=data['defReb'],
+        tot_reb=data['totReb'],
+        assists=data['assists'],
+        steals=data['steals'],
+        blocks=data['blocks'],
+        turnovers=data['turnovers'],
+        p_fouls=data['pFouls'],
+        plus_minus=data['plusMinus'],
+        points=data['points'])
+
+
+class Boxscore(NamedTuple):
+  game: Game
+  period: int
+  arena_name: str
+  arena_city: str
+  arena_state: str
+  arena_country: str
+  attendance: str
+  officials: Tuple[str, ...]
+  duration_hours: str
+  duration_minutes: str
+  national_broadcaster: Optional[str]
+  home_broadcaster: Optional[str]
+  road_broadcaster: Optional[str]
+  # None until the game has started.
+  home_stats: Optional[TeamStatLine]
+  road_stats: Optional[TeamStatLine]
+  players: Tuple[PlayerStatLine, ...]
+
+  @classmethod
+  def from_json(cls, data):
+    basic_game_data = data['basicGameData']
+    arena = basic_game_data['arena']
+    broadcasters = basic_game_data['watch']['broadcast']['broadcasters']
+    stats = data.get('stats')
+
+    def broadcaster(key):
+      return broadcasters[key][0]['longName'] if broadcasters[key] else None
+
+    return cls(
+        game=Game.from_json(basic_game_data),
+        period=int(basic_game_data['period']['current']),
+        arena_name=arena['name'],
+        arena_city=arena['city'],
+        arena_state=arena['stateAbbr'],
+        arena_country=arena['country'],
+        attendance=basic_game_data['attendance'],
+        officials=tuple(
+            o['firstNameLastName']
+            for o in basic_game_data['officials']['formatted']),
+        duration_hours=basic_game_data['gameDuration']['hours'],
+        duration_minutes=basic_game_data['gameDuration']['minutes'],
+        national_broadcaster=broadcaster('national'),
+        home_broadcaster=broadcaster('hTeam'),
+        road_broadcaster=broadcaster('vTeam'),
+        home_stats=TeamStatLine.from_json(stats['hTeam']) if stats else None,
+        road_stats=TeamStatLine.from_json(stats['vTeam']) if stats else None,
+        players=tuple(
+            PlayerStatLine.from_json(p) for p in stats['activePlayers'])
+            if stats else ())
+
+
+class Standing(NamedTuple):
+  team_id: str
+  win: int
+  loss: int
+  loss_pct: float
+  games_behind: float
+
+  @classmethod
+  def from_json(cls, data):
+    return cls(
+        team_id=data['teamId'],
+        win=int(data['win']),
+        loss=int(data['loss']),
+        loss_pct=float(data['lossPct']),
+        games_behind=float(data['gamesBehind']))
+
+
+class ConferenceStandings(NamedTuple):
+  season_year: int
+  east: Tuple[Standing, ...]
+  west: Tuple[Standing, ...]
+
+  @classmethod
+  def from_json(cls, data):
+    return cls(
+        season_year=data['seasonYear'],
+        east=tuple(Standing.from_json(s) for s in data['conference']['east']),
+        west=tuple(Standing.from_json(s) for s in data['conference']['west']))
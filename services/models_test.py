@@ -0,0 +1,67 @@
+from constants import UTC
+from datetime import datetime
+from services.models import Boxscore, ConferenceStandings, Game, TeamLine
+
+import json
+import unittest
+
+
+def load(file_name):
+  with open(f'services/testdata/{file_name}', 'r') as f:
+    return json.load(f)
+
+
+class ModelsTest(unittest.TestCase):
+
+  def test_game_from_json_scheduleGame(self):
+    game = Game.from_json(load('schedule.json')['league']['standard'][0])
+
+    self.assertEqual(game.game_url_code, '20201211/NYKDET')
+    self.assertEqual(
+        game.start_time_utc, datetime(2020, 12, 12, 0, 0, 0, 0, UTC))
+    self.assertFalse(game.is_home_team)
+    self.assertEqual(game.road, TeamLine(team_id='1610612752', score=90))
+    self.assertEqual(game.home.score, 84)
+
+  def test_team_line_from_json_notStarted_hasNoScore(self):
+    line = TeamLine.from_json({'teamId': '1610612752', 'score': ''})
+    self.assertIsNone(line.score)
+    self.assertFalse(line.has_score)
+
+  def test_boxscore_from_json(self):
+    boxscore = Boxscore.from_json(load('0022000036_boxscore.json'))
+
+    self.assertEqual(boxscore.game.home.tri_code, 'NYK')
+    self.assertEqual(boxscore.game.home.linescore, (30, 31, 35, 34))
+    self.assertEqual(boxscore.game.home.score, 130)
+    self.assertEqual(boxscore.period, 4)
+    self.assertEqual(boxscore.home_stats.points, '130')
+    self.assertEqual(boxscore.players[0].team_id, boxscore.game.road.team_id)
+
+  def test_boxscore_from_json_beforeTipOff_hasNoStats(self):
+    data = load('0022000036_boxscore.json')
+    del data['stats']
+
+    boxscore = Boxscore.from_json(data)
+
+    self.assertIsNone(boxscore.home_stats)
+    self.assertEqual(boxscore.players, ())
+
+  def test_conference_standings_from_json(self):
+    standings = ConferenceStandings.from_json(
+        load('standings_conference.json')['league']['standard'])
+
+    self.assertEqual(standings.season_year, 2017)
+    self.assertEqual(standings.east[0].win, 49)
+    self.assertEqual(standings.east[-1].games_behind, 29.5)
+
+  def test_models_areImmutableAndHashable(self):
+    game = Game.from_json(load('schedule.json')['league']['standard'][0])
+
+    with self.assertRaises(AttributeError):
+      game.game_id = '0'
+    self.assertEqual(hash(game), hash(game._replace()))
+
+
+if __name__ == '__main__':
+  unittest.main()
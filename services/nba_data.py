@@ -1,60 +1,48 @@
-import json
+"""
+Module level shortcuts to a shared NbaService.
+
+Importing this module has no side effects: logging is configured and the
+service (and with it requests) is created by the first call that needs it.
+"""
+
 import logging
-import logging.config
-import requests
 
-logging.config.fileConfig('logging.conf')
 logger = logging.getLogger('sidebarbot')
 
+# Every function below shares this service, and therefore its keep-alive
+# connection pool to data.nba.net. It's created on first use.
+nba_service = None
+
+
+def _service():
+  global nba_service
+  if nba_service is None:
+    import logging.config
+    from services.nba_service import NbaService
+    logging.config.fileConfig('logging.conf')
+    nba_service = NbaService(logger)
+  return nba_service
+
 
 def conference_standings():
-  logger.info('Fetching conference standings.')
-  r = requests.get(
-      'http://data.nba.net/10s/prod/v1/current/standings_conference.json')
-  r.raise_for_status()
-  data = json.loads(r.content.decode('utf-8'))
-  return data['league']['standard']
+  return _service().conference_standings()
 
 
 def current_year():
-  logger.info('Fetching current season schedule year.')
-  r = requests.get('http://data.nba.net/10s/prod/v1/today.json')
-  r.raise_for_status()
-  data = json.loads(r.content.decode('utf-8'))
-  return data['seasonScheduleYear']
+  return _service().current_year()
 
 
 def players(year):
-  logger.info(f'Fetching all player metadata for {year}.')
-  r = requests.get(f'http://data.nba.net/prod/v1/{year}/players.json')
-  r.raise_for_status()
-  data = json.loads(r.content.decode('utf-8'))
-  return data['league']['standard']
+  return _service().players(year)
 
 
 def roster(team):
-  logger.info(f'Fetching {team} roster.')
-  r = requests.get(f'http://data.nba.net/prod/v1/2020/teams/{team}/roster.json')
-  r.raise_for_status()
-  data = json.loads(r.content.decode('utf-8'))
-  return set(
-      map(lambda p: p['personId'], data['league']['standard']['players']))
+  return _service().roster(team, '2020')
 
 
 def schedule(team, year):
-  logger.info(f'Fetching {team} schedule information.')
-  base_url = f'http://data.nba.net/data/10s/prod/v1/{year}/teams/{team}'
-  r = requests.get(f'{base_url}/schedule.json')
-  r.raise_for_status()
-  return json.loads(r.content.decode('utf-8'))
+  return _service().schedule(team, year)
 
 
 def teams(year):
-  logger.info(f'Fetching {year} team-level metadata for all teams.')
-  r = requests.get(f'http://data.nba.net/10s/prod/v1/{year}/teams.json')
-  r.raise_for_status()
-  teams = json.loads(r.content.decode('utf-8'))
-  teams_map = dict()
-  for team in teams['league']['standard']:
-    teams_map[team['teamId']] = team
-  return teams_map
+  return _service().teams(year)
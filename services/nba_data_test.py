@@ -1,4 +1,6 @@
+from datetime import timedelta
 from services import nba_data
+from services.nba_service import DEFAULT_TIMEOUT, NbaService
 from unittest.mock import patch
 
 import os.path
@@ -11,6 +13,8 @@ class MockResponse:
     with open(file_name, 'r') as f:
       self.content = f.read().encode('utf-8')
     self.status_code = status_code
+    self.headers = {}
+    self.elapsed = timedelta(milliseconds=10)
 
   def raise_for_status(self):
     pass
@@ -26,28 +30,40 @@ def mocked_requests_get(*args, **kwargs):
 
 class NbaDataTest(unittest.TestCase):
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  def setUp(self):
+    # Keep the module's shared service away from the on-disk caches.
+    self.original_nba_service = nba_data.nba_service
+    nba_data.nba_service = NbaService(nba_data.logger, cache_dir=None)
+
+  def tearDown(self):
+    nba_data.nba_service = self.original_nba_service
+
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_conference_standings(self, mock_get):
     standings = nba_data.conference_standings()
     # Just verify a few properties instead of the entire large response.
-    self.assertEqual(2017, standings['seasonYear'])
-    teamIds = list(map(lambda t: t['teamId'], standings['conference']['east']))
+    self.assertEqual(2017, standings.season_year)
+    teamIds = list(map(lambda t: t.team_id, standings.east))
     self.assertEqual(teamIds[0:2], ['1610612761', '1610612738'])
     mock_get.assert_called_once_with(
-        'http://data.nba.net/10s/prod/v1/current/standings_conference.json')
+        'http://data.nba.net/10s/prod/v1/current/standings_conference.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_current_year(self, mock_get):
     self.assertEqual(nba_data.current_year(), 2020)
     mock_get.assert_called_once_with(
-        'http://data.nba.net/10s/prod/v1/today.json')
+        'http://data.nba.net/10s/prod/v1/today.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_players(self, mock_get):
     response = nba_data.players('2020')
     # Just verify a few properties instead of the entire large response.
-    actual_names = list(
-        map(lambda player: player['temporaryDisplayName'], response))
+    actual_names = [
+        f'{player.last_name}, {player.first_name}' for player in response]
     expected_names = [
         'Achiuwa, Precious',
         'Adams, Jaylen',
@@ -61,35 +77,43 @@ class NbaDataTest(unittest.TestCase):
     ]
     self.assertEqual(actual_names, expected_names)
     mock_get.assert_called_once_with(
-        'http://data.nba.net/prod/v1/2020/players.json')
+        'http://data.nba.net/prod/v1/2020/players.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_roster(self, mock_get):
     response = nba_data.roster('knicks')
     expected = set(['1629628', '1629649', '203493', '202692'])
     self.assertEqual(response, expected)
     mock_get.assert_called_once_with(
-        'http://data.nba.net/prod/v1/2020/teams/knicks/roster.json')
+        'http://data.nba.net/prod/v1/2020/teams/knicks/roster.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_schedule(self, mock_get):
     response = nba_data.schedule('knicks', '2020')
     # Just verify a few properties instead of the entire large response.
-    actual = list(map(lambda s: s['gameId'], response['league']['standard']))
+    actual = list(map(lambda s: s.game_id, response.games))
     expected = ['0012000002', '0012000015', '0012000028']
     self.assertEqual(actual[0:3], expected)
     mock_get.assert_called_once_with(
-        'http://data.nba.net/data/10s/prod/v1/2020/teams/knicks/schedule.json')
+        'http://data.nba.net/data/10s/prod/v1/2020/teams/knicks/schedule.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_teams(self, mock_get):
     teams = nba_data.teams('2020')
     # Just spot check a few properties instead of the entire large response.
-    self.assertEqual('Atlanta Hawks', teams['1610612737']['fullName'])
-    self.assertEqual('Hawks', teams['1610612737']['nickname'])
-    self.assertEqual('Boston Celtics', teams['1610612738']['fullName'])
+    self.assertEqual('Atlanta Hawks', teams['1610612737'].full_name)
+    self.assertEqual('Hawks', teams['1610612737'].nickname)
+    self.assertEqual('Boston Celtics', teams['1610612738'].full_name)
     mock_get.assert_called_once_with(
-        'http://data.nba.net/10s/prod/v1/2020/teams.json')
+        'http://data.nba.net/10s/prod/v1/2020/teams.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
 
 if __name__ == '__main__':
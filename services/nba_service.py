@@ -1,22 +1,179 @@
 """
 Provides a facade class around the NBA Data APIs. It makes network calls to look
 up NBA data and returns their response. It encapsulates details around forming
-the correct request URLs and marshalling JSON responses into python objects.
+the correct request URLs and marshalling JSON responses into the immutable
+models defined in services.models.
 """
 
+from collections import Counter, OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor
+from concurrent.futures import wait
+from constants import UTC
+from datetime import date, datetime, timedelta
+from requests.adapters import HTTPAdapter
+from services.http_cache import DEFAULT_CACHE_DIR, HttpCache
+from services.models import Boxscore, ConferenceStandings, Game, Player
+from services.models import Schedule, Team
+from services.resilience import Backoff, CircuitBreaker, CircuitOpenError
+from services.resilience import Deadline, DeadlineExceeded, is_upstream_failure
+from services.schedule_parser import parse_schedule
+from services.season_calendar import SeasonCalendar
+from services.season_year import SeasonYearResolver
+from services.shared_cache import SharedCache
+from services.stats import Stats
+
 import json
-import logging.config
+import logging
+import os
 import requests
+import threading
+import time
+
+# Maximum number of keep-alive connections kept open per host.
+DEFAULT_POOL_SIZE = 4
+
+# (connect, read) timeouts in seconds for every request to data.nba.net. They
+# are lowered further when less of the run's budget is left.
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Seconds a service may spend on requests in total. The bots run every minute,
+# so this keeps a run from still going when the next one starts.
+DEFAULT_RUN_BUDGET = 50
+
+# Retries for connection errors, timeouts and 5xx responses. GET requests to
+# data.nba.net are idempotent so they are always safe to retry.
+DEFAULT_BACKOFF = Backoff(attempts=3, base=0.3, cap=5.0)
+
+# After this many consecutive failed requests nothing is sent to data.nba.net
+# for BREAKER_COOLDOWN seconds, by any bot, and stale responses are used.
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 60
+
+# How long a parsed response from each endpoint is reused from memory before it
+# is fetched again. Deployments can override any of these via the ttls argument.
+DEFAULT_TTLS = {
+  'boxscore': timedelta(seconds=5),
+  'conference_standings': timedelta(minutes=10),
+  'current_year': timedelta(hours=6),
+  'players': timedelta(days=1),
+  'roster': timedelta(hours=6),
+  'schedule': timedelta(minutes=5),
+  'scoreboard': timedelta(seconds=10),
+  'teams': timedelta(days=1),
+}
+
+# Maximum number of parsed responses kept in memory. The least recently used
+# response is evicted first.
+DEFAULT_MEMO_SIZE = 32
 
 
 class NbaService:
 
-  def __init__(self, logger=None):
-    if logger is None:
-      logging.config.fileConfig('logging.conf')
-      self.logger = logger.getLogger(__name__)
-    else:
-      self.logger = logger
+  def __init__(
+      self,
+      logger=None,
+      session=None,
+      pool_size=DEFAULT_POOL_SIZE,
+      timeout=DEFAULT_TIMEOUT,
+      backoff=DEFAULT_BACKOFF,
+      run_budget=DEFAULT_RUN_BUDGET,
+      hedge_after=None,
+      cache_dir=DEFAULT_CACHE_DIR,
+      ttls=None,
+      memo_size=DEFAULT_MEMO_SIZE,
+      clock=time.monotonic,
+      sleep=time.sleep):
+    """
+    Parameters
+    ----------
+    logger: logging.Logger
+      If None, this module's logger is used.
+    session: requests.Session
+      The HTTP session shared by every method. If None, a new session with a
+      keep-alive connection pool is created.
+    pool_size: int
+      The maximum number of connections kept alive per host.
+    timeout: tuple
+      The (connect, read) timeout in seconds passed to every request, capped
+      at what's left of run_budget.
+    backoff: services.resilience.Backoff
+      The retry policy for connection errors, timeouts and 5xx responses.
+    run_budget: float
+      Seconds from now after which no more requests are sent (see deadline).
+    hedge_after: float
+      If set, a request that hasn't been answered after this many seconds is
+      sent a second time and whichever response arrives first is used. The
+      hedges run on a thread pool that close() stops.
+    cache_dir: str
+      Where to keep response bodies and their ETag/Last-Modified validators so
+      unchanged responses are served from disk after a 304, and the response
+      cache shared with other bot processes. None disables both caches.
+    ttls: dict
+      Maps endpoint names (e.g. "schedule") to a timedelta that overrides the
+      matching entry of DEFAULT_TTLS.
+    memo_size: int
+      The maximum number of parsed responses kept in memory.
+    clock: function
+      Returns the current time in seconds; only used to expire memoized
+      responses.
+    sleep: function
+      Waits the given number of seconds between retries.
+    """
+    # Configuring logging is up to the application.
+    self.logger = logger if logger is not None else logging.getLogger(__name__)
+    self.stats = Stats()
+    self.timeout = timeout
+    self.backoff = backoff
+    self.run_budget = run_budget
+    self.deadline = Deadline(run_budget)
+    self.hedge_after = hedge_after
+    self.sleep = sleep
+    self._owns_session = session is None
+    self.session = session if session is not None \
+        else new_session(self.stats, pool_size)
+    self.http_cache = HttpCache(cache_dir) if cache_dir else None
+    self.shared_cache = SharedCache(
+        os.path.join(cache_dir, 'shared.sqlite3'), self.stats) \
+        if cache_dir else None
+    self.breaker = CircuitBreaker(
+        'data.nba.net',
+        self.shared_cache,
+        BREAKER_FAILURE_THRESHOLD,
+        BREAKER_COOLDOWN,
+        self.stats)
+    self._hedge_executor = ThreadPoolExecutor(pool_size) \
+        if hedge_after is not None else None
+    self.season_year_resolver = SeasonYearResolver(
+        self._today,
+        os.path.join(cache_dir, 'season.json') if cache_dir else None,
+        self.stats)
+    self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+    self.memo_size = memo_size
+    self.clock = clock
+    self._memo = OrderedDict()
+    self._in_flight = dict()
+    self._memo_lock = threading.Lock()
+    self._reported_stats = Counter()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+    return False
+
+  def close(self):
+    """Stops the hedging threads and closes the session's connections if
+    this service created it. Nothing may be requested afterwards."""
+    if self._hedge_executor is not None:
+      self._hedge_executor.shutdown(wait=False, cancel_futures=True)
+    if self._owns_session:
+      self.session.close()
+
+  def start_run(self):
+    """Starts a new run budget. Long-running callers call this before each
+    cycle of work; everything else (connections, caches) is kept."""
+    self.deadline = Deadline(self.run_budget)
 
   def boxscore(self, start_date_est, game_id):
     """
@@ -29,56 +186,430 @@ class NbaService:
       the time of tip off in EST timezone in the format of yyyyMMdd.
     game_id: str
       Another string provided by the schedule API for the game in question.
+
+    Returns
+    -------
+    services.models.Boxscore
     """
     self.logger.info(f'Fetching boxscore for {start_date_est} and {game_id}.')
-    r = requests.get(
-        f'http://data.nba.net/prod/v1/{start_date_est}/{game_id}_boxscore.json')
-    r.raise_for_status()
-    return json.loads(r.content.decode('utf-8'))
+    return self._get(
+        'boxscore',
+        f'http://data.nba.net/prod/v1/{start_date_est}/{game_id}_boxscore.json',
+        lambda body: Boxscore.from_json(json.loads(body)))
 
   def conference_standings(self):
+    """Returns the services.models.ConferenceStandings."""
     self.logger.info('Fetching conference standings.')
-    r = requests.get(
-        'http://data.nba.net/10s/prod/v1/current/standings_conference.json')
-    r.raise_for_status()
-    data = json.loads(r.content.decode('utf-8'))
-    return data['league']['standard']
+    return self._get(
+        'conference_standings',
+        'http://data.nba.net/10s/prod/v1/current/standings_conference.json',
+        lambda body: ConferenceStandings.from_json(
+            json.loads(body)['league']['standard']))
 
   def current_year(self):
     self.logger.info('Fetching current season schedule year.')
-    r = requests.get('http://data.nba.net/10s/prod/v1/today.json')
-    r.raise_for_status()
-    data = json.loads(r.content.decode('utf-8'))
-    return data['seasonScheduleYear']
+    return self._today()['seasonScheduleYear']
+
+  def season_year(self, now):
+    """Returns the current season year like current_year, but usually without
+    a network call (see services.season_year).
 
-  def players(self, year):
+    Parameters
+    ----------
+    now: datetime
+    """
+    return self.season_year_resolver.season_year(now)
+
+  def players(self, year, now=None):
+    """Returns a tuple of services.models.Player for every player in the
+    league.
+
+    Parameters
+    ----------
+    now: datetime
+      The time the caller works at; None for the current time. Only used to
+      find the current season if year has no data (see _get_season).
+    """
     self.logger.info(f'Fetching all player metadata for {year}.')
-    r = requests.get(f'http://data.nba.net/prod/v1/{year}/players.json')
-    r.raise_for_status()
-    data = json.loads(r.content.decode('utf-8'))
-    return data['league']['standard']
+    return self._get_season(
+        'players',
+        year,
+        now,
+        lambda year: f'http://data.nba.net/prod/v1/{year}/players.json',
+        lambda body: tuple(
+            Player.from_json(p)
+            for p in json.loads(body)['league']['standard']))
 
-  def roster(self, team, year):
+  def roster(self, team, year, now=None):
+    """Returns the personIds of the team's players. See players for now."""
     self.logger.info(f'Fetching {team} roster.')
-    r = requests.get(f'http://data.nba.net/prod/v1/{year}/teams/{team}/roster.json')
-    r.raise_for_status()
-    data = json.loads(r.content.decode('utf-8'))
-    return set(
-        map(lambda p: p['personId'], data['league']['standard']['players']))
+    return self._get_season(
+        'roster',
+        year,
+        now,
+        lambda year:
+            f'http://data.nba.net/prod/v1/{year}/teams/{team}/roster.json',
+        lambda body: frozenset(
+            p['personId']
+            for p in json.loads(body)['league']['standard']['players']))
 
-  def schedule(self, team, year):
+  def schedule(self, team, year, now=None):
+    """Returns the team's services.models.Schedule for the season. Its games
+    are only decoded as they're accessed (see schedule_parser), which its
+    calendar only does as far as its lookups need (see season_calendar). See
+    players for now."""
     self.logger.info(f'Fetching {team} schedule information.')
-    base_url = f'http://data.nba.net/data/10s/prod/v1/{year}/teams/{team}'
-    r = requests.get(f'{base_url}/schedule.json')
-    r.raise_for_status()
-    return json.loads(r.content.decode('utf-8'))
+    return self._get_season(
+        'schedule',
+        year,
+        now,
+        lambda year: schedule_url(team, year),
+        _parse_schedule)
+
+  def scoreboard(self, start_date_est):
+    """Returns a tuple of services.models.Game for every game in the league on
+    a day, with their status and (once they started) scores.
 
-  def teams(self, year):
+    Parameters
+    ----------
+    start_date_est: str
+      The day in the Eastern timezone, in the format yyyyMMdd.
+    """
+    self.logger.info(f'Fetching scoreboard for {start_date_est}.')
+    return self._get(
+        'scoreboard',
+        f'http://data.nba.net/prod/v2/{start_date_est}/scoreboard.json',
+        lambda body: tuple(
+            Game.from_json(g) for g in json.loads(body)['games']))
+
+  def teams(self, year, now=None):
+    """Returns a dict of teamId to services.models.Team. See players for
+    now."""
     self.logger.info(f'Fetching {year} team-level metadata for all teams.')
-    r = requests.get(f'http://data.nba.net/10s/prod/v1/{year}/teams.json')
-    r.raise_for_status()
-    teams = json.loads(r.content.decode('utf-8'))
-    teams_map = dict()
-    for team in teams['league']['standard']:
-      teams_map[team['teamId']] = team
-    return teams_map
+    return self._get_season(
+        'teams',
+        year,
+        now,
+        lambda year: f'http://data.nba.net/10s/prod/v1/{year}/teams.json',
+        lambda body: {
+            t['teamId']: Team.from_json(t)
+            for t in json.loads(body)['league']['standard']})
+
+  def _today(self):
+    return self._get(
+        'current_year', 'http://data.nba.net/10s/prod/v1/today.json')
+
+  def log_stats(self):
+    """Logs the counters collected since this service was created, e.g. how
+    many requests reused a keep-alive connection instead of opening a new one
+    and how many responses were served from the HTTP cache. Cache counters are
+    also added to today's running totals on disk.
+    """
+    # Other threads may still be counting.
+    stats = self.stats.snapshot()
+    self.logger.info(
+        f'NBA Data requests: {stats["http.requests"]}, '
+        f'new connections: {stats["http.connections.new"]}, '
+        f'reused connections: {stats["http.connections.reused"]}.')
+    self.logger.info(
+        f'Season year: resolved offline {stats["season.offline"]} times, '
+        f'refreshed from today.json {stats["season.refreshed"]} times.')
+    self.logger.info(
+        f'Memoized responses reused: {stats["memo.hit"]}, '
+        f'fetched: {stats["memo.miss"]}, '
+        f'evicted: {stats["memo.evicted"]}.')
+    self.logger.info(
+        f'Concurrent identical requests: '
+        f'{stats["singleflight.originator"]} sent, '
+        f'{stats["singleflight.follower"]} coalesced into them.')
+    self.logger.info(
+        f'Failures: {stats["http.timeouts"]} timeouts, '
+        f'{stats["http.retries"]} retries, '
+        f'{stats["http.hedged"]} hedged requests '
+        f'({stats["http.hedge_won"]} answered by the hedge), '
+        f'{stats["deadline.exceeded"]} requests past the deadline, '
+        f'{stats["breaker.tripped"]} breaker trips, '
+        f'{stats["breaker.rejected"]} requests rejected by the breaker, '
+        f'{stats["stale.served"]} stale responses served.')
+    self.logger.info(
+        f'Shared cache: {stats["shared.hit"]} duplicate fetches avoided '
+        f'({stats["shared.waited"]} waited for another process), '
+        f'{stats["shared.miss"]} fetched.')
+    for line in format_cache_stats(stats):
+      self.logger.info(f'This run: {line}')
+
+    if self.shared_cache is not None:
+      unreported = Counter({
+          k: v - self._reported_stats[k]
+          for k, v in stats.items() if k.startswith('shared.')})
+      self._reported_stats.update(unreported)
+      totals = self.shared_cache.add_daily_stats(date.today(), unreported)
+      self.logger.info(
+          f'Today: {totals["shared.hit"]} duplicate fetches avoided by all '
+          f'bots, {totals["shared.miss"]} fetched.')
+
+    if self.http_cache is not None:
+      unreported = Counter({
+          k: v - self._reported_stats[k]
+          for k, v in stats.items() if k.startswith('cache.')})
+      self._reported_stats.update(unreported)
+      totals = self.http_cache.add_daily_stats(date.today(), unreported)
+      for line in format_cache_stats(totals):
+        self.logger.info(f'Today: {line}')
+
+  def _get(self, endpoint, url, parse=json.loads):
+    """Returns the body of url as parsed by parse, reusing the response parsed
+    by an earlier call if it is younger than the endpoint's TTL.
+
+    Concurrent calls for the same url are coalesced: the first caller (the
+    originator) fetches it and every other caller (a follower) waits for and
+    receives the same object, or the same exception.
+
+    Callers share the returned object so they must not modify it.
+    """
+    now = self.clock()
+    with self._memo_lock:
+      memoized = self._memo.get(url)
+      if memoized is not None and memoized[0] > now:
+        self._memo.move_to_end(url)
+        self.stats.add('memo.hit')
+        return memoized[1]
+
+      flight = self._in_flight.get(url)
+      is_originator = flight is None
+      if is_originator:
+        flight = self._in_flight[url] = Future()
+        self.stats.add('singleflight.originator')
+        self.stats.add('memo.miss')
+      else:
+        self.stats.add('singleflight.follower')
+
+    if not is_originator:
+      return flight.result()
+
+    ttl = self.ttls.get(endpoint, timedelta(0)).total_seconds()
+    try:
+      data = self._fetch(endpoint, url, ttl, parse)
+    except BaseException as e:
+      with self._memo_lock:
+        del self._in_flight[url]
+      flight.set_exception(e)
+      raise
+
+    with self._memo_lock:
+      if ttl > 0:
+        self._memo[url] = (now + ttl, data)
+        self._memo.move_to_end(url)
+        while len(self._memo) > self.memo_size:
+          self._memo.popitem(last=False)
+          self.stats.add('memo.evicted')
+      del self._in_flight[url]
+    flight.set_result(data)
+    return data
+
+  def _get_season(self, endpoint, year, now, url_of, parse):
+    """Returns _get(endpoint, url_of(year), parse) for an endpoint of one
+    season's data.
+
+    A 404 usually means year came from a season_year answer that is out of
+    date, e.g. the next season started since it was last checked. Then the
+    answer is dropped and, if today.json has another season year at now (the
+    current time if None), the request is retried once for that season.
+    """
+    try:
+      return self._get(endpoint, url_of(year), parse)
+    except requests.HTTPError as e:
+      if e.response is None or e.response.status_code != 404:
+        raise
+      self.season_year_resolver.invalidate()
+      current = self.season_year(now if now is not None else datetime.now(UTC))
+      if str(current) == str(year):
+        raise
+    self.stats.add('season.retried')
+    self.logger.warning(
+        f'No {endpoint} for season {year}. Trying season {current}.')
+    return self._get(endpoint, url_of(current), parse)
+
+  def _fetch(self, endpoint, url, ttl, parse=json.loads):
+    """Returns the body of url as parsed by parse, reusing a body that another
+    bot process stored less than ttl seconds ago.
+
+    If data.nba.net can't be reached, the last body stored for url is used no
+    matter how old it is.
+    """
+    try:
+      if self.shared_cache is not None and ttl > 0:
+        body = self.shared_cache.get_or_fetch(
+            url, ttl, lambda: self._download(endpoint, url))
+      else:
+        body = self._download(endpoint, url)
+    except requests.RequestException as e:
+      body = self._stale_body(url) if is_upstream_failure(e) else None
+      if body is None:
+        raise
+      self.stats.add('stale.served')
+      self.logger.warning(f'Using a stale copy of {url} because of: {e}')
+    return parse(body.decode('utf-8'))
+
+  def _stale_body(self, url):
+    if self.shared_cache is not None:
+      body = self.shared_cache.get_stale(url)
+      if body is not None:
+        return body
+    entry = self.http_cache.get(url) if self.http_cache else None
+    return entry['body'] if entry else None
+
+  def _download(self, endpoint, url):
+    """Downloads url and returns the raw response body.
+
+    If the HTTP cache has a copy of the response, the request is made
+    conditional and the cached body is reused when the server answers 304.
+    Connection errors, timeouts and 5xx responses are retried with backoff
+    while the deadline allows it, and count against the circuit breaker.
+    """
+    if not self.breaker.allow():
+      raise CircuitOpenError(f'Not requesting {url}: the breaker is open.')
+    entry = self.http_cache.get(url) if self.http_cache else None
+    headers = HttpCache.conditional_headers(entry)
+    retry = 0
+    while True:
+      try:
+        r = self._send(url, headers)
+        if r.status_code < 500:
+          break
+        error = requests.HTTPError(
+            f'{r.status_code} Server Error for url: {url}', response=r)
+      except DeadlineExceeded:
+        self.stats.add('deadline.exceeded')
+        raise
+      except (requests.ConnectionError, requests.Timeout) as e:
+        if isinstance(e, requests.Timeout):
+          self.stats.add('http.timeouts')
+        error = e
+      delay = self.backoff.delay(retry)
+      retry += 1
+      if retry >= self.backoff.attempts or delay >= self.deadline.remaining():
+        self.breaker.record_failure()
+        raise error
+      self.stats.add('http.retries')
+      self.logger.info(f'Retrying {url} in {delay:.2f}s after: {error}')
+      self.sleep(delay)
+
+    self.breaker.record_success()
+    elapsed_ms = r.elapsed.total_seconds() * 1000 if r.elapsed else 0
+    if r.status_code == 304 and entry is not None:
+      body = entry['body']
+      self.stats.add(f'cache.hit.{endpoint}')
+      self.stats.add(f'cache.hit_ms.{endpoint}', elapsed_ms)
+      self.stats.add(f'cache.bytes_saved.{endpoint}', len(body))
+    else:
+      r.raise_for_status()
+      body = r.content
+      self.stats.add(f'cache.miss.{endpoint}')
+      self.stats.add(f'cache.miss_ms.{endpoint}', elapsed_ms)
+      if self.http_cache is not None:
+        self.http_cache.put(url, r.headers, body)
+    return body
+
+  def _send(self, url, headers):
+    """Sends one GET request for url within the deadline. If hedging is on and
+    the server is slow to answer, a second identical request races the
+    first."""
+    timeout = self.deadline.timeout(self.timeout)
+    get = lambda: self.session.get(url, headers=headers, timeout=timeout)
+    if self._hedge_executor is None:
+      return get()
+
+    first = self._hedge_executor.submit(get)
+    done, _ = wait([first], timeout=self.hedge_after)
+    if done:
+      return first.result()
+    self.stats.add('http.hedged')
+    hedge = self._hedge_executor.submit(get)
+    pending = {first, hedge}
+    while pending:
+      done, pending = wait(pending, return_when=FIRST_COMPLETED)
+      for future in done:
+        if future.exception() is None:
+          if future is hedge:
+            self.stats.add('http.hedge_won')
+          return future.result()
+    # Both failed.
+    return first.result()
+
+
+def schedule_url(team, year):
+  """Returns the URL of the team's schedule.json for the season year."""
+  return (f'http://data.nba.net/data/10s/prod/v1/{year}/teams/{team}/'
+          'schedule.json')
+
+
+def _parse_schedule(body):
+  league = parse_schedule(body, Game.from_json)['league']
+  return Schedule(
+      league['lastStandardGamePlayedIndex'],
+      league['standard'],
+      SeasonCalendar(
+          league['standard'], league['lastStandardGamePlayedIndex']))
+
+
+def format_cache_stats(stats):
+  """Returns one human readable line per endpoint summarizing the
+  "cache.*" counters in stats."""
+  endpoints = sorted(set(
+      k.split('.', 2)[2] for k in stats
+      if k.startswith('cache.hit.') or k.startswith('cache.miss.')))
+  lines = []
+  for endpoint in endpoints:
+    hits = stats[f'cache.hit.{endpoint}']
+    misses = stats[f'cache.miss.{endpoint}']
+    hit_ms = stats[f'cache.hit_ms.{endpoint}'] / hits if hits else 0
+    miss_ms = stats[f'cache.miss_ms.{endpoint}'] / misses if misses else 0
+    saved_ms = (miss_ms - hit_ms) * hits if misses else 0
+    lines.append(
+        f'{endpoint}: {hits} hits, {misses} misses, '
+        f'{stats[f"cache.bytes_saved.{endpoint}"]} bytes saved, '
+        f'~{max(saved_ms, 0):.0f} ms saved.')
+  return lines
+
+
+def new_session(stats, pool_size=DEFAULT_POOL_SIZE):
+  """Creates a requests.Session with a keep-alive connection pool that records
+  connection reuse in stats. It doesn't retry anything itself: NbaService
+  retries within its deadline.
+
+  Parameters
+  ----------
+  stats: services.stats.Stats
+    Receives the "http.requests", "http.connections.new" and
+    "http.connections.reused" counts.
+  pool_size: int
+    The maximum number of connections kept alive per host.
+  """
+  adapter = ConnectionCountingAdapter(
+      stats, pool_connections=pool_size, pool_maxsize=pool_size)
+  session = requests.Session()
+  session.mount('http://', adapter)
+  session.mount('https://', adapter)
+  return session
+
+
+class ConnectionCountingAdapter(HTTPAdapter):
+  """An HTTPAdapter that counts whether each request was sent over a newly
+  opened connection or over one reused from the keep-alive pool."""
+
+  def __init__(self, stats, **kwargs):
+    self.stats = stats
+    super().__init__(**kwargs)
+
+  def send(self, request, **kwargs):
+    pool = self.get_connection(request.url, kwargs.get('proxies'))
+    opened_before = pool.num_connections
+    response = super().send(request, **kwargs)
+    new_connections = pool.num_connections - opened_before
+    self.stats.add('http.requests')
+    if new_connections > 0:
+      self.stats.add('http.connections.new', new_connections)
+    else:
+      self.stats.add('http.connections.reused')
+    return response
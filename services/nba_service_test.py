@@ -1,8 +1,23 @@
-from services.nba_service import NbaService
-from unittest.mock import patch
+from collections import Counter
+from constants import UTC
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from services.fake_nba_service import FakeNbaService
+from services.models import GAME_FINAL, GAME_IN_PROGRESS, GAME_SCHEDULED
+from services.nba_service import DEFAULT_TIMEOUT, DEFAULT_TTLS, NbaService
+from services.nba_service import new_session
+from services.resilience import Backoff, DeadlineExceeded
+from services.stats import Stats
+from unittest.mock import MagicMock, patch
 
+import hashlib
+import json
 import logging.config
 import os.path
+import requests
+import tempfile
+import threading
+import time
 import unittest
 
 
@@ -12,6 +27,8 @@ class MockResponse:
     with open(file_name, 'r') as f:
       self.content = f.read().encode('utf-8')
     self.status_code = status_code
+    self.headers = {}
+    self.elapsed = timedelta(milliseconds=10)
 
   def raise_for_status(self):
     pass
@@ -28,38 +45,44 @@ def mocked_requests_get(*args, **kwargs):
 class NbaServiceTest(unittest.TestCase):
   def setUp(self):
     logging.basicConfig(level=logging.ERROR)
-    self.nba_service = NbaService(logging.getLogger(__name__))
+    self.nba_service = NbaService(logging.getLogger(__name__), cache_dir=None)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_boxscore(self, mock_get):
     boxscore = self.nba_service.boxscore('20201231', '0022000066')
     # Just verify a few properties instead of the entire large response.
-    self.assertEqual(boxscore['basicGameData']['gameUrlCode'], '20201231/NYKTOR')
+    self.assertEqual(boxscore.game.game_url_code, '20201231/NYKTOR')
     mock_get.assert_called_once_with(
-        'http://data.nba.net/prod/v1/20201231/0022000066_boxscore.json')
+        'http://data.nba.net/prod/v1/20201231/0022000066_boxscore.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_conference_standings(self, mock_get):
     standings = self.nba_service.conference_standings()
     # Just verify a few properties instead of the entire large response.
-    self.assertEqual(2017, standings['seasonYear'])
-    teamIds = list(map(lambda t: t['teamId'], standings['conference']['east']))
+    self.assertEqual(2017, standings.season_year)
+    teamIds = list(map(lambda t: t.team_id, standings.east))
     self.assertEqual(teamIds[0:2], ['1610612761', '1610612738'])
     mock_get.assert_called_once_with(
-        'http://data.nba.net/10s/prod/v1/current/standings_conference.json')
+        'http://data.nba.net/10s/prod/v1/current/standings_conference.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_current_year(self, mock_get):
     self.assertEqual(self.nba_service.current_year(), 2020)
     mock_get.assert_called_once_with(
-        'http://data.nba.net/10s/prod/v1/today.json')
+        'http://data.nba.net/10s/prod/v1/today.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_players(self, mock_get):
     response = self.nba_service.players('2020')
     # Just verify a few properties instead of the entire large response.
-    actual_names = list(
-        map(lambda player: player['temporaryDisplayName'], response))
+    actual_names = [
+        f'{player.last_name}, {player.first_name}' for player in response]
     expected_names = [
         'Achiuwa, Precious',
         'Adams, Jaylen',
@@ -73,35 +96,504 @@ class NbaServiceTest(unittest.TestCase):
     ]
     self.assertEqual(actual_names, expected_names)
     mock_get.assert_called_once_with(
-        'http://data.nba.net/prod/v1/2020/players.json')
+        'http://data.nba.net/prod/v1/2020/players.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_roster(self, mock_get):
     response = self.nba_service.roster('knicks', '2020')
     expected = set(['1629628', '1629649', '203493', '202692'])
     self.assertEqual(response, expected)
     mock_get.assert_called_once_with(
-        'http://data.nba.net/prod/v1/2020/teams/knicks/roster.json')
+        'http://data.nba.net/prod/v1/2020/teams/knicks/roster.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_schedule(self, mock_get):
     response = self.nba_service.schedule('knicks', '2020')
     # Just verify a few properties instead of the entire large response.
-    actual = list(map(lambda s: s['gameId'], response['league']['standard']))
+    actual = list(map(lambda s: s.game_id, response.games))
     expected = ['0012000002', '0012000015', '0012000028']
     self.assertEqual(actual[0:3], expected)
     mock_get.assert_called_once_with(
-        'http://data.nba.net/data/10s/prod/v1/2020/teams/knicks/schedule.json')
+        'http://data.nba.net/data/10s/prod/v1/2020/teams/knicks/schedule.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
 
-  @patch('requests.get', side_effect=mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
+  def test_scoreboard(self, mock_get):
+    games = self.nba_service.scoreboard('20201229')
+    self.assertEqual(
+        [(g.game_url_code, g.status) for g in games],
+        [('20201229/ORLOKC', GAME_FINAL), ('20201229/LALSAS', GAME_IN_PROGRESS),
+         ('20201229/NYKCLE', GAME_SCHEDULED),
+         ('20201229/BOSMEM', GAME_SCHEDULED)])
+    self.assertEqual(games[0].road.tri_code, 'ORL')
+    self.assertTrue(games[0].home.has_score)
+    self.assertFalse(games[2].home.has_score)
+    mock_get.assert_called_once_with(
+        'http://data.nba.net/prod/v2/20201229/scoreboard.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
+
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_teams(self, mock_get):
     teams = self.nba_service.teams('2020')
     # Just spot check a few properties instead of the entire large response.
-    self.assertEqual('Atlanta Hawks', teams['1610612737']['fullName'])
-    self.assertEqual('Hawks', teams['1610612737']['nickname'])
-    self.assertEqual('Boston Celtics', teams['1610612738']['fullName'])
+    self.assertEqual('Atlanta Hawks', teams['1610612737'].full_name)
+    self.assertEqual('Hawks', teams['1610612737'].nickname)
+    self.assertEqual('Boston Celtics', teams['1610612738'].full_name)
     mock_get.assert_called_once_with(
-        'http://data.nba.net/10s/prod/v1/2020/teams.json')
+        'http://data.nba.net/10s/prod/v1/2020/teams.json',
+        headers={},
+        timeout=DEFAULT_TIMEOUT)
+
+
+class MemoTest(unittest.TestCase):
+
+  def setUp(self):
+    logging.basicConfig(level=logging.ERROR)
+    self.now = 0
+    self.nba_service = FakeNbaService(clock=lambda: self.now)
+
+  def test_get_withinTtl_fetchesOnce(self):
+    first = self.nba_service.teams('2020')
+    self.now += 60
+    second = self.nba_service.teams('2020')
+
+    self.assertEqual(first, second)
+    self.assertEqual(self.nba_service.fetched_urls, [
+      'http://data.nba.net/10s/prod/v1/2020/teams.json',
+    ])
+    self.assertEqual(self.nba_service.stats['memo.hit'], 1)
+
+  def test_get_afterTtl_fetchesAgain(self):
+    self.nba_service.boxscore('20201227', '0022000036')
+    self.now += DEFAULT_TTLS['boxscore'].total_seconds()
+    self.nba_service.boxscore('20201227', '0022000036')
+
+    self.assertEqual(len(self.nba_service.fetched_urls), 2)
+
+  def test_get_differentUrls_fetchesEach(self):
+    self.nba_service.boxscore('20201227', '0022000036')
+    self.nba_service.boxscore('20201229', '0022000046')
+
+    self.assertEqual(len(self.nba_service.fetched_urls), 2)
+
+  def test_get_overMemoSize_evictsLeastRecentlyUsed(self):
+    nba_service = FakeNbaService(memo_size=2, clock=lambda: self.now)
+    nba_service.teams('2020')
+    nba_service.players('2020')
+    nba_service.teams('2020')  # Now players is the least recently used.
+    nba_service.conference_standings()
+    nba_service.teams('2020')
+    nba_service.players('2020')
+
+    self.assertEqual(nba_service.fetched_urls, [
+      'http://data.nba.net/10s/prod/v1/2020/teams.json',
+      'http://data.nba.net/prod/v1/2020/players.json',
+      'http://data.nba.net/10s/prod/v1/current/standings_conference.json',
+      'http://data.nba.net/prod/v1/2020/players.json',
+    ])
+    self.assertEqual(nba_service.stats['memo.evicted'], 2)
+
+  def test_get_ttlOverride_disablesMemo(self):
+    nba_service = FakeNbaService(
+        ttls={'schedule': timedelta(0)}, clock=lambda: self.now)
+    nba_service.schedule('knicks', '2020')
+    nba_service.schedule('knicks', '2020')
+    nba_service.teams('2020')
+    nba_service.teams('2020')
+
+    self.assertEqual(nba_service.fetched_urls, [
+      'http://data.nba.net/data/10s/prod/v1/2020/teams/knicks/schedule.json',
+      'http://data.nba.net/data/10s/prod/v1/2020/teams/knicks/schedule.json',
+      'http://data.nba.net/10s/prod/v1/2020/teams.json',
+    ])
+
+  def test_get_sharedCacheDir_otherServiceReusesBody(self):
+    with tempfile.TemporaryDirectory() as cache_dir:
+      sidebar_service = FakeNbaService(cache_dir=cache_dir)
+      game_thread_service = FakeNbaService(cache_dir=cache_dir)
+
+      # Schedules compare by identity, so compare their games.
+      self.assertEqual(
+          list(sidebar_service.schedule('knicks', '2020').games),
+          list(game_thread_service.schedule('knicks', '2020').games))
+      self.assertEqual(len(sidebar_service.fetched_urls), 1)
+      self.assertEqual(game_thread_service.fetched_urls, [])
+      self.assertEqual(game_thread_service.stats['shared.hit'], 1)
+
+  def test_season_year_laterRun_noRequest(self):
+    now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    with tempfile.TemporaryDirectory() as cache_dir:
+      self.assertEqual(
+          FakeNbaService(cache_dir=cache_dir).season_year(now), 2020)
+
+      # Long after the shared cache's copy of today.json expired.
+      later_run = FakeNbaService(cache_dir=cache_dir)
+      self.assertEqual(later_run.season_year(now + timedelta(days=30)), 2020)
+      self.assertEqual(later_run.fetched_urls, [])
+
+  def test_schedule_seasonNotFound_seasonYearCheckedAgain(self):
+    now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    with tempfile.TemporaryDirectory() as cache_dir:
+      # What a run before the 2020 season was scheduled remembered.
+      with open(os.path.join(cache_dir, 'season.json'), 'w') as f:
+        json.dump(
+            {'season_year': 2019, 'derived': 2020, 'checked_on': '2020-12-01'},
+            f)
+      service = SeasonOnlyFakeNbaService(2020, cache_dir=cache_dir)
+      year = service.season_year(now)
+
+      with patch.object(
+          service.season_year_resolver,
+          'season_year',
+          wraps=service.season_year_resolver.season_year) as season_year:
+        schedule = service.schedule('knicks', year, now)
+      # At the caller's time, not the clock's.
+      season_year.assert_called_once_with(now)
+
+      self.assertEqual(year, 2019)
+      self.assertEqual(schedule.games[7].game_url_code, '20201229/NYKCLE')
+      self.assertEqual(
+          [url.split('/prod/v1/')[-1] for url in service.fetched_urls],
+          ['2019/teams/knicks/schedule.json',
+           'today.json',
+           '2020/teams/knicks/schedule.json'])
+      self.assertEqual(service.stats['season.retried'], 1)
+
+  def test_schedule_currentSeasonNotFound_raises(self):
+    with tempfile.TemporaryDirectory() as cache_dir:
+      service = SeasonOnlyFakeNbaService(2019, cache_dir=cache_dir)
+
+      with self.assertRaises(requests.HTTPError):
+        service.schedule('knicks', 2020)
+
+      self.assertEqual(service.stats['season.retried'], 0)
+
+
+class SeasonOnlyFakeNbaService(FakeNbaService):
+  """Answers 404 for the data of every season but one."""
+
+  def __init__(self, season_year, **kwargs):
+    super().__init__(**kwargs)
+    self.season_year_with_data = season_year
+
+  def _download(self, endpoint, url):
+    if '/prod/v1/20' in url \
+        and f'/prod/v1/{self.season_year_with_data}/' not in url:
+      self.fetched_urls.append(url)
+      response = requests.Response()
+      response.status_code = 404
+      raise requests.HTTPError(
+          f'404 Client Error: Not Found for url: {url}', response=response)
+    return super()._download(endpoint, url)
+
+
+class BlockingFakeNbaService(FakeNbaService):
+  """Holds every download until release is set, then answers it from
+  testdata or raises error if one is set."""
+
+  def __init__(self, **kwargs):
+    super().__init__(**kwargs)
+    self.release = threading.Event()
+    self.error = None
+
+  def _download(self, endpoint, url):
+    self.release.wait(5)
+    if self.error is not None:
+      raise self.error
+    return super()._download(endpoint, url)
+
+
+class SingleFlightTest(unittest.TestCase):
+
+  def setUp(self):
+    logging.basicConfig(level=logging.ERROR)
+    self.nba_service = BlockingFakeNbaService()
+
+  def call_concurrently(self, method, callers):
+    """Calls method from several threads at once and returns each thread's
+    result or exception once the held download is released."""
+    results = [None] * callers
+
+    def call(i):
+      try:
+        results[i] = method()
+      except Exception as e:
+        results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for t in threads:
+      t.start()
+    # Wait until every caller is either fetching or waiting on the fetch.
+    for _ in range(500):
+      stats = self.nba_service.stats
+      if (stats['singleflight.originator'] +
+          stats['singleflight.follower'] == callers):
+        break
+      time.sleep(0.01)
+    self.nba_service.release.set()
+    for t in threads:
+      t.join()
+    return results
+
+  def test_get_concurrentCallers_shareOneFetch(self):
+    results = self.call_concurrently(self.nba_service.conference_standings, 5)
+
+    self.assertEqual(len(self.nba_service.fetched_urls), 1)
+    for result in results:
+      self.assertIs(result, results[0])
+    self.assertEqual(self.nba_service.stats['singleflight.originator'], 1)
+    self.assertEqual(self.nba_service.stats['singleflight.follower'], 4)
+
+  def test_get_memoDisabled_stillCoalesces(self):
+    self.nba_service = BlockingFakeNbaService(ttls={'boxscore': timedelta(0)})
+    results = self.call_concurrently(
+        lambda: self.nba_service.boxscore('20201227', '0022000036'), 3)
+
+    self.assertEqual(len(self.nba_service.fetched_urls), 1)
+    self.assertIs(results[1], results[0])
+    self.assertIs(results[2], results[0])
+
+  def test_get_fetchFails_allCallersSeeErrorAndNextCallRetries(self):
+    self.nba_service.error = requests.HTTPError('503 Server Error')
+    results = self.call_concurrently(self.nba_service.conference_standings, 3)
+
+    for result in results:
+      self.assertIsInstance(result, requests.HTTPError)
+
+    self.nba_service.error = None
+    self.assertEqual(self.nba_service.conference_standings().season_year, 2017)
+    self.assertEqual(self.nba_service.stats['singleflight.originator'], 2)
+
+
+class ServerErrorResponse:
+  status_code = 503
+  content = b''
+  headers = {}
+  elapsed = timedelta(milliseconds=10)
+
+
+class ResilienceTest(unittest.TestCase):
+
+  def setUp(self):
+    logging.basicConfig(level=logging.ERROR)
+    self.logger = logging.getLogger(__name__)
+    self.sleeps = []
+    self.tmp_dir = tempfile.TemporaryDirectory()
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def service(self, **kwargs):
+    kwargs.setdefault('cache_dir', None)
+    return NbaService(
+        self.logger,
+        backoff=Backoff(attempts=3, base=0.4, random=lambda: 0.5),
+        sleep=self.sleeps.append,
+        **kwargs)
+
+  def store_today(self):
+    """Fetches today.json once so a copy is kept in the shared cache."""
+    with patch('requests.Session.get', side_effect=mocked_requests_get):
+      self.service(cache_dir=self.tmp_dir.name).current_year()
+
+  @patch('requests.Session.get')
+  def test_download_serverError_retriesWithJitteredBackoff(self, mock_get):
+    mock_get.side_effect = [
+      ServerErrorResponse(),
+      ServerErrorResponse(),
+      MockResponse('services/testdata/today.json', 200),
+    ]
+    nba_service = self.service()
+
+    self.assertEqual(nba_service.current_year(), 2020)
+    self.assertEqual(self.sleeps, [0.2, 0.4])
+    self.assertEqual(nba_service.stats['http.retries'], 2)
+
+  @patch('requests.Session.get', side_effect=requests.Timeout('slow'))
+  def test_download_keepsTimingOut_raises(self, mock_get):
+    nba_service = self.service()
+
+    with self.assertRaises(requests.Timeout):
+      nba_service.current_year()
+    self.assertEqual(mock_get.call_count, 3)
+    self.assertEqual(nba_service.stats['http.timeouts'], 3)
+
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
+  def test_download_deadlinePassed_sendsNothing(self, mock_get):
+    nba_service = self.service(run_budget=0)
+
+    with self.assertRaises(DeadlineExceeded):
+      nba_service.current_year()
+    mock_get.assert_not_called()
+    self.assertEqual(nba_service.stats['deadline.exceeded'], 1)
+
+  def test_fetch_upstreamDown_servesStaleCopy(self):
+    self.store_today()
+    # No TTL so the stored copy isn't fresh.
+    nba_service = self.service(
+        cache_dir=self.tmp_dir.name, ttls={'current_year': timedelta(0)})
+
+    with patch('requests.Session.get', side_effect=requests.ConnectionError()):
+      self.assertEqual(nba_service.current_year(), 2020)
+    self.assertEqual(nba_service.stats['stale.served'], 1)
+
+  def test_fetch_breakerOpen_skipsNetworkAndServesStaleCopy(self):
+    self.store_today()
+    nba_service = self.service(
+        cache_dir=self.tmp_dir.name, ttls={'current_year': timedelta(0)})
+    nba_service.shared_cache.put_breaker('data.nba.net', 5, time.time() + 60)
+
+    with patch('requests.Session.get') as mock_get:
+      self.assertEqual(nba_service.current_year(), 2020)
+    mock_get.assert_not_called()
+    self.assertEqual(nba_service.stats['breaker.rejected'], 1)
+    self.assertEqual(nba_service.stats['stale.served'], 1)
+
+  def test_download_repeatedFailures_tripBreakerForLaterRuns(self):
+    with patch('requests.Session.get', side_effect=requests.ConnectionError()):
+      for _ in range(5):
+        with self.assertRaises(requests.ConnectionError):
+          self.service(cache_dir=self.tmp_dir.name).current_year()
+
+    nba_service = self.service(cache_dir=self.tmp_dir.name)
+    self.assertFalse(nba_service.breaker.allow())
+
+  def test_send_slowResponse_hedgeAnswersFirst(self):
+    release = threading.Event()
+    calls = []
+
+    def slow_then_fast(*args, **kwargs):
+      calls.append(args[0])
+      if len(calls) == 1:
+        release.wait(5)
+      return mocked_requests_get(*args, **kwargs)
+
+    nba_service = self.service(hedge_after=0.05)
+    with patch('requests.Session.get', side_effect=slow_then_fast):
+      self.assertEqual(nba_service.current_year(), 2020)
+      release.set()
+
+    self.assertEqual(len(calls), 2)
+    self.assertEqual(nba_service.stats['http.hedged'], 1)
+    self.assertEqual(nba_service.stats['http.hedge_won'], 1)
+
+  def test_close_stopsHedgeThreads(self):
+    with self.service(hedge_after=0.05) as nba_service:
+      with patch('requests.Session.get', side_effect=mocked_requests_get):
+        nba_service.current_year()
+      threads = list(nba_service._hedge_executor._threads)
+
+    self.assertTrue(threads)
+    for thread in threads:
+      thread.join(5)
+      self.assertFalse(thread.is_alive())
+
+  def test_close_keepsSessionItWasGiven(self):
+    session = MagicMock()
+
+    with self.service(session=session):
+      pass
+
+    session.close.assert_not_called()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+  """Serves files from services/testdata over keep-alive HTTP/1.1 and answers
+  conditional requests with 304 Not Modified."""
+
+  protocol_version = 'HTTP/1.1'
+
+  def do_GET(self):
+    testdata_path = 'services/testdata/' + self.path.split('/')[-1]
+    if not os.path.isfile(testdata_path):
+      self.send_error(404)
+      return
+    with open(testdata_path, 'rb') as f:
+      body = f.read()
+    etag = '"%s"' % hashlib.sha1(body).hexdigest()
+    if self.headers.get('If-None-Match') == etag:
+      self.send_response(304)
+      self.send_header('ETag', etag)
+      self.end_headers()
+      return
+    self.send_response(200)
+    self.send_header('ETag', etag)
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format, *args):
+    pass
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+  def setUp(self):
+    self.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+
+  def tearDown(self):
+    self.server.shutdown()
+    self.server.server_close()
+
+  def test_new_session_reusesKeepAliveConnection(self):
+    stats = Stats()
+    session = new_session(stats)
+
+    for file_name in ['today.json', 'teams.json', 'roster.json']:
+      session.get(f'{self.base_url}/{file_name}', timeout=DEFAULT_TIMEOUT) \
+          .raise_for_status()
+
+    self.assertEqual(stats['http.requests'], 3)
+    self.assertEqual(stats['http.connections.new'], 1)
+    self.assertEqual(stats['http.connections.reused'], 2)
+
+  def test_download_sharesSessionAcrossMethods(self):
+    nba_service = NbaService(logging.getLogger(__name__), cache_dir=None)
+    url = f'{self.base_url}/today.json'
+
+    nba_service._download('current_year', url)
+    nba_service._download('current_year', url)
+
+    self.assertEqual(nba_service.stats['http.connections.new'], 1)
+    self.assertEqual(nba_service.stats['http.connections.reused'], 1)
+
+  def test_download_notModified_servesCachedBody(self):
+    with tempfile.TemporaryDirectory() as cache_dir:
+      nba_service = NbaService(logging.getLogger(__name__), cache_dir=cache_dir)
+      url = f'{self.base_url}/teams.json'
+
+      first = nba_service._download('teams', url)
+      second = nba_service._download('teams', url)
+
+      self.assertEqual(first, second)
+      self.assertEqual(nba_service.stats['cache.miss.teams'], 1)
+      self.assertEqual(nba_service.stats['cache.hit.teams'], 1)
+      self.assertEqual(
+          nba_service.stats['cache.bytes_saved.teams'],
+          os.path.getsize('services/testdata/teams.json'))
+
+  def test_log_stats_addsToDailyTotals(self):
+    with tempfile.TemporaryDirectory() as cache_dir:
+      nba_service = NbaService(logging.getLogger(__name__), cache_dir=cache_dir)
+      url = f'{self.base_url}/today.json'
+
+      nba_service._download('current_year', url)
+      nba_service.log_stats()
+      nba_service._download('current_year', url)
+      nba_service.log_stats()
+
+      totals = nba_service.http_cache.add_daily_stats(date.today(), Counter())
+      self.assertEqual(totals['cache.miss.current_year'], 1)
+      self.assertEqual(totals['cache.hit.current_year'], 1)
 
 
 if __name__ == '__main__':
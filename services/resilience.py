@@ -0,0 +1,167 @@
+"""
+Keeps a bot run bounded and well-behaved when data.nba.net is slow or down.
+
+Deadline turns a budget for the whole run into per-request timeouts, so a
+stalled upstream can't make a cron run overlap with the next one. Backoff spaces
+out retries of transient failures with exponential backoff and full jitter.
+CircuitBreaker stops calling the upstream after repeated failures; its state is
+kept in the SharedCache database so the next runs (and the other bot) skip the
+network too until a cooldown has passed.
+"""
+
+from services.stats import Stats
+
+import random
+import requests
+import time
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+  """The run's time budget was spent before a request could be sent."""
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+  """The circuit breaker is open so the request was not sent."""
+
+
+def is_upstream_failure(e):
+  """Whether exception e means the upstream is unhealthy (as opposed to e.g. a
+  404 for a box score that doesn't exist yet)."""
+  if isinstance(e, (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout)):
+    return True
+  return isinstance(e, requests.exceptions.HTTPError) \
+      and e.response is not None and e.response.status_code >= 500
+
+
+class Deadline:
+
+  def __init__(self, budget, clock=time.monotonic):
+    """
+    Parameters
+    ----------
+    budget: float
+      Seconds from now until the deadline.
+    clock: function
+      Returns the current time in seconds.
+    """
+    self.clock = clock
+    self.expires_at = clock() + budget
+
+  def remaining(self):
+    return max(0.0, self.expires_at - self.clock())
+
+  def timeout(self, timeout):
+    """Returns the (connect, read) timeout tuple capped at the time remaining.
+
+    Raises
+    ------
+    DeadlineExceeded
+      If no time is left.
+    """
+    remaining = self.remaining()
+    if remaining <= 0:
+      raise DeadlineExceeded('The run deadline has passed.')
+    return tuple(min(t, remaining) for t in timeout)
+
+
+class Backoff:
+
+  def __init__(self, attempts=3, base=0.3, cap=5.0, random=random.random):
+    """
+    Parameters
+    ----------
+    attempts: int
+      The maximum number of times a request is sent, including the first.
+    base: float
+      The upper bound in seconds of the delay before the first retry. It
+      doubles for every further retry.
+    cap: float
+      The largest upper bound in seconds of any delay.
+    random: function
+      Returns a float in [0, 1).
+    """
+    self.attempts = attempts
+    self.base = base
+    self.cap = cap
+    self.random = random
+
+  def delay(self, retry):
+    """Returns the seconds to wait before the given retry (0 is the first),
+    picked uniformly up to the exponential bound ("full jitter") so that bots
+    retrying at the same time don't all hit the server together."""
+    return self.random() * min(self.cap, self.base * 2 ** retry)
+
+
+class CircuitBreaker:
+
+  def __init__(
+      self,
+      name,
+      shared_cache=None,
+      failure_threshold=5,
+      cooldown=60.0,
+      stats=None,
+      clock=time.time):
+    """
+    Parameters
+    ----------
+    name: str
+      Identifies the upstream, e.g. "data.nba.net".
+    shared_cache: services.shared_cache.SharedCache
+      Where the state is persisted for other processes and later runs. If None
+      the state only lives as long as this object.
+    failure_threshold: int
+      Consecutive failed requests that open the breaker.
+    cooldown: float
+      Seconds the breaker stays open. After that requests are let through
+      again; the first failure re-opens it and the first success closes it.
+    stats: services.stats.Stats
+      Receives the "breaker.tripped" and "breaker.rejected" counts.
+    clock: function
+      Returns the current unix time in seconds.
+    """
+    self.name = name
+    self.shared_cache = shared_cache
+    self.failure_threshold = failure_threshold
+    self.cooldown = cooldown
+    self.stats = stats if stats is not None else Stats()
+    self.clock = clock
+    self._failures = 0
+    self._opened_until = 0.0
+
+  def allow(self):
+    """Returns whether a request may be sent to the upstream."""
+    self._load()
+    if self._opened_until > self.clock():
+      self.stats.add('breaker.rejected')
+      return False
+    return True
+
+  def record_success(self):
+    self._load()
+    if self._failures or self._opened_until:
+      self._failures = 0
+      self._opened_until = 0.0
+      self._save()
+
+  def record_failure(self):
+    self._load()
+    self._failures += 1
+    now = self.clock()
+    # A failure after the cooldown (half-open) re-opens it straight away.
+    if self._opened_until <= now and (
+        self._failures >= self.failure_threshold or self._opened_until):
+      self._opened_until = now + self.cooldown
+      self.stats.add('breaker.tripped')
+    self._save()
+
+  def _load(self):
+    if self.shared_cache is not None:
+      self._failures, self._opened_until = \
+          self.shared_cache.get_breaker(self.name)
+
+  def _save(self):
+    if self.shared_cache is not None:
+      self.shared_cache.put_breaker(
+          self.name, self._failures, self._opened_until)
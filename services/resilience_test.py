@@ -0,0 +1,108 @@
+from services.resilience import Backoff, CircuitBreaker, Deadline
+from services.resilience import DeadlineExceeded
+from services.shared_cache import SharedCache
+from services.stats import Stats
+
+import os
+import tempfile
+import unittest
+
+
+class DeadlineTest(unittest.TestCase):
+
+  def test_timeout_capsAtRemainingTime(self):
+    now = [100.0]
+    deadline = Deadline(12, clock=lambda: now[0])
+    self.assertEqual(deadline.timeout((3.05, 10)), (3.05, 10))
+
+    now[0] += 8
+    self.assertEqual(deadline.timeout((3.05, 10)), (3.05, 4))
+
+  def test_timeout_noTimeLeft_raises(self):
+    now = [100.0]
+    deadline = Deadline(5, clock=lambda: now[0])
+    now[0] += 5
+
+    with self.assertRaises(DeadlineExceeded):
+      deadline.timeout((3.05, 10))
+
+
+class BackoffTest(unittest.TestCase):
+
+  def test_delay_growsExponentiallyUpToCap(self):
+    backoff = Backoff(base=0.5, cap=3, random=lambda: 0.999999)
+    delays = [round(backoff.delay(retry), 2) for retry in range(5)]
+    self.assertEqual(delays, [0.5, 1.0, 2.0, 3.0, 3.0])
+
+  def test_delay_isJittered(self):
+    backoff = Backoff(base=0.5, cap=3, random=lambda: 0.25)
+    self.assertEqual(backoff.delay(2), 0.5)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.shared_cache = SharedCache(
+        os.path.join(self.tmp_dir.name, 'shared.sqlite3'))
+    self.now = 1000.0
+    self.stats = Stats()
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def breaker(self):
+    return CircuitBreaker(
+        'data.nba.net',
+        self.shared_cache,
+        failure_threshold=2,
+        cooldown=60,
+        stats=self.stats,
+        clock=lambda: self.now)
+
+  def test_record_failure_belowThreshold_staysClosed(self):
+    breaker = self.breaker()
+    breaker.record_failure()
+    self.assertTrue(breaker.allow())
+
+  def test_record_failure_atThreshold_opensForEveryInstance(self):
+    self.breaker().record_failure()
+    self.breaker().record_failure()
+
+    # A new instance stands in for the next run or the other bot.
+    self.assertFalse(self.breaker().allow())
+    self.assertEqual(self.stats['breaker.tripped'], 1)
+    self.assertEqual(self.stats['breaker.rejected'], 1)
+
+  def test_record_success_resetsFailures(self):
+    breaker = self.breaker()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    self.assertTrue(breaker.allow())
+
+  def test_allow_afterCooldown_halfOpen(self):
+    breaker = self.breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    self.now += 60
+
+    self.assertTrue(breaker.allow())
+    # One failure is enough to open it again.
+    breaker.record_failure()
+    self.assertFalse(breaker.allow())
+    self.assertEqual(self.stats['breaker.tripped'], 2)
+
+  def test_allow_afterCooldownAndSuccess_closed(self):
+    breaker = self.breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    self.now += 60
+    breaker.record_success()
+    breaker.record_failure()
+
+    self.assertTrue(breaker.allow())
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,149 @@
+"""
+Partially parses the team schedule.json response.
+
+Most runs only look at lastStandardGamePlayedIndex and the one or two games
+around it, but json.loads would turn all ~80 games (plus the _internal block
+and the summer league schedules) into dicts on every run. parse_schedule reads
+the document up to the start of league.standard and returns games that are only
+decoded when they are first accessed, in order, stopping at the last game
+anyone asked for. A convert function can turn each decoded game into a model.
+The bots find their games through a SeasonCalendar, which indexes the games
+in the same order and stops as soon as it has the ones it was asked about.
+"""
+
+from collections.abc import Sequence
+
+import json
+import threading
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def parse_schedule(body, convert=None):
+  """Returns {'league': {'lastStandardGamePlayedIndex': int, 'standard':
+  LazyGames}} for the schedule.json body (str). Other fields are not parsed.
+
+  Parameters
+  ----------
+  body: str
+  convert: function
+    Called with each game's dict as it's decoded; the games are whatever it
+    returns. If None, the games are dicts.
+  """
+  pos = _skip(body, _expect(body, _skip(body, 0), '{'))
+  while body[pos] != '}':
+    key, pos = _key(body, pos)
+    if key == 'league':
+      return {'league': _parse_league(body, pos, convert)}
+    _, pos = _DECODER.raw_decode(body, pos)
+    pos = _next_member(body, pos)
+  raise ValueError('Schedule has no "league" field.')
+
+
+def _parse_league(body, pos, convert):
+  league = {}
+  pos = _skip(body, _expect(body, pos, '{'))
+  while body[pos] != '}':
+    key, pos = _key(body, pos)
+    if key == 'standard' and 'lastStandardGamePlayedIndex' in league:
+      league['standard'] = LazyGames(body, pos, convert)
+      return league
+    # If the games come before the index there's no point being lazy.
+    value, pos = _DECODER.raw_decode(body, pos)
+    if key == 'standard' and convert is not None:
+      value = [convert(game) for game in value]
+    if key in ('standard', 'lastStandardGamePlayedIndex'):
+      league[key] = value
+      if len(league) == 2:
+        return league
+    pos = _next_member(body, pos)
+  return league
+
+
+def _key(body, pos):
+  """Decodes the object key at pos and returns it with the position of its
+  value."""
+  key, pos = _DECODER.raw_decode(body, pos)
+  return key, _skip(body, _expect(body, _skip(body, pos), ':'))
+
+
+def _next_member(body, pos):
+  """Returns the position of the next key after a value that ended at pos, or
+  of the closing brace if there are no more members."""
+  pos = _skip(body, pos)
+  return _skip(body, pos + 1) if body[pos] == ',' else pos
+
+
+def _skip(body, pos):
+  while body[pos] in _WHITESPACE:
+    pos += 1
+  return pos
+
+
+def _expect(body, pos, char):
+  if body[pos] != char:
+    raise ValueError(f'Expected "{char}" at position {pos} of the schedule.')
+  return pos + 1
+
+
+class LazyGames(Sequence):
+  """The league.standard array of games, decoded one game at a time as far as
+  the largest index accessed so far. len() and negative indexes decode all of
+  them. Like the calendars built on them, they compare and hash by identity,
+  since comparing games would decode all of them."""
+
+  def __init__(self, body, pos, convert=None):
+    """
+    Parameters
+    ----------
+    body: str
+      The whole schedule.json document.
+    pos: int
+      The position of the array's opening bracket in body.
+    convert: function
+      Turns each decoded game dict into the object that is returned for it.
+    """
+    self._body = body
+    self._convert = convert
+    self._pos = _skip(body, _expect(body, pos, '['))
+    self._games = []
+    self._done = body[self._pos] == ']'
+    self._lock = threading.Lock()
+
+  def __getitem__(self, i):
+    if isinstance(i, slice):
+      if i.stop is None or i.stop < 0 or (i.start or 0) < 0:
+        self._decode_all()
+      else:
+        self._decode_until(i.stop - 1)
+      return self._games[i]
+    if i < 0:
+      self._decode_all()
+    else:
+      self._decode_until(i)
+    return self._games[i]
+
+  def __len__(self):
+    self._decode_all()
+    return len(self._games)
+
+  def decoded_count(self):
+    """Returns how many games have been decoded so far."""
+    return len(self._games)
+
+  def _decode_all(self):
+    self._decode_until(float('inf'))
+
+  def _decode_until(self, i):
+    with self._lock:
+      while len(self._games) <= i and not self._done:
+        game, pos = _DECODER.raw_decode(self._body, self._pos)
+        self._games.append(
+            self._convert(game) if self._convert is not None else game)
+        pos = _skip(self._body, pos)
+        if self._body[pos] == ']':
+          self._done = True
+          self._body = None  # Nothing left to decode, so let the text go.
+        else:
+          self._pos = _skip(self._body, _expect(self._body, pos, ','))
@@ -0,0 +1,84 @@
+from services.schedule_parser import parse_schedule
+
+import json
+import unittest
+
+
+class ScheduleParserTest(unittest.TestCase):
+
+  def setUp(self):
+    with open('services/testdata/schedule.json', 'r') as f:
+      self.body = f.read()
+    self.expected = json.loads(self.body)['league']
+
+  def test_parse_schedule_matchesFullParse(self):
+    league = parse_schedule(self.body)['league']
+
+    self.assertEqual(
+        league['lastStandardGamePlayedIndex'],
+        self.expected['lastStandardGamePlayedIndex'])
+    self.assertEqual(list(league['standard']), self.expected['standard'])
+    self.assertEqual(len(league['standard']), len(self.expected['standard']))
+
+  def test_parse_schedule_decodesNoGamesUpFront(self):
+    games = parse_schedule(self.body)['league']['standard']
+    self.assertEqual(games.decoded_count(), 0)
+
+  def test_getitem_decodesOnlyUpToIndex(self):
+    games = parse_schedule(self.body)['league']['standard']
+
+    self.assertEqual(games[7], self.expected['standard'][7])
+    self.assertEqual(games[2], self.expected['standard'][2])
+    self.assertEqual(games.decoded_count(), 8)
+
+  def test_getitem_slice_decodesOnlyUpToStop(self):
+    games = parse_schedule(self.body)['league']['standard']
+
+    self.assertEqual(games[5:9], self.expected['standard'][5:9])
+    self.assertEqual(games.decoded_count(), 9)
+
+  def test_getitem_pastEnd(self):
+    games = parse_schedule(self.body)['league']['standard']
+
+    self.assertEqual(games[40:42], self.expected['standard'][40:42])
+    with self.assertRaises(IndexError):
+      games[41]
+
+  def test_getitem_negativeIndex_decodesAll(self):
+    games = parse_schedule(self.body)['league']['standard']
+
+    self.assertEqual(games[-1], self.expected['standard'][-1])
+    self.assertEqual(games.decoded_count(), len(self.expected['standard']))
+
+  def test_parse_schedule_convert_appliedToDecodedGames(self):
+    games = parse_schedule(
+        self.body, lambda game: game['gameId'])['league']['standard']
+
+    self.assertEqual(games[1], self.expected['standard'][1]['gameId'])
+    self.assertEqual(games.decoded_count(), 2)
+
+  def test_parse_schedule_noGames(self):
+    games = parse_schedule(
+        '{"league": {"lastStandardGamePlayedIndex": 0, "standard": [ ]}}'
+    )['league']['standard']
+
+    self.assertEqual(games[:5], [])
+    self.assertEqual(len(games), 0)
+
+  def test_parse_schedule_indexAfterGames(self):
+    league = parse_schedule(
+        '{"league": {"standard": [{"gameId": "1"}], "other": {},'
+        ' "lastStandardGamePlayedIndex": 0}}')['league']
+
+    self.assertEqual(league, {
+      'lastStandardGamePlayedIndex': 0,
+      'standard': [{'gameId': '1'}],
+    })
+
+  def test_parse_schedule_noLeague_raises(self):
+    with self.assertRaises(ValueError):
+      parse_schedule('{"_internal": {"pubDateTime": "2020-12-29"}}')
+
+
+if __name__ == '__main__':
+  unittest.main()
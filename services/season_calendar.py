@@ -0,0 +1,248 @@
+"""
+Finds a team's games by time instead of by lastStandardGamePlayedIndex.
+
+The bots used to look for the current game next to the schedule's
+lastStandardGamePlayedIndex, which is only right as long as the feed updates
+it on time and the games are listed in the order they're played. When a game
+is postponed it stays in the feed without a score (so the index stops before
+it), and when it's rescheduled it keeps its place in the list under a new
+date. SeasonCalendar sorts the games by tip-off and looks them up with bisect
+on their tip-off times, so the current game is simply the last one that
+started, whatever the index says. Games the feed marks as postponed, and games
+that never got a score long after their tip-off, are skipped.
+
+The games are indexed lazily, in the order the feed lists them, and only as
+far as a lookup needs: until the listing has moved past the time looked up
+(see LISTED_PAST) and enough games after it are known. A run in the middle of
+the season decodes about as many games as the lookup next to
+lastStandardGamePlayedIndex did, and never decodes the rest of the season.
+Since the feed lists games in their original order, a game that was moved
+later is indexed at its new time as soon as its place in the list is reached.
+A game moved earlier is only found once the listing reaches its original
+date.
+
+Most of the time the feed's lastStandardGamePlayedIndex is right, and a run
+only asks for the current and the next game. So current_game and next_game
+first look at the few games listed from that index on (see _near_last_played)
+and only index the listing when those don't settle the answer, e.g. because
+one of them was postponed or moved.
+
+Calendars compare and hash by identity: comparing their games would decode
+the whole season.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import deque
+from constants import EASTERN_TIMEZONE
+from datetime import datetime, time, timedelta
+from services.models import GAME_FINAL, GAME_POSTPONED
+
+import threading
+
+# A game without a score this long after its tip-off wasn't played.
+UNPLAYED_AFTER = timedelta(hours=6)
+
+# The listing is past a time once this many games in a row tip off after it.
+# One isn't enough: it may be an earlier game that was moved later.
+LISTED_PAST = 2
+
+# How many games from lastStandardGamePlayedIndex on are looked at before the
+# listing is indexed: the last game played, the next one and LISTED_PAST games
+# after that.
+NEAR_LAST_PLAYED = 2 + LISTED_PAST
+
+
+def is_postponed(game, now):
+  """Returns whether game won't be (or wasn't) played at its tip-off time."""
+  return game.extended_status == GAME_POSTPONED or (
+      not (game.home.has_score or game.road.has_score)
+      and game.start_time_utc + UNPLAYED_AFTER < now)
+
+
+def is_final(game):
+  """Returns whether game is over. Without a status, a game with a score is."""
+  if game.status is not None:
+    return game.status == GAME_FINAL
+  return game.home.has_score or game.road.has_score
+
+
+class SeasonCalendar:
+
+  def __init__(self, games, last_played_index=None):
+    """
+    Parameters
+    ----------
+    games: Sequence
+      The services.models.Game of a season, in the feed's order. They are only
+      read (and a LazyGames decoded) as far as lookups need.
+    last_played_index: int
+      The feed's lastStandardGamePlayedIndex, if known.
+    """
+    self._listed = games
+    self._last_played_index = last_played_index
+    self._pending = iter(games)
+    self._lock = threading.RLock()
+    # The games indexed so far, by tip-off, and their tip-off timestamps.
+    self._games = []
+    self._tip_offs = []
+    # The tip-offs of the last games indexed, in the feed's order.
+    self._last_listed = deque(maxlen=LISTED_PAST)
+    self._by_id = None
+
+  @classmethod
+  def of(cls, schedule):
+    """Returns the calendar of a services.models.Schedule, or a new one for its
+    games if it doesn't have one."""
+    return schedule.calendar if schedule.calendar is not None \
+        else cls(schedule.games, schedule.last_played_index)
+
+  def _index_next(self):
+    """Indexes the next listed game. Returns False if there are none left."""
+    game = next(self._pending, None) if self._pending is not None else None
+    if game is None:
+      self._pending = None
+      return False
+    tip_off = game.start_time_utc.timestamp()
+    i = bisect_right(self._tip_offs, tip_off)
+    self._tip_offs.insert(i, tip_off)
+    self._games.insert(i, game)
+    self._last_listed.append(tip_off)
+    return True
+
+  def _index_past(self, timestamp, count=0):
+    """Indexes listed games until the listing is past timestamp and at least
+    count indexed games tip off after it, or until there are no more."""
+    while len(self._last_listed) < LISTED_PAST \
+        or min(self._last_listed) <= timestamp \
+        or len(self._tip_offs) - bisect_right(self._tip_offs, timestamp) \
+            < count:
+      if not self._index_next():
+        return
+
+  @property
+  def games(self):
+    """All games, by tip-off."""
+    with self._lock:
+      while self._index_next():
+        pass
+      return tuple(self._games)
+
+  def game(self, game_id):
+    """Returns the game with game_id, or None."""
+    with self._lock:
+      if self._by_id is None:
+        self._by_id = {game.game_id: game for game in self.games}
+      return self._by_id.get(game_id)
+
+  def games_on(self, day):
+    """Returns the games that tip off on day (a date, Eastern time)."""
+    start, end = (
+        EASTERN_TIMEZONE.localize(datetime.combine(d, time()))
+        for d in (day, day + timedelta(days=1)))
+    return self.games_between(start, end)
+
+  def games_between(self, start, end):
+    """Returns the games that tip off at start or later and before end."""
+    with self._lock:
+      self._index_past(end.timestamp())
+      return tuple(
+          self._games[bisect_left(self._tip_offs, start.timestamp()):
+                      bisect_left(self._tip_offs, end.timestamp())])
+
+  def current_game(self, now, lead=timedelta(0)):
+    """Returns the last game that tips off by now + lead and wasn't postponed,
+    or None. This is the game in progress, the one about to start (within
+    lead) or the last one played."""
+    with self._lock:
+      timestamp = (now + lead).timestamp()
+      near = self._near_last_played(timestamp)
+      if near is not None:
+        played = [game for game in near[0] if not is_postponed(game, now)]
+        if played:
+          return played[-1]
+      self._index_past(timestamp)
+      for i in range(bisect_right(self._tip_offs, timestamp) - 1, -1, -1):
+        if not is_postponed(self._games[i], now):
+          return self._games[i]
+    return None
+
+  def next_game(self, now):
+    """Returns the first game that tips off after now and isn't postponed, or
+    None."""
+    with self._lock:
+      near = self._near_last_played(now.timestamp())
+      if near is not None:
+        for game in near[1]:
+          if not is_postponed(game, now):
+            return game
+      following = self._following(now, 1)
+    return following[0] if following else None
+
+  def window(self, now, before, after):
+    """Returns the current game (see current_game) with up to before games
+    ahead of it and after games following it, skipping postponed games. Near
+    the end of the season, the games missing after it are made up with more
+    games before it.
+    """
+    with self._lock:
+      following = self._following(now, after)
+      preceding = []
+      for i in range(
+          bisect_right(self._tip_offs, now.timestamp()) - 1, -1, -1):
+        if len(preceding) == before + 1 + after - len(following):
+          break
+        if not is_postponed(self._games[i], now):
+          preceding.append(self._games[i])
+    return tuple(reversed(preceding)) + tuple(following)
+
+  def _near_last_played(self, timestamp):
+    """Looks at the games listed from the feed's lastStandardGamePlayedIndex
+    on, until LISTED_PAST of them tip off after timestamp (but at most
+    NEAR_LAST_PLAYED games). If they're in tip-off order and at least the first
+    one tips off by timestamp, returns those that tip off by timestamp and
+    those after it, else None.
+
+    Like the listing itself, this trusts that no game listed before the index
+    tips off after it, and that no game listed after these tips off before
+    them.
+    """
+    i = self._last_played_index
+    if i is None or i < 0:
+      return None
+    if len(self._last_listed) == LISTED_PAST \
+        and min(self._last_listed) > timestamp:
+      return None  # Indexed past timestamp already, so bisect is cheaper.
+    near = []
+    split = 0
+    for j in range(i, i + NEAR_LAST_PLAYED):
+      try:
+        game = self._listed[j]
+      except IndexError:
+        break  # The end of the season.
+      if near and game.start_time_utc < near[-1].start_time_utc:
+        return None
+      near.append(game)
+      if game.start_time_utc.timestamp() <= timestamp:
+        split = len(near)
+      elif len(near) - split == LISTED_PAST:
+        break
+    else:
+      return None
+    if split == 0:
+      return None
+    return near[:split], near[split:]
+
+  def _following(self, now, count):
+    """Returns up to count games that tip off after now and aren't postponed,
+    by tip-off."""
+    timestamp = now.timestamp()
+    needed = count
+    while True:
+      self._index_past(timestamp, needed)
+      start = bisect_right(self._tip_offs, timestamp)
+      candidates = self._games[start:start + needed]
+      games = [game for game in candidates if not is_postponed(game, now)]
+      # Fewer candidates than needed means every game is indexed.
+      if len(games) >= count or len(candidates) < needed:
+        return games[:count]
+      needed += count - len(games)
@@ -0,0 +1,182 @@
+from constants import UTC
+from datetime import date, datetime, timedelta
+from services.fake_nba_service import FakeNbaService
+from services.models import GAME_FINAL, GAME_IN_PROGRESS, GAME_POSTPONED
+from services.models import GAME_SCHEDULED
+from services.models import Game, TeamLine
+from services.season_calendar import SeasonCalendar, is_final, is_postponed
+
+import unittest
+
+
+def game(
+    game_id, start_time_utc, score=None, status=None, extended_status=None):
+  return Game(
+      game_id=game_id,
+      game_url_code=f'{game_id}/NYKXXX',
+      start_date_eastern='',
+      start_time_utc=start_time_utc,
+      home=TeamLine(team_id='1610612752', score=score),
+      road=TeamLine(team_id='1610612739', score=score),
+      status=status,
+      extended_status=extended_status)
+
+
+class SeasonCalendarTest(unittest.TestCase):
+
+  def setUp(self):
+    # Games 6 (20201227/MILNYK, 2020-12-28T00:30Z, final) and 7
+    # (20201229/NYKCLE, 2020-12-30T00:00Z) of 41.
+    self.schedule = FakeNbaService().schedule('knicks', '2020')
+    self.calendar = self.schedule.calendar
+
+  def test_calendar_notIndexedUntilFirstLookup(self):
+    self.assertEqual(self.schedule.games.decoded_count(), 0)
+
+    self.calendar.next_game(datetime(2020, 12, 29, 12, 0, 0, 0, UTC))
+
+    # Up to lastStandardGamePlayedIndex, the next game and the one after it,
+    # which shows the listing is past the time looked up.
+    self.assertEqual(self.schedule.games.decoded_count(), 9)
+    self.assertEqual(len(self.calendar.games), 41)
+
+  def test_current_game_betweenGames_lastPlayed(self):
+    now = datetime(2020, 12, 29, 12, 0, 0, 0, UTC)
+    self.assertEqual(
+        self.calendar.current_game(now).game_url_code, '20201227/MILNYK')
+
+  def test_current_game_withinLead_nextGame(self):
+    now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+    self.assertEqual(
+        self.calendar.current_game(now, timedelta(hours=1)).game_url_code,
+        '20201229/NYKCLE')
+
+  def test_current_game_beforeSeason_none(self):
+    self.assertIsNone(
+        self.calendar.current_game(datetime(2020, 12, 1, 0, 0, 0, 0, UTC)))
+
+  def test_next_game(self):
+    now = datetime(2020, 12, 30, 0, 0, 0, 0, UTC)
+    self.assertEqual(
+        self.calendar.next_game(now).game_url_code, '20201231/NYKTOR')
+    self.assertIsNone(
+        self.calendar.next_game(datetime(2021, 3, 4, 0, 0, 0, 0, UTC)))
+
+  def test_games_on_easternDate(self):
+    # Tips off on Dec 30th in UTC, but it's an evening game on the 29th.
+    self.assertEqual(
+        [g.game_url_code for g in self.calendar.games_on(date(2020, 12, 29))],
+        ['20201229/NYKCLE'])
+    self.assertEqual(self.calendar.games_on(date(2020, 12, 30)), ())
+
+  def test_game_byId(self):
+    self.assertEqual(
+        self.calendar.game('0022000046').game_url_code, '20201229/NYKCLE')
+    self.assertIsNone(self.calendar.game('0022099999'))
+
+  def test_games_between(self):
+    games = self.calendar.games_between(
+        datetime(2020, 12, 28, 0, 30, 0, 0, UTC),
+        datetime(2021, 1, 1, 0, 30, 0, 0, UTC))
+    self.assertEqual(
+        [g.game_url_code for g in games],
+        ['20201227/MILNYK', '20201229/NYKCLE'])
+
+  def test_window_midSeason_currentGameWithNeighbours(self):
+    now = datetime(2020, 12, 29, 12, 0, 0, 0, UTC)
+
+    games = self.calendar.window(now, 5, 6)
+
+    self.assertEqual(games, tuple(self.schedule.games[1:13]))
+
+  def test_window_endOfSeason_morePastGames(self):
+    start = datetime(2021, 1, 1, 0, 0, 0, 0, UTC)
+    games = [
+      game(str(i), start + timedelta(days=i), 100, GAME_FINAL)
+      for i in range(15)]
+    calendar = SeasonCalendar(games)
+
+    window = calendar.window(start + timedelta(days=13, hours=3), 5, 6)
+
+    self.assertEqual(window, tuple(games[3:]))
+
+  def test_postponedGame_skipped(self):
+    first = game('1', datetime(2021, 1, 1, 0, 0, 0, 0, UTC), 100, GAME_FINAL)
+    postponed = game(
+        '2', datetime(2021, 1, 3, 0, 0, 0, 0, UTC), status=GAME_SCHEDULED,
+        extended_status=GAME_POSTPONED)
+    third = game('3', datetime(2021, 1, 5, 0, 0, 0, 0, UTC))
+    calendar = SeasonCalendar([first, postponed, third])
+
+    now = datetime(2021, 1, 3, 0, 0, 0, 0, UTC)
+    self.assertEqual(calendar.current_game(now), first)
+    self.assertEqual(calendar.next_game(now - timedelta(hours=1)), third)
+    self.assertEqual(calendar.window(now, 1, 1), (first, third))
+
+  def test_unscoredLongAfterTipOff_treatedAsPostponed(self):
+    unplayed = game('1', datetime(2021, 1, 1, 0, 0, 0, 0, UTC))
+
+    self.assertFalse(
+        is_postponed(unplayed, datetime(2021, 1, 1, 5, 0, 0, 0, UTC)))
+    self.assertTrue(
+        is_postponed(unplayed, datetime(2021, 1, 1, 7, 0, 0, 0, UTC)))
+
+  def test_rescheduledGame_foundAtNewTime(self):
+    # The feed keeps a moved game in its original place in the list.
+    played = game('1', datetime(2021, 1, 1, 0, 0, 0, 0, UTC), 100, GAME_FINAL)
+    moved = game('2', datetime(2021, 2, 1, 0, 0, 0, 0, UTC))
+    next_up = game('3', datetime(2021, 1, 5, 0, 0, 0, 0, UTC))
+    calendar = SeasonCalendar([played, moved, next_up])
+
+    now = datetime(2021, 1, 4, 0, 0, 0, 0, UTC)
+    self.assertEqual(calendar.next_game(now), next_up)
+    self.assertEqual(calendar.games, (played, next_up, moved))
+    self.assertEqual(
+        calendar.current_game(datetime(2021, 2, 1, 0, 30, 0, 0, UTC)), moved)
+
+  def test_current_game_lastPlayedIndexRight_notIndexed(self):
+    now = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+
+    game = self.calendar.current_game(now, timedelta(hours=1))
+
+    self.assertEqual(game.game_url_code, '20201229/NYKCLE')
+    # lastStandardGamePlayedIndex is 6: MILNYK, NYKCLE and the two after it.
+    self.assertEqual(self.schedule.games.decoded_count(), 10)
+    self.assertEqual(self.calendar._games, [])
+
+  def test_next_game_lastPlayedIndexBeforeMovedGame_indexesListing(self):
+    played = game('1', datetime(2021, 1, 1, 0, 0, 0, 0, UTC), 100, GAME_FINAL)
+    moved = game('2', datetime(2021, 2, 1, 0, 0, 0, 0, UTC))
+    next_up = game('3', datetime(2021, 1, 5, 0, 0, 0, 0, UTC))
+    calendar = SeasonCalendar([played, moved, next_up], last_played_index=0)
+
+    now = datetime(2021, 1, 4, 0, 0, 0, 0, UTC)
+    self.assertEqual(calendar.next_game(now), next_up)
+    self.assertEqual(calendar.current_game(now), played)
+
+  def test_window_decodesOnlyGamesItNeeds(self):
+    now = datetime(2020, 12, 29, 12, 0, 0, 0, UTC)
+
+    self.calendar.window(now, 5, 6)
+
+    # The window ends with the 13th game listed.
+    self.assertEqual(self.schedule.games.decoded_count(), 13)
+
+  def test_compareAndHash_noGamesDecoded(self):
+    other = FakeNbaService().schedule('knicks', '2020')
+
+    self.assertNotEqual(other.calendar, self.calendar)
+    self.assertEqual(len({self.schedule, other, self.schedule}), 2)
+    self.assertEqual(self.schedule.games.decoded_count(), 0)
+
+  def test_is_final(self):
+    start = datetime(2021, 1, 1, 0, 0, 0, 0, UTC)
+    self.assertTrue(is_final(game('1', start, 100)))
+    self.assertFalse(is_final(game('1', start)))
+    # Scores come in while the game is played.
+    self.assertFalse(is_final(game('1', start, 50, status=GAME_IN_PROGRESS)))
+    self.assertTrue(is_final(game('1', start, 100, status=GAME_FINAL)))
+
+
+if __name__ == '__main__':
+  unittest.main()
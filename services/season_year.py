@@ -0,0 +1,99 @@
+"""
+Works out the NBA season year (today.json's "seasonScheduleYear") without a
+network round trip on most runs.
+
+The season year is the year the regular season starts in. Seasons usually run
+from October to June, so for most of the year it follows from the date alone.
+Between July and November the switch to the next season can happen at any time
+(the 2019-20 season ended in October 2020 and the next one started in
+December), so during those months today.json is checked once a day. The last
+answer is kept on disk for the next runs. NbaService drops it when a request
+for that season finds nothing, so a wrong answer doesn't stick.
+"""
+
+from constants import EASTERN_TIMEZONE
+from services.http_cache import write_atomically
+from services.stats import Stats
+
+import json
+import requests
+
+# Months of the (Eastern time) calendar in which the season year can't be
+# derived from the date.
+BOUNDARY_MONTHS = range(7, 12)
+
+
+def derive_season_year(now):
+  """Returns the season year that is most likely current at datetime now."""
+  today = now.astimezone(EASTERN_TIMEZONE).date()
+  return today.year if today.month >= 10 else today.year - 1
+
+
+class SeasonYearResolver:
+
+  def __init__(self, fetch_today, path=None, stats=None):
+    """
+    Parameters
+    ----------
+    fetch_today: function
+      Fetches and returns the parsed today.json.
+    path: str
+      The JSON file the last answer is kept in. If None it's only kept in
+      memory.
+    stats: services.stats.Stats
+      Receives the "season.offline" and "season.refreshed" counts.
+    """
+    self.fetch_today = fetch_today
+    self.path = path
+    self.stats = stats if stats is not None else Stats()
+    self._entry = None
+
+  def season_year(self, now):
+    """Returns the season year at datetime now."""
+    return self._current(now)['season_year']
+
+  def invalidate(self):
+    """Forgets the last answer, e.g. after a request for the season it gave
+    failed, so the next call checks today.json."""
+    self._entry = {}
+    if self.path is not None:
+      write_atomically(self.path, b'{}')
+
+  def _current(self, now):
+    derived = derive_season_year(now)
+    today = now.astimezone(EASTERN_TIMEZONE).date()
+    if self._entry is None:
+      self._entry = self._load()
+    entry = self._entry
+    is_fresh = entry.get('derived') == derived and (
+        today.month not in BOUNDARY_MONTHS
+        or entry.get('checked_on') == today.isoformat())
+    if is_fresh:
+      self.stats.add('season.offline')
+      return entry
+
+    try:
+      data = self.fetch_today()
+    except requests.RequestException:
+      # Better a possibly outdated answer than none at all.
+      if 'season_year' in entry:
+        return entry
+      raise
+    self.stats.add('season.refreshed')
+    self._entry = {
+      'season_year': data['seasonScheduleYear'],
+      'derived': derived,
+      'checked_on': today.isoformat(),
+    }
+    if self.path is not None:
+      write_atomically(self.path, json.dumps(self._entry).encode('utf-8'))
+    return self._entry
+
+  def _load(self):
+    if self.path is None:
+      return {}
+    try:
+      with open(self.path, 'r') as f:
+        return json.load(f)
+    except (OSError, ValueError):
+      return {}
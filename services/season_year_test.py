@@ -0,0 +1,102 @@
+from constants import UTC
+from datetime import datetime
+from services.season_year import SeasonYearResolver, derive_season_year
+
+import json
+import os
+import requests
+import tempfile
+import unittest
+
+
+class DeriveSeasonYearTest(unittest.TestCase):
+
+  def test_derive_season_year(self):
+    self.assertEqual(
+        derive_season_year(datetime(2020, 12, 27, tzinfo=UTC)), 2020)
+    self.assertEqual(derive_season_year(datetime(2021, 3, 1, tzinfo=UTC)), 2020)
+    self.assertEqual(
+        derive_season_year(datetime(2021, 10, 20, tzinfo=UTC)), 2021)
+
+  def test_derive_season_year_usesEasternDate(self):
+    # Still September 30th in New York.
+    now = datetime(2021, 10, 1, 2, 0, 0, 0, UTC)
+    self.assertEqual(derive_season_year(now), 2020)
+
+
+class SeasonYearResolverTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.path = os.path.join(self.tmp_dir.name, 'season.json')
+    with open('services/testdata/today.json', 'r') as f:
+      self.today = json.load(f)
+    self.fetches = 0
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def fetch_today(self):
+    self.fetches += 1
+    return self.today
+
+  def resolver(self):
+    return SeasonYearResolver(self.fetch_today, self.path)
+
+  def test_season_year_firstRun_fetchesToday(self):
+    now = datetime(2020, 12, 27, 17, 0, 0, 0, UTC)
+    resolver = self.resolver()
+
+    self.assertEqual(resolver.season_year(now), 2020)
+    self.assertEqual(self.fetches, 1)
+    self.assertEqual(resolver.stats['season.refreshed'], 1)
+
+  def test_season_year_laterRunsInSeason_noFetch(self):
+    self.resolver().season_year(datetime(2020, 12, 27, 17, 0, 0, 0, UTC))
+
+    # A new resolver stands in for a later run.
+    resolver = self.resolver()
+    self.assertEqual(
+        resolver.season_year(datetime(2021, 2, 3, 17, 0, 0, 0, UTC)), 2020)
+    self.assertEqual(self.fetches, 1)
+    self.assertEqual(resolver.stats['season.offline'], 1)
+
+  def test_season_year_boundaryMonths_fetchesOncePerDay(self):
+    resolver = self.resolver()
+    resolver.season_year(datetime(2021, 8, 1, 17, 0, 0, 0, UTC))
+    resolver.season_year(datetime(2021, 8, 1, 23, 0, 0, 0, UTC))
+    self.assertEqual(self.fetches, 1)
+
+    resolver.season_year(datetime(2021, 8, 2, 17, 0, 0, 0, UTC))
+    self.assertEqual(self.fetches, 2)
+
+  def test_season_year_derivedYearChanged_fetches(self):
+    resolver = self.resolver()
+    resolver.season_year(datetime(2020, 12, 27, 17, 0, 0, 0, UTC))
+    self.today = dict(self.today, seasonScheduleYear=2021)
+
+    # Not a boundary month, but the cached answer was for another season.
+    now = datetime(2021, 12, 1, 17, 0, 0, 0, UTC)
+    self.assertEqual(resolver.season_year(now), 2021)
+    self.assertEqual(self.fetches, 2)
+
+  def test_season_year_fetchFails_usesLastAnswer(self):
+    self.resolver().season_year(datetime(2021, 8, 1, 17, 0, 0, 0, UTC))
+
+    def fail():
+      raise requests.ConnectionError()
+    resolver = SeasonYearResolver(fail, self.path)
+    self.assertEqual(
+        resolver.season_year(datetime(2021, 8, 2, 17, 0, 0, 0, UTC)), 2020)
+
+  def test_invalidate_fetchesAgain(self):
+    now = datetime(2020, 12, 27, 17, 0, 0, 0, UTC)
+    self.resolver().season_year(now)
+    self.resolver().invalidate()
+
+    self.resolver().season_year(now)
+    self.assertEqual(self.fetches, 2)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,162 @@
+"""
+A response cache shared by every bot process on the machine.
+
+Responses are stored in a SQLite database (in WAL mode, so readers never block
+the writer) keyed by URL. When an entry is missing or stale, the fetch happens
+while holding an exclusive file lock for that URL: if the sidebar bot and the
+game thread bot start in the same minute, whichever gets the lock first fetches
+and the other one waits and then reuses what was stored.
+"""
+
+from collections import Counter
+from contextlib import closing, contextmanager
+from services.stats import Stats
+
+import fcntl
+import hashlib
+import os
+import sqlite3
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+  url TEXT PRIMARY KEY,
+  body BLOB NOT NULL,
+  fetched_at REAL NOT NULL,
+  expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_stats (
+  day TEXT NOT NULL,
+  name TEXT NOT NULL,
+  count INTEGER NOT NULL,
+  PRIMARY KEY (day, name)
+);
+CREATE TABLE IF NOT EXISTS breakers (
+  name TEXT PRIMARY KEY,
+  failures INTEGER NOT NULL,
+  opened_until REAL NOT NULL
+);
+"""
+
+
+class SharedCache:
+
+  def __init__(self, path, stats=None, lock_timeout=30, clock=time.time):
+    """
+    Parameters
+    ----------
+    path: str
+      The SQLite database file. Lock files are kept in a sibling directory.
+    stats: services.stats.Stats
+      Receives the "shared.hit", "shared.waited" and "shared.miss" counts.
+    lock_timeout: float
+      Seconds SQLite waits for another process's write to finish.
+    clock: function
+      Returns the current unix time in seconds.
+    """
+    self.path = path
+    self.lock_dir = f'{path}.locks'
+    self.lock_timeout = lock_timeout
+    self.clock = clock
+    self.stats = stats if stats is not None else Stats()
+    os.makedirs(self.lock_dir, exist_ok=True)
+    with closing(self._connect()) as db:
+      db.execute('PRAGMA journal_mode=WAL')
+      db.executescript(_SCHEMA)
+
+  def get_or_fetch(self, url, ttl, fetch):
+    """Returns the body stored for url if it is younger than ttl, otherwise
+    calls fetch() (at most once across all processes), stores and returns
+    its result.
+
+    Parameters
+    ----------
+    url: str
+    ttl: float
+      How many seconds a stored body stays fresh.
+    fetch: function
+      Downloads and returns the body (bytes) for url.
+    """
+    body = self._fresh_body(url)
+    if body is not None:
+      self.stats.add('shared.hit')
+      return body
+
+    with self._url_lock(url):
+      # Another process may have stored the body while we waited for the lock.
+      body = self._fresh_body(url)
+      if body is not None:
+        self.stats.add('shared.hit')
+        self.stats.add('shared.waited')
+        return body
+
+      body = fetch()
+      self.stats.add('shared.miss')
+      now = self.clock()
+      with closing(self._connect()) as db, db:
+        db.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+            (url, body, now, now + ttl))
+      return body
+
+  def get_stale(self, url):
+    """Returns the last body stored for url no matter how old it is, or None."""
+    with closing(self._connect()) as db:
+      row = db.execute(
+          'SELECT body FROM responses WHERE url = ?', (url,)).fetchone()
+    return row[0] if row else None
+
+  def add_daily_stats(self, day, stats):
+    """Adds stats to the totals recorded for day by every process and returns
+    the totals.
+
+    Parameters
+    ----------
+    day: datetime.date
+    stats: collections.Counter
+    """
+    with closing(self._connect()) as db, db:
+      for name, count in stats.items():
+        db.execute(
+            'INSERT INTO daily_stats VALUES (?, ?, ?) '
+            'ON CONFLICT (day, name) DO UPDATE SET count = count + ?',
+            (day.isoformat(), name, count, count))
+      rows = db.execute(
+          'SELECT name, count FROM daily_stats WHERE day = ?',
+          (day.isoformat(),)).fetchall()
+    return Counter(dict(rows))
+
+  def get_breaker(self, name):
+    """Returns the (consecutive failures, open until unix time) stored for the
+    circuit breaker called name, or (0, 0.0) if there is none."""
+    with closing(self._connect()) as db:
+      row = db.execute(
+          'SELECT failures, opened_until FROM breakers WHERE name = ?',
+          (name,)).fetchone()
+    return (row[0], row[1]) if row else (0, 0.0)
+
+  def put_breaker(self, name, failures, opened_until):
+    with closing(self._connect()) as db, db:
+      db.execute(
+          'INSERT OR REPLACE INTO breakers VALUES (?, ?, ?)',
+          (name, failures, opened_until))
+
+  def _fresh_body(self, url):
+    with closing(self._connect()) as db:
+      row = db.execute(
+          'SELECT body FROM responses WHERE url = ? AND expires_at > ?',
+          (url, self.clock())).fetchone()
+    return row[0] if row else None
+
+  def _connect(self):
+    return sqlite3.connect(self.path, timeout=self.lock_timeout)
+
+  @contextmanager
+  def _url_lock(self, url):
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    with open(os.path.join(self.lock_dir, f'{digest}.lock'), 'a') as f:
+      fcntl.flock(f, fcntl.LOCK_EX)
+      try:
+        yield
+      finally:
+        fcntl.flock(f, fcntl.LOCK_UN)
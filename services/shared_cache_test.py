@@ -0,0 +1,103 @@
+from collections import Counter
+from datetime import date
+from services.shared_cache import SharedCache
+
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+
+URL = 'http://data.nba.net/10s/prod/v1/2020/teams.json'
+
+
+def slow_fetch_and_record(db_path, fetch_log_path):
+  """Runs in a child process: fetches URL through the shared cache with a slow
+  fetch function that records every call in fetch_log_path."""
+  def fetch():
+    with open(fetch_log_path, 'a') as f:
+      f.write(f'{os.getpid()}\n')
+    time.sleep(0.3)
+    return b'{"league": {}}'
+
+  shared_cache = SharedCache(db_path)
+  body = shared_cache.get_or_fetch(URL, 60, fetch)
+  assert body == b'{"league": {}}'
+  shared_cache.add_daily_stats(date(2020, 12, 29), shared_cache.stats)
+
+
+class SharedCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.db_path = os.path.join(self.tmp_dir.name, 'shared.sqlite3')
+    self.now = 1000.0
+    self.shared_cache = SharedCache(self.db_path, clock=lambda: self.now)
+    self.fetches = 0
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def fetch(self):
+    self.fetches += 1
+    return f'body {self.fetches}'.encode('utf-8')
+
+  def test_get_or_fetch_empty_fetches(self):
+    self.assertEqual(
+        self.shared_cache.get_or_fetch(URL, 60, self.fetch), b'body 1')
+    self.assertEqual(self.shared_cache.stats['shared.miss'], 1)
+
+  def test_get_or_fetch_fresh_reusesStoredBody(self):
+    self.shared_cache.get_or_fetch(URL, 60, self.fetch)
+    self.now += 59
+    # A different instance stands in for another bot process.
+    other = SharedCache(self.db_path, clock=lambda: self.now)
+
+    self.assertEqual(other.get_or_fetch(URL, 60, self.fetch), b'body 1')
+    self.assertEqual(self.fetches, 1)
+    self.assertEqual(other.stats['shared.hit'], 1)
+
+  def test_get_or_fetch_expired_fetchesAgain(self):
+    self.shared_cache.get_or_fetch(URL, 60, self.fetch)
+    self.now += 60
+
+    self.assertEqual(
+        self.shared_cache.get_or_fetch(URL, 60, self.fetch), b'body 2')
+
+  def test_get_stale_returnsExpiredBody(self):
+    self.assertIsNone(self.shared_cache.get_stale(URL))
+    self.shared_cache.get_or_fetch(URL, 60, self.fetch)
+    self.now += 3600
+
+    self.assertEqual(self.shared_cache.get_stale(URL), b'body 1')
+
+  def test_add_daily_stats_accumulates(self):
+    day = date(2020, 12, 29)
+    self.shared_cache.add_daily_stats(day, Counter({'shared.hit': 2}))
+    totals = self.shared_cache.add_daily_stats(
+        day, Counter({'shared.hit': 1, 'shared.miss': 1}))
+
+    self.assertEqual(totals, Counter({'shared.hit': 3, 'shared.miss': 1}))
+
+  def test_get_or_fetch_concurrentProcesses_fetchOnce(self):
+    fetch_log_path = os.path.join(self.tmp_dir.name, 'fetches.log')
+    processes = [
+      multiprocessing.Process(
+          target=slow_fetch_and_record, args=(self.db_path, fetch_log_path))
+      for _ in range(3)
+    ]
+    for p in processes:
+      p.start()
+    for p in processes:
+      p.join()
+
+    self.assertEqual([p.exitcode for p in processes], [0, 0, 0])
+    with open(fetch_log_path, 'r') as f:
+      self.assertEqual(len(f.readlines()), 1)
+    totals = self.shared_cache.add_daily_stats(date(2020, 12, 29), Counter())
+    self.assertEqual(totals['shared.miss'], 1)
+    self.assertEqual(totals['shared.hit'], 2)
+
+
+if __name__ == '__main__':
+  unittest.main()
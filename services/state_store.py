@@ -0,0 +1,50 @@
+"""
+Small JSON documents the bots keep between runs.
+
+Cron starts a fresh process every minute, so anything a run wants to remember
+(e.g. when the game thread bot next needs to do something) has to go through
+the disk. This module only uses the standard library so it can be imported
+before anything expensive, and writes are atomic so a run that is killed half
+way never leaves a truncated file for the next one.
+"""
+
+from services.http_cache import write_atomically
+
+import json
+import os
+
+DEFAULT_STATE_DIR = os.path.join(os.path.expanduser('~'), '.redditbot', 'state')
+
+
+class StateStore:
+
+  def __init__(self, path):
+    """
+    Parameters
+    ----------
+    path: str
+      The JSON file the state is kept in. Its directory is created on the
+      first save.
+    """
+    self.path = path
+
+  def load(self):
+    """Returns the saved state as a dict, or an empty dict if nothing (or
+    nothing readable) was saved."""
+    try:
+      with open(self.path, 'r') as f:
+        state = json.load(f)
+    except (OSError, ValueError):
+      return {}
+    return state if isinstance(state, dict) else {}
+
+  def save(self, state):
+    """Replaces the saved state with state (a JSON serializable dict)."""
+    write_atomically(
+        self.path, json.dumps(state, sort_keys=True).encode('utf-8'))
+
+  def clear(self):
+    try:
+      os.remove(self.path)
+    except FileNotFoundError:
+      pass
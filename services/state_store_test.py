@@ -0,0 +1,40 @@
+from services.state_store import StateStore
+
+import os
+import tempfile
+import unittest
+
+
+class StateStoreTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.path = os.path.join(self.tmp_dir.name, 'state', 'bot.json')
+    self.store = StateStore(self.path)
+
+  def tearDown(self):
+    self.tmp_dir.cleanup()
+
+  def test_load_nothingSaved_empty(self):
+    self.assertEqual(self.store.load(), {})
+
+  def test_save_thenLoad(self):
+    self.store.save({'a': 1, 'b': [2, 3]})
+    self.assertEqual(StateStore(self.path).load(), {'a': 1, 'b': [2, 3]})
+
+  def test_load_corruptFile_empty(self):
+    os.makedirs(os.path.dirname(self.path))
+    with open(self.path, 'w') as f:
+      f.write('{"a": ')
+    self.assertEqual(self.store.load(), {})
+
+  def test_clear(self):
+    self.store.save({'a': 1})
+    self.store.clear()
+    self.store.clear()
+    self.assertEqual(self.store.load(), {})
+    self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+  unittest.main()
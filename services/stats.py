@@ -0,0 +1,36 @@
+"""
+Counters that several threads can add to at once.
+
+NbaService shares one set of counters with its shared cache, circuit breaker
+and season year resolver, and they're incremented from the threads of the
+hedge executor, AsyncNbaService's executor and the fan-out pool. `stats[k] += 1`
+on a collections.Counter reads and then writes the count, so two threads that
+do it at the same time can lose an increment. Stats does both under a lock.
+"""
+
+from collections import Counter
+
+import threading
+
+
+class Stats(Counter):
+  """A collections.Counter to which add() adds atomically. Reads are as usual;
+  snapshot() returns a copy that is safe to iterate while others add."""
+
+  def __init__(self, *args, **kwargs):
+    self._lock = threading.Lock()
+    super().__init__(*args, **kwargs)
+
+  def add(self, key, amount=1):
+    """Adds amount to the count of key."""
+    with self._lock:
+      self[key] += amount
+
+  def snapshot(self):
+    """Returns the current counts as a collections.Counter."""
+    with self._lock:
+      return Counter(self)
+
+  def __reduce__(self):
+    # Locks can't be pickled; a copy gets a new one.
+    return type(self), (dict(self),)
@@ -0,0 +1,43 @@
+from collections import Counter
+from services.stats import Stats
+
+import copy
+import pickle
+import threading
+import unittest
+
+
+class StatsTest(unittest.TestCase):
+
+  def test_add_manyThreads_noIncrementLost(self):
+    stats = Stats()
+    threads, adds = 8, 20000
+    barrier = threading.Barrier(threads)
+
+    def count():
+      barrier.wait()
+      for _ in range(adds):
+        stats.add('requests')
+        stats.add('ms', 2)
+
+    workers = [threading.Thread(target=count) for _ in range(threads)]
+    for worker in workers:
+      worker.start()
+    for worker in workers:
+      worker.join()
+
+    self.assertEqual(
+        stats.snapshot(),
+        Counter({'requests': threads * adds, 'ms': 2 * threads * adds}))
+
+  def test_copies_keepCounts(self):
+    stats = Stats({'requests': 2})
+
+    for other in (copy.copy(stats), pickle.loads(pickle.dumps(stats))):
+      other.add('requests')
+      self.assertEqual(other['requests'], 3)
+    self.assertEqual(stats['requests'], 2)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -1,63 +1,79 @@
 from constants import EASTERN_TIMEZONE, TEAM_SUB_MAP, UTC
+from content_hashes import ContentHashes
+from daemon import WakePlan, run_forever
 from datetime import datetime, timedelta
-from optparse import OptionParser
-from services.nba_service import NbaService
+from services.season_calendar import SeasonCalendar, is_final
+from services.state_store import DEFAULT_STATE_DIR, StateStore
+from tables import CENTER, LEFT, Column, Table
+from team_config import KNICKS, load_team
 
-import dateutil.parser
-import logging.config
-import praw
+import logging
+import os
 import sys
 import traceback
 
-def build_roster(nba_service, year):
-  players = nba_service.players(year)
-  roster = nba_service.roster('knicks', year)
-  team_players = filter(lambda player: player['personId'] in roster, players)
+# How often the daemon refreshes the sidebar while a game is on, and otherwise.
+LIVE_POLL_INTERVAL = timedelta(minutes=1)
+IDLE_POLL_INTERVAL = timedelta(hours=1)
 
-  rows = []
-  for player in team_players:
-    name = f'{player["firstName"]} {player["lastName"]}'
-    jersey = player['jersey']
-    position = player['pos'].replace('-', '/') if player['pos'] else ''
-    rows.append(f'{jersey}|{name}|{position}')
 
-  # Sort players by first name.
-  rows.sort(key = lambda r: r.split('|')[1])
+async def fetch_sidebar_data(async_nba_service, team, now):
+  """Looks up the season year at now, then concurrently fetches everything
+  the sidebar of team (a team_config.TeamConfig) needs for that season.
+  Returns the players, roster, teams, schedule and conference standings in
+  that order."""
+  import asyncio
+
+  year = await async_nba_service.season_year(now)
+  return await asyncio.gather(
+      async_nba_service.players(year, now),
+      async_nba_service.roster(team.slug, year, now),
+      async_nba_service.teams(year, now),
+      async_nba_service.schedule(team.slug, year, now),
+      async_nba_service.conference_standings())
+
 
-  rows.insert(0, ':--:|:--|:--:')
-  rows.insert(0, 'No.|Name|Position')
-  return '\n'.join(rows)
+ROSTER_TABLE = Table([
+  Column('No.', CENTER, '{r.jersey}'),
+  Column('Name', LEFT, '{r.name}'),
+  Column(
+      'Position',
+      CENTER,
+      lambda player: player.pos.replace('-', '/') if player.pos else ''),
+])
 
+SCHEDULE_TABLE = Table([
+  Column('Date'), Column('Team'), Column('Loc'), Column('Time/Outcome')])
+
+STANDINGS_TABLE = Table([
+  Column(' '), Column(' '), Column(' ', LEFT), Column('Record'), Column('GB')])
+
+
+def build_roster(players, roster):
+  team_players = [player for player in players if player.person_id in roster]
+  # Sort players by first name.
+  team_players.sort(key=lambda player: player.name)
+  return ROSTER_TABLE.render(team_players)
 
-def build_schedule(logger, nba_service, now, teams, year):
+
+def build_schedule(logger, now, teams, schedule):
   today = now.astimezone(EASTERN_TIMEZONE).date()
-  schedule = nba_service.schedule('knicks', year)
 
   logger.info('Building schedule text.')
-  # FYI: We want to show to a show a total of 12 games: 
-  #    most recent + 4 prior + 7 next.
-  # Get the array index of the last game played.
-  last_played_idx = schedule['league']['lastStandardGamePlayedIndex']
-
-  # Get the next 7 games.
-  end_idx = min(last_played_idx + 7, len(schedule['league']['standard']))
-
-  # Show the previous 4 games or more if we're at the end of the season.
-  start_idx = max(0, last_played_idx - (4 + (7 - (end_idx - last_played_idx - 1))))
-
-  rows = ['Date|Team|Loc|Time/Outcome', ':--:|:--:|:--:|:--:']
-  for i in range(start_idx, end_idx):
-    game = schedule['league']['standard'][i]
-    is_home_team = game['isHomeTeam']
-    knicks_score = game['hTeam' if is_home_team else 'vTeam']
-    opp_score = game['vTeam' if is_home_team else 'hTeam']
-    opp_team_name = teams[opp_score['teamId']]['nickname']
+  # Show 12 games: the current (or most recent) one, the 5 before it and the
+  # next 6, or more past games at the end of the season. They're looked up by
+  # time, so postponed games are left out and moved ones show up at their new
+  # date.
+  rows = []
+  for game in SeasonCalendar.of(schedule).window(now, 5, 6):
+    is_home_team = game.is_home_team
+    team_score = game.home if is_home_team else game.road
+    opp_score = game.road if is_home_team else game.home
+    opp_team_name = teams[opp_score.team_id].nickname
     opp_team_sub = TEAM_SUB_MAP[opp_team_name]
 
-    gametime = dateutil.parser \
-        .parse(game['startTimeUTC']) \
-        .astimezone(EASTERN_TIMEZONE)
-    
+    gametime = game.start_time_utc.astimezone(EASTERN_TIMEZONE)
+
     if gametime.date() == today:
       date = 'Today'
     elif gametime.date() == today - timedelta(days=1):
@@ -68,71 +84,108 @@ def build_schedule(logger, nba_service, now, teams, year):
       date = gametime.strftime('%b %d')
 
     time = gametime.strftime('%I:%M %p').lstrip('0')
-    time_or_score = (time if knicks_score['score'] == ''
-        else winloss(knicks_score, opp_score))
+    time_or_score = (time if not team_score.has_score
+        else winloss(team_score, opp_score))
 
-    row = ('%s|[](/r/%s)|%s|%s' %
-        (date, opp_team_sub, 
-            'Home' if is_home_team else 'Away', time_or_score))
-    rows.append(row)
-  return '\n'.join(rows)
+    rows.append((
+        date,
+        f'[](/r/{opp_team_sub})',
+        'Home' if is_home_team else 'Away',
+        time_or_score))
+  return SCHEDULE_TABLE.render(rows)
 
 
-def build_standings(logger, nba_service, teams):
-  standings = nba_service.conference_standings()
+def build_standings(logger, standings, teams):
   logger.info('Building standings text.')
-  division = standings['conference']['east']
-  return print_standings(teams, division)
+  return print_standings(teams, standings.east)
 
 
-def build_tank_standings(logger, nba_service, teams):
-  standings = nba_service.conference_standings()
+def build_tank_standings(logger, standings, teams):
   logger.info('Building tank standings text.')
-  rows = standings['conference']['east']
-  rows = rows + standings['conference']['west']
-  rows = sorted(rows, key=lambda team: float(team['lossPct']), reverse=True)
-  worst_wins = int(rows[0]['win'])
-  worst_loss = int(rows[0]['loss'])
-  for row in rows:
-     gb = (abs(worst_wins - int(row['win'])) + abs(worst_loss - int(row['loss']))) / 2
-     row['gamesBehind'] = ('%.1f' % gb).replace('.0', '')
-  return print_standings(teams, rows[:10])
+  rows = standings.east + standings.west
+  rows = sorted(rows, key=lambda team: team.loss_pct, reverse=True)
+  worst_wins = rows[0].win
+  worst_loss = rows[0].loss
+  tank_rows = []
+  for row in rows[:10]:
+     gb = (abs(worst_wins - row.win) + abs(worst_loss - row.loss)) / 2
+     tank_rows.append(row._replace(games_behind=gb))
+  return print_standings(teams, tank_rows)
 
 
 def print_standings(teams, standings):
-  rows = [' | | |Record|GB', ':--:|:--:|:--|:--:|:--:']
+  rows = []
   for i, d in enumerate(standings):
-    team = teams[d['teamId']]['nickname']
+    team = teams[d.team_id].nickname
     teamsub = TEAM_SUB_MAP[team]
-    wins = d['win']
-    loses = d['loss']
-    games_behind = d['gamesBehind']
+    wins = d.win
+    loses = d.loss
+    games_behind = ('%.1f' % d.games_behind).replace('.0', '')
     games_behind = '-' if games_behind == '0' else games_behind
-    row = ('%s|[](/r/%s)|%s|%s-%s|%s' %
-        (i + 1, teamsub, team, wins, loses, games_behind))
-    rows.append(row)
-  return '\n'.join(rows)
+    rows.append(
+        (i + 1, f'[](/r/{teamsub})', team, f'{wins}-{loses}', games_behind))
+  return STANDINGS_TABLE.render(rows)
+
+
+def plan_next_wake(now, schedule):
+  """Returns a daemon.WakePlan for the next time the sidebar may change: every
+  minute while a game is on (its result goes in the schedule), otherwise at
+  the next tip-off, at midnight Eastern (when "Today" and "Tomorrow" move) or
+  in an hour, whichever is soonest."""
+  calendar = SeasonCalendar.of(schedule)
+  current = calendar.current_game(now)
+  if current is not None and not is_final(current):
+    return WakePlan(now + LIVE_POLL_INTERVAL, 'game in progress')
+
+  plans = [WakePlan(now + IDLE_POLL_INTERVAL, 'hourly refresh')]
+  today = now.astimezone(EASTERN_TIMEZONE).date()
+  midnight = EASTERN_TIMEZONE.localize(
+      datetime.combine(today + timedelta(days=1), datetime.min.time()))
+  plans.append(WakePlan(midnight, 'new day'))
+  next_game = calendar.next_game(now)
+  if next_game is not None:
+    plans.append(WakePlan(
+        next_game.start_time_utc, f'tip-off of {next_game.game_url_code}'))
+  return min(plans, key=lambda plan: plan.wake_at)
 
 
 def update_reddit_descr(descr, text, marker):
+  """Returns descr with the text between the marker's start and end markers
+  replaced by text, and whether the markers were found (if not, descr is
+  returned unchanged)."""
   start_marker = f'[](#Start{marker})'
   start = descr.find(start_marker)
   end_marker = f'[](#End{marker})'
   end = descr.find(end_marker)
   if start == -1 or end == -1:
-    return descr
+    return descr, False
   new_text = f'{start_marker}\n\n{text}\n\n{end_marker}'
-  return descr.replace(descr[start:end + len(end_marker)], new_text)
+  return descr.replace(descr[start:end + len(end_marker)], new_text), True
 
 
-def winloss(knicks_score, opp_score):
-  kscore = int(knicks_score['score'])
-  oscore = int(opp_score['score'])
+def winloss(team_score, opp_score):
+  kscore = team_score.score
+  oscore = opp_score.score
   return ('W %s-%s' % (kscore, oscore) 
       if kscore > oscore else 'L %s-%s' % (oscore, kscore))
 
 
-def execute(logger, now, subreddit_name, tanking, user='nyknicks-automod'):
+def sidebar_hashes(subreddit_name):
+  """Returns the ContentHashes of the sidebar sections last posted to
+  subreddit_name."""
+  return ContentHashes(StateStore(
+      os.path.join(DEFAULT_STATE_DIR, f'sidebar_hashes.{subreddit_name}.json')))
+
+
+def execute(
+    logger,
+    now,
+    subreddit_name,
+    tanking,
+    team=KNICKS,
+    nba_service=None,
+    reddit=None,
+    content_hashes=None):
   """
     The main starting point (after command line args are parsed) that initiates
     all of the work this bot will do. It intereacts with reddit and the NBA Data
@@ -150,28 +203,68 @@ def execute(logger, now, subreddit_name, tanking, user='nyknicks-automod'):
     tanking : boolean
       If true, print the standings as a race to the bottom, otherwise print
       normal Eastern Conference standings.
-    user: str
-      The Reddit account username for the bot to run as. This praw.ini config
-      file should also have an entry for this username.
+    team: team_config.TeamConfig
+      The team whose schedule and roster are shown, and whose Reddit account
+      the bot runs as. The praw.ini config file should have an entry for
+      team.username.
+    nba_service : NbaService
+      The service used to look up NBA data. A new one is created if None.
+    reddit : praw.Reddit
+      The Reddit client to post with. If None, one is created for user.
+    content_hashes : content_hashes.ContentHashes
+      Remembers the sections last posted so that unchanged ones don't have to
+      be compared with the sidebar on Reddit. If None, Reddit is always
+      queried.
+
+    Returns
+    -------
+    daemon.WakePlan
+      When the sidebar may next need an update.
   """
-  nba_service = NbaService(logger)
-
-  current_year = nba_service.current_year()
-  roster = build_roster(nba_service, current_year)
-  teams = nba_service.teams(current_year)
-  schedule = build_schedule(logger, nba_service, now, teams, current_year)
-  standings = build_tank_standings(logger, nba_service, teams) \
-      if tanking else build_standings(logger, nba_service, teams)
-
-  logger.info('Logging in to reddit.')
-  reddit = praw.Reddit(user)
+  # Imported here rather than at the top so that importing this module (e.g.
+  # for tests or the --daemon loop) stays cheap.
+  import asyncio
+  from services.async_nba_service import AsyncNbaService
+
+  if nba_service is None:
+    from services.nba_service import NbaService
+    nba_service = NbaService(logger)
+
+  (players, roster, teams, schedule, standings) = asyncio.run(
+      fetch_sidebar_data(AsyncNbaService(nba_service), team, now))
+
+  roster_text = build_roster(players, roster)
+  schedule_text = build_schedule(logger, now, teams, schedule)
+  standings_text = build_tank_standings(logger, standings, teams) \
+      if tanking else build_standings(logger, standings, teams)
+
+  sections = {
+    'Schedule': schedule_text,
+    'Standings': standings_text,
+    'Roster': roster_text,
+  }
+  if content_hashes is not None and all(
+      content_hashes.unchanged(marker, text, now)
+      for marker, text in sections.items()):
+    logger.info('No changes since the last update. Not querying reddit.')
+    return plan_next_wake(now, schedule)
+
+  if reddit is None:
+    from reddit_auth import new_reddit
+    logger.info('Logging in to reddit.')
+    reddit = new_reddit(team.username, logger)
 
   logger.info('Querying reddit settings.')
   subreddit = reddit.subreddit(subreddit_name)
   descr = subreddit.mod.settings()['description']
-  updated_descr = update_reddit_descr(descr, schedule, 'Schedule')
-  updated_descr = update_reddit_descr(updated_descr, standings, 'Standings')
-  updated_descr = update_reddit_descr(updated_descr, roster, 'Roster')
+  updated_descr = descr
+  applied = []
+  for marker, text in sections.items():
+    updated_descr, found = update_reddit_descr(updated_descr, text, marker)
+    if found:
+      applied.append(marker)
+    else:
+      logger.warning(f'No {marker} markers in the sidebar. Not updating it.')
 
   if updated_descr != descr:
     logger.info('Updating reddit settings.')
@@ -179,10 +272,21 @@ def execute(logger, now, subreddit_name, tanking, user='nyknicks-automod'):
   else:
     logger.info('No changes.')
 
+  if content_hashes is not None:
+    # A section without markers wasn't posted, so it must not look unchanged
+    # next time.
+    for marker in applied:
+      content_hashes.record(marker, sections[marker], now)
+
   logger.info('All done.')
+  return plan_next_wake(now, schedule)
 
 
 if __name__ == "__main__":
+  from optparse import OptionParser
+
+  import logging.config
+
   parser = OptionParser()
   parser.add_option(
       "-t", 
@@ -196,6 +300,19 @@ if __name__ == "__main__":
       dest="username",
       help="Reddit account for the bot to run as.",
       metavar='[username]')
+  parser.add_option(
+      "--team",
+      dest="team",
+      help="The team whose schedule and roster are shown, by tri code, name or "
+           "subreddit. Defaults to the team of the subreddit.",
+      metavar='[team]')
+  parser.add_option(
+      "-d",
+      "--daemon",
+      action="store_true",
+      dest="daemon",
+      default=False,
+      help="Keep running and wake up whenever the sidebar may change.")
   (options, args) = parser.parse_args()
 
   logging.config.fileConfig('logging.conf')
@@ -206,15 +323,57 @@ if __name__ == "__main__":
     raise SystemExit(f'Usage: {sys.argv[0]} subreddit')
 
   subreddit_name = args[0]
-  username = options.username if options.username else 'nyknicks-automod'
-  logger.info(f'Using subreddit "{subreddit_name}" and user "{username}".')
+  try:
+    team = load_team(options.team or subreddit_name, options.username)
+  except ValueError as e:
+    logger.error(e)
+    raise SystemExit(f'{e} Pass --team for subreddits of no team.')
+  logger.info(
+      f'Using subreddit "{subreddit_name}", team {team.tri_code} and user '
+      f'"{team.username}".')
 
   yes = set(['yes', 'y', 'true'])
   tank_standings = True \
       if options.tank and options.tank.lower() in yes else False
   logger.info(f'Print tank standings: {tank_standings}')
 
-  try:
-    execute(logger, datetime.now(UTC), subreddit_name, tank_standings, username)
-  except:
-    logger.error(traceback.format_exc())
+  from services.nba_service import NbaService
+
+  nba_service = NbaService(logger)
+  hashes = sidebar_hashes(subreddit_name)
+
+  with nba_service:
+    if options.daemon:
+      from reddit_auth import new_reddit
+
+      reddit = new_reddit(team.username, logger)
+
+      def run_once(now):
+        nba_service.start_run()
+        try:
+          return execute(
+              logger,
+              now,
+              subreddit_name,
+              tank_standings,
+              team,
+              nba_service,
+              reddit,
+              hashes)
+        finally:
+          nba_service.log_stats()
+
+      run_forever(logger, run_once)
+    else:
+      try:
+        execute(
+            logger,
+            datetime.now(UTC),
+            subreddit_name,
+            tank_standings,
+            team,
+            nba_service,
+            content_hashes=hashes)
+      except:
+        logger.error(traceback.format_exc())
+      nba_service.log_stats()
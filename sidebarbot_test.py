@@ -3,12 +3,18 @@ Verifies that the sidebarbot correctly updates the sidebar text by mocking
 calls to the Reddit and NBA Data APIs.
 """
 
-from datetime import datetime
-from services import nba_service_test
+from content_hashes import ContentHashes
+from datetime import datetime, timedelta
+from services.fake_nba_service import FakeNbaService
+from services.nba_service import NbaService
+from services.nba_service_test import mocked_requests_get
+from services.state_store import StateStore
 from unittest.mock import MagicMock, patch
 
 import logging.config
+import os
 import sidebarbot
+import tempfile
 import unittest
 
 INITIAL_DESCR = """
@@ -109,9 +115,10 @@ class SidebarBotTest(unittest.TestCase):
   def setUp(self):
     logging.basicConfig(level=logging.ERROR)
     self.logger = logging.getLogger(__name__)
+    self.nba_service = NbaService(self.logger, cache_dir=None)
 
   @patch('praw.Reddit')
-  @patch('requests.get', side_effect=nba_service_test.mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_execute_newChanges_updatesDescription(self, mock_get, mock_praw):
     # Expect it to lookup the initial description from the reddit API.
     mock_mod = MagicMock()
@@ -123,14 +130,15 @@ class SidebarBotTest(unittest.TestCase):
     now = datetime(2020, 12, 29, 17, 12, 52, 305157, sidebarbot.UTC)
 
     # Execute.
-    sidebarbot.execute(self.logger, now, 'subredditName', False)
+    sidebarbot.execute(
+        self.logger, now, 'subredditName', False, nba_service=self.nba_service)
 
     # Verify.
     mock_reddit.subreddit.assert_called_with('subredditName')
     mock_mod.update.assert_called_with(description=EXPECTED_UPDATED_DESCR)
 
   @patch('praw.Reddit')
-  @patch('requests.get', side_effect=nba_service_test.mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_execute_noChanges_doesNotUpdateDescrip(self, mock_get, mock_praw):
     # Expect it to lookup the initial description from the reddit API.
     mock_mod = MagicMock()
@@ -142,14 +150,77 @@ class SidebarBotTest(unittest.TestCase):
     now = datetime(2020, 12, 29, 17, 12, 52, 305157, sidebarbot.UTC)
 
     # Execute.
-    sidebarbot.execute(self.logger, now, 'subredditName', False)
+    sidebarbot.execute(
+        self.logger, now, 'subredditName', False, nba_service=self.nba_service)
 
     # Verify.
     mock_reddit.subreddit.assert_called_with('subredditName')
     mock_mod.update.assert_not_called()
 
   @patch('praw.Reddit')
-  @patch('requests.get', side_effect=nba_service_test.mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
+  def test_execute_sameContentAsLastRun_skipsReddit(self, mock_get, mock_praw):
+    mock_mod = MagicMock()
+    mock_mod.settings.return_value = {'description': INITIAL_DESCR}
+    mock_reddit = MagicMock(['subreddit'])
+    mock_reddit.subreddit.return_value = MagicMock(mod=mock_mod)
+    mock_praw.return_value = mock_reddit
+    now = datetime(2020, 12, 29, 17, 12, 52, 305157, sidebarbot.UTC)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      hashes = ContentHashes(StateStore(os.path.join(tmp_dir, 'hashes.json')))
+      for minutes in (0, 1):
+        sidebarbot.execute(
+            self.logger,
+            now + timedelta(minutes=minutes),
+            'subredditName',
+            False,
+            nba_service=self.nba_service,
+            content_hashes=hashes)
+
+    # Only the first run logged in and read the sidebar.
+    mock_praw.assert_called_once()
+    mock_mod.settings.assert_called_once()
+    mock_mod.update.assert_called_once_with(description=EXPECTED_UPDATED_DESCR)
+
+  @patch('praw.Reddit')
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
+  def test_execute_missingMarkers_sectionsNotRecorded(
+      self, mock_get, mock_praw):
+    # Only the standings have markers, so the schedule and roster are never
+    # posted and the next run has to try again.
+    mock_mod = MagicMock()
+    mock_mod.settings.return_value = {'description': INITIAL_STANDINGS_DESCR}
+    mock_reddit = MagicMock(['subreddit'])
+    mock_reddit.subreddit.return_value = MagicMock(mod=mock_mod)
+    mock_praw.return_value = mock_reddit
+    now = datetime(2020, 12, 29, 17, 12, 52, 305157, sidebarbot.UTC)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+      hashes = ContentHashes(StateStore(os.path.join(tmp_dir, 'hashes.json')))
+      for minutes in (0, 1):
+        sidebarbot.execute(
+            self.logger,
+            now + timedelta(minutes=minutes),
+            'subredditName',
+            False,
+            nba_service=self.nba_service,
+            content_hashes=hashes)
+      self.assertEqual(set(hashes.store.load()['hashes']), {'Standings'})
+
+    self.assertEqual(mock_mod.settings.call_count, 2)
+
+  def test_update_reddit_descr_noMarkers_unchanged(self):
+    self.assertEqual(
+        sidebarbot.update_reddit_descr('Lorem ipsum', 'text', 'Schedule'),
+        ('Lorem ipsum', False))
+    self.assertEqual(
+        sidebarbot.update_reddit_descr(
+            INITIAL_SCHEDULE_DESCR, 'text', 'Schedule'),
+        ('[](#StartSchedule)\n\ntext\n\n[](#EndSchedule)', True))
+
+  @patch('praw.Reddit')
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_execute_tankChanges_updatesDescription(self, mock_get, mock_praw):
     # Expect it to lookup the initial description from the reddit API.
     mock_mod = MagicMock()
@@ -161,7 +232,8 @@ class SidebarBotTest(unittest.TestCase):
     now = datetime(2020, 12, 29, 17, 12, 52, 305157, sidebarbot.UTC)
 
     # Execute.
-    sidebarbot.execute(self.logger, now, 'subredditName', True)
+    sidebarbot.execute(
+        self.logger, now, 'subredditName', True, nba_service=self.nba_service)
 
     # Verify.
     mock_reddit.subreddit.assert_called_with('subredditName')
@@ -184,7 +256,7 @@ class SidebarBotTest(unittest.TestCase):
 [](#EndStandings)""")
 
   @patch('praw.Reddit')
-  @patch('requests.get', side_effect=nba_service_test.mocked_requests_get)
+  @patch('requests.Session.get', side_effect=mocked_requests_get)
   def test_execute_scheduleWithYesterdayTomorrow(self, mock_get, mock_praw):
     # Expect it to lookup the initial description from the reddit API.
     mock_mod = MagicMock()
@@ -196,7 +268,8 @@ class SidebarBotTest(unittest.TestCase):
     now = datetime(2020, 12, 28, 10, 00, 00, 00, sidebarbot.UTC)
 
     # Execute.
-    sidebarbot.execute(self.logger, now, 'subredditName', False)
+    sidebarbot.execute(
+        self.logger, now, 'subredditName', False, nba_service=self.nba_service)
 
     # Verify.
     mock_mod.update.assert_called_with(
@@ -220,5 +293,42 @@ Jan 08|[](/r/thunder)|Home|7:30 PM
 [](#EndSchedule)""")
 
 
+  def test_plan_next_wake_offDay_wakesHourly(self):
+    # Next game (20201229/NYKCLE) starts at 2020-12-30T00:00:00.000Z.
+    now = datetime(2020, 12, 28, 10, 0, 0, 0, sidebarbot.UTC)
+    schedule = FakeNbaService().schedule('knicks', '2020')
+
+    plan = sidebarbot.plan_next_wake(now, schedule)
+
+    self.assertEqual(plan.wake_at, now + timedelta(hours=1))
+
+  def test_plan_next_wake_beforeMidnight_wakesAtMidnightEastern(self):
+    now = datetime(2020, 12, 29, 4, 30, 0, 0, sidebarbot.UTC)
+    schedule = FakeNbaService().schedule('knicks', '2020')
+
+    plan = sidebarbot.plan_next_wake(now, schedule)
+
+    self.assertEqual(
+        plan.wake_at, datetime(2020, 12, 29, 5, 0, 0, 0, sidebarbot.UTC))
+    self.assertEqual(plan.reason, 'new day')
+
+  def test_plan_next_wake_beforeTipOff_wakesAtTipOff(self):
+    now = datetime(2020, 12, 29, 23, 30, 0, 0, sidebarbot.UTC)
+    schedule = FakeNbaService().schedule('knicks', '2020')
+
+    plan = sidebarbot.plan_next_wake(now, schedule)
+
+    self.assertEqual(
+        plan.wake_at, datetime(2020, 12, 30, 0, 0, 0, 0, sidebarbot.UTC))
+
+  def test_plan_next_wake_gameInProgress_pollsEveryMinute(self):
+    now = datetime(2020, 12, 30, 1, 0, 0, 0, sidebarbot.UTC)
+    schedule = FakeNbaService().schedule('knicks', '2020')
+
+    plan = sidebarbot.plan_next_wake(now, schedule)
+
+    self.assertEqual(plan.wake_at, now + sidebarbot.LIVE_POLL_INTERVAL)
+
+
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,109 @@
+"""
+Renders the markdown (pipe) tables both bots post.
+
+A Table is described once by its columns: a header, the cell of the delimiter
+row (which sets the alignment) and how to get a row's cell text, either a
+str.format template or a plain function of the row. Tables rendered for every
+game thread update can instead take one function that returns all cells of a
+row as a list: that is a single call per row, where a call per cell is about
+twice as slow. Either way a line is its cells joined with one '|'.join, and is
+added to the table's text as soon as it's built. Nothing else refers to the
+text, so CPython grows it in place, and the lines are never held twice, as
+they would be if they were collected in a list and joined at the end. Tables
+are built once, at import time, and shared by every render.
+
+This is not faster than the f-strings and += the bots used before: rendering
+takes about as long and peaks at more memory (benchmarks/tables_benchmark.py).
+What Tables buy is one definition per table.
+
+The bots' tables differ in whether lines start and end with a pipe, so that is
+configurable too; the output stays byte for byte what the bots always posted.
+"""
+
+from typing import Callable, NamedTuple, Optional, Union
+
+# Delimiter row cells.
+LEFT = ':--'
+CENTER = ':--:'
+
+
+class Column(NamedTuple):
+  header: str
+  # The column's cell in the delimiter row, e.g. LEFT or CENTER.
+  align: str = CENTER
+  # The cell text for a row, either as a str.format template in which the row
+  # is called r (e.g. '{r.fgm}-{r.fga}'), or as a function that returns the
+  # text for a row. If None, rows are sequences and the cell is the item at
+  # the column's position. Unused if the Table has a cells function.
+  value: Optional[Union[str, Callable]] = None
+
+
+class Table:
+
+  def __init__(
+      self,
+      columns,
+      leading_pipe=False,
+      trailing_pipe=False,
+      header_leading_pipe=None,
+      cells=None):
+    """
+    Parameters
+    ----------
+    columns: list
+      The table's Columns, left to right.
+    leading_pipe: bool
+      Whether every line starts with a pipe.
+    trailing_pipe: bool
+      Whether every line ends with a pipe.
+    header_leading_pipe: bool
+      Overrides leading_pipe for the header line.
+    cells: callable
+      Returns the list of a row's cell texts, left to right, instead of the
+      columns' values.
+    """
+    self.columns = tuple(columns)
+    self._start = '|' if leading_pipe else ''
+    self._end = '|' if trailing_pipe else ''
+    self._header_start = self._start if header_leading_pipe is None \
+        else '|' if header_leading_pipe else ''
+    self._delimiter = \
+        f'{self._start}{"|".join(c.align for c in self.columns)}{self._end}'
+    if cells is None:
+      column_cells = tuple(
+          _cell(i, column.value) for i, column in enumerate(self.columns))
+      cells = lambda row: [cell(row) for cell in column_cells]
+    self._cells = cells
+
+  def render(self, rows, headers=None):
+    """Returns the table with a line for each of rows, without a final newline.
+
+    Parameters
+    ----------
+    rows: iterable
+      The row objects the columns' values are computed from.
+    headers: list
+      Replaces the columns' headers, e.g. when they depend on the data.
+    """
+    if headers is None:
+      headers = [column.header for column in self.columns]
+    start = self._start
+    end = self._end
+    cells = self._cells
+    text = (f'{self._header_start}{"|".join(headers)}{self._end}\n'
+            f'{self._delimiter}')
+    for row in rows:
+      # Nothing else refers to text, so CPython grows it in place.
+      text += f'\n{start}{"|".join(cells(row))}{end}'
+    return text
+
+
+def _cell(i, value):
+  """Returns the function that renders the cell of the column at position i
+  with value (see Column.value) for a row."""
+  if value is None:
+    return lambda row: str(row[i])
+  if isinstance(value, str):
+    template = value.format
+    return lambda row: template(r=row)
+  return value
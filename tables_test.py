@@ -0,0 +1,52 @@
+from collections import namedtuple
+from tables import CENTER, LEFT, Column, Table
+
+import unittest
+
+Row = namedtuple('Row', ['name', 'wins', 'losses'])
+
+
+class TableTest(unittest.TestCase):
+
+  def test_render_sequenceRows_usesCellsByPosition(self):
+    table = Table([Column('A'), Column('B', LEFT)])
+
+    self.assertEqual(
+        table.render([(1, 'x'), (2, 'y')]), 'A|B\n:--:|:--\n1|x\n2|y')
+
+  def test_render_templatesAndFunctions_formatRowObjects(self):
+    table = Table([
+      Column('Team', LEFT, lambda r: r.name.upper()),
+      Column('Record', CENTER, '{r.wins}-{r.losses}'),
+    ])
+
+    self.assertEqual(
+        table.render([Row('Knicks', 24, 43)]),
+        'Team|Record\n:--|:--:\nKNICKS|24-43')
+
+  def test_render_cellsFunction_replacesColumnValues(self):
+    table = Table(
+        [Column('Team', LEFT), Column('Record')],
+        cells=lambda r: [r.name, f'{r.wins}-{r.losses}'])
+
+    self.assertEqual(
+        table.render([Row('Knicks', 24, 43), Row('Nets', 20, 47)]),
+        'Team|Record\n:--|:--:\nKnicks|24-43\nNets|20-47')
+
+  def test_render_pipes(self):
+    table = Table(
+        [Column('A'), Column('B')],
+        leading_pipe=True,
+        trailing_pipe=True,
+        header_leading_pipe=False)
+
+    self.assertEqual(table.render([(1, 2)]), 'A|B|\n|:--:|:--:|\n|1|2|')
+
+  def test_render_headers_replaceColumnHeaders(self):
+    table = Table([Column('A'), Column('B')])
+
+    self.assertEqual(table.render([], ['C', 'D']), 'C|D\n:--:|:--:')
+
+
+if __name__ == '__main__':
+  unittest.main()
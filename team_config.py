@@ -0,0 +1,122 @@
+"""
+Describes the team a bot runs for, so one codebase can serve every team's
+subreddit.
+
+A TeamConfig holds everything about the team the bots can't look up at run
+time: the name data.nba.net uses in its team URLs, the tri code that tells the
+team apart from its opponent in a game, its subreddit and the praw.ini entry of
+the bot account. TEAMS has a config for each of the 30 teams; load_team picks
+one by name and validates it against the tables in constants.py, so a typo is
+reported when a bot starts rather than in the middle of a game.
+"""
+
+from constants import TEAM_SUB_MAP, YAHOO_TEAM_CODES
+from typing import NamedTuple
+
+
+class TeamConfig(NamedTuple):
+  # The team's name in data.nba.net URLs, e.g. 'knicks'.
+  slug: str
+  tri_code: str
+  # The key of the team in TEAM_SUB_MAP, e.g. 'Knicks'.
+  nickname: str
+  subreddit: str
+  # The praw.ini entry of the bot account.
+  username: str
+
+  def validate(self):
+    """Raises ValueError if this config doesn't match the team tables."""
+    errors = []
+    if not self.slug:
+      errors.append('slug is empty')
+    if self.tri_code not in YAHOO_TEAM_CODES:
+      errors.append(f'unknown tri code {self.tri_code!r}')
+    if self.nickname not in TEAM_SUB_MAP:
+      errors.append(f'unknown nickname {self.nickname!r}')
+    elif TEAM_SUB_MAP[self.nickname] != self.subreddit:
+      errors.append(
+          f'the {self.nickname} subreddit is r/{TEAM_SUB_MAP[self.nickname]}, '
+          f'not r/{self.subreddit}')
+    if not self.username:
+      errors.append('username is empty')
+    if errors:
+      raise ValueError(f'Invalid team config {self}: {"; ".join(errors)}.')
+    return self
+
+
+def _team(slug, tri_code, nickname):
+  subreddit = TEAM_SUB_MAP[nickname]
+  return TeamConfig(
+      slug, tri_code, nickname, subreddit, f'{subreddit.lower()}-automod')
+
+
+# Keyed by tri code.
+TEAMS = {team.tri_code: team for team in [
+  _team('hawks', 'ATL', 'Hawks'),
+  _team('celtics', 'BOS', 'Celtics'),
+  _team('nets', 'BKN', 'Nets'),
+  _team('hornets', 'CHA', 'Hornets'),
+  _team('bulls', 'CHI', 'Bulls'),
+  _team('cavaliers', 'CLE', 'Cavaliers'),
+  _team('mavericks', 'DAL', 'Mavericks'),
+  _team('nuggets', 'DEN', 'Nuggets'),
+  _team('pistons', 'DET', 'Pistons'),
+  _team('warriors', 'GSW', 'Warriors'),
+  _team('rockets', 'HOU', 'Rockets'),
+  _team('pacers', 'IND', 'Pacers'),
+  _team('clippers', 'LAC', 'Clippers'),
+  _team('lakers', 'LAL', 'Lakers'),
+  _team('grizzlies', 'MEM', 'Grizzlies'),
+  _team('heat', 'MIA', 'Heat'),
+  _team('bucks', 'MIL', 'Bucks'),
+  _team('timberwolves', 'MIN', 'Timberwolves'),
+  _team('pelicans', 'NOP', 'Pelicans'),
+  _team('knicks', 'NYK', 'Knicks'),
+  _team('thunder', 'OKC', 'Thunder'),
+  _team('magic', 'ORL', 'Magic'),
+  _team('sixers', 'PHI', '76ers'),
+  _team('suns', 'PHX', 'Suns'),
+  _team('blazers', 'POR', 'Trail Blazers'),
+  _team('kings', 'SAC', 'Kings'),
+  _team('spurs', 'SAS', 'Spurs'),
+  _team('raptors', 'TOR', 'Raptors'),
+  _team('jazz', 'UTA', 'Jazz'),
+  _team('wizards', 'WAS', 'Wizards'),
+]}
+
+# The team the bots were written for and still default to.
+KNICKS = TEAMS['NYK']
+
+
+def find_team(name):
+  """Returns the TeamConfig whose tri code, slug, nickname or subreddit is name
+  (ignoring case), or None."""
+  name = name.lower()
+  for team in TEAMS.values():
+    if name in (team.tri_code.lower(), team.slug, team.nickname.lower(),
+                team.subreddit.lower()):
+      return team
+  return None
+
+
+def load_team(name, username=None):
+  """Returns the validated TeamConfig for name, as in find_team.
+
+  Parameters
+  ----------
+  name: str
+    The team's tri code, slug, nickname or subreddit.
+  username: str
+    Replaces the config's bot account if given.
+
+  Raises
+  ------
+  ValueError
+    If there is no such team or its config is invalid.
+  """
+  team = find_team(name)
+  if team is None:
+    raise ValueError(f'Unknown team {name!r}.')
+  if username:
+    team = team._replace(username=username)
+  return team.validate()
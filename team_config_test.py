@@ -0,0 +1,43 @@
+from team_config import KNICKS, TEAMS, TeamConfig, find_team, load_team
+
+import unittest
+
+
+class TeamConfigTest(unittest.TestCase):
+
+  def test_teams_allValid(self):
+    self.assertEqual(len(TEAMS), 30)
+    for team in TEAMS.values():
+      team.validate()
+
+  def test_knicks(self):
+    self.assertEqual(
+        KNICKS,
+        TeamConfig('knicks', 'NYK', 'Knicks', 'NYKnicks', 'nyknicks-automod'))
+
+  def test_find_team_anyNameIgnoringCase(self):
+    for name in ('NYK', 'nyk', 'knicks', 'Knicks', 'NYKnicks', 'nyknicks'):
+      self.assertEqual(find_team(name), KNICKS, name)
+    self.assertEqual(find_team('Trail Blazers'), TEAMS['POR'])
+    self.assertIsNone(find_team('test_NYKnicks'))
+
+  def test_load_team_username_replacesAccount(self):
+    self.assertEqual(
+        load_team('NYKnicks', 'other-bot'),
+        KNICKS._replace(username='other-bot'))
+
+  def test_load_team_unknown_raises(self):
+    with self.assertRaises(ValueError):
+      load_team('Sonics')
+
+  def test_validate_unknownTriCode_raises(self):
+    with self.assertRaisesRegex(ValueError, 'unknown tri code'):
+      KNICKS._replace(tri_code='SEA').validate()
+
+  def test_validate_wrongSubreddit_raises(self):
+    with self.assertRaisesRegex(ValueError, 'not r/GoNets'):
+      KNICKS._replace(subreddit='GoNets').validate()
+
+
+if __name__ == '__main__':
+  unittest.main()
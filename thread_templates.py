@@ -0,0 +1,117 @@
+"""
+Loads the templates that lay out the game threads, so each subreddit can own
+the text of its threads without code changes.
+
+Templates are text files in TEMPLATE_DIR with {name} placeholders (and {{ or }}
+for literal braces). A subreddit's own templates go in a directory named after
+it in lowercase, e.g. templates/nyknicks/game_thread.md, and any template it
+doesn't have comes from TEMPLATE_DIR itself. Like in Jinja, a single newline at
+the end of a file is not part of the template, so a thread that should end
+with a newline ends with a blank line.
+
+A template is parsed once into its literal text and field names, and rendering
+only looks the fields up and joins the pieces. TemplateCache keeps the compiled
+templates and compiles a file again only when its modification time changed,
+so a daemon or combined run parses each file once, not once per thread.
+"""
+
+from collections import Counter
+from operator import itemgetter
+from string import Formatter
+
+import os
+
+TEMPLATE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+
+def compile_template(text, name='<template>'):
+  """Returns a function that renders text with the values of a dict.
+
+  Parameters
+  ----------
+  text: str
+    The template, with {field} placeholders. Placeholders are plain names;
+    attribute and index lookups, conversions and format specs are not allowed.
+  name: str
+    Names the template in errors.
+  """
+  heads = []
+  fields = []
+  # Escaped braces end a literal without a field, so literals are collected
+  # until the next field.
+  literal = ''
+  for text_before, field, spec, conversion in Formatter().parse(text):
+    literal += text_before
+    if field is None:
+      continue
+    if not field.isidentifier() or spec or conversion:
+      raise ValueError(f'Unsupported placeholder {{{field}}} in {name}.')
+    heads.append(literal)
+    fields.append(field)
+    literal = ''
+  tail = literal
+
+  if not fields:
+    return lambda values: tail
+
+  # itemgetter returns a tuple only for more than one field.
+  get = itemgetter(*fields) if len(fields) > 1 else \
+      (lambda values: (values[fields[0]],))
+
+  def render(values):
+    parts = []
+    for literal, value in zip(heads, get(values)):
+      parts.append(literal)
+      parts.append(str(value))
+    parts.append(tail)
+    return ''.join(parts)
+
+  return render
+
+
+class TemplateCache:
+
+  def __init__(self, directory=TEMPLATE_DIR):
+    """
+    Parameters
+    ----------
+    directory: str
+      Contains the default templates and a directory of overrides for each
+      subreddit that has any.
+    """
+    self.directory = directory
+    self.stats = Counter()
+    self._compiled = {}
+
+  def path(self, subreddit_name, name):
+    """Returns the file of template name for subreddit_name."""
+    return self._find(subreddit_name, name)[0]
+
+  def _find(self, subreddit_name, name):
+    """Returns the file of template name for subreddit_name and its mtime."""
+    path = os.path.join(self.directory, subreddit_name.lower(), name)
+    try:
+      return path, os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+      path = os.path.join(self.directory, name)
+      return path, os.stat(path).st_mtime_ns
+
+  def get(self, subreddit_name, name):
+    """Returns the compiled template name for subreddit_name, reading the file
+    only if it changed since it was last compiled."""
+    path, mtime = self._find(subreddit_name, name)
+    cached = self._compiled.get(path)
+    if cached is not None and cached[0] == mtime:
+      self.stats['template.hit'] += 1
+      return cached[1]
+    with open(path, encoding='utf-8') as f:
+      text = f.read()
+    render = compile_template(text[:-1] if text.endswith('\n') else text, path)
+    self.stats['template.compile'] += 1
+    self._compiled[path] = (mtime, render)
+    return render
+
+  def render(self, subreddit_name, name, values):
+    """Renders template name for subreddit_name with values."""
+    return self.get(subreddit_name, name)(values)
@@ -0,0 +1,78 @@
+from thread_templates import TemplateCache, compile_template
+
+import os
+import tempfile
+import unittest
+
+
+class CompileTemplateTest(unittest.TestCase):
+
+  def test_render_fillsFields(self):
+    render = compile_template('{team} {{r/{sub}}} {team}!')
+
+    self.assertEqual(
+        render({'team': 'Knicks', 'sub': 'NYKnicks'}),
+        'Knicks {r/NYKnicks} Knicks!')
+
+  def test_render_noFields(self):
+    self.assertEqual(compile_template('just text')({}), 'just text')
+
+  def test_compile_formatSpec_raises(self):
+    with self.assertRaises(ValueError):
+      compile_template('{score:>3}')
+
+  def test_compile_attributeLookup_raises(self):
+    with self.assertRaises(ValueError):
+      compile_template('{team.__class__}')
+
+
+class TemplateCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(self.tmp_dir.cleanup)
+    self.cache = TemplateCache(self.tmp_dir.name)
+    self.write('title.txt', 'Go {team}!\n')
+
+  def write(self, name, text, mtime_ns=None):
+    path = os.path.join(self.tmp_dir.name, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+      f.write(text)
+    if mtime_ns is not None:
+      os.utime(path, ns=(mtime_ns, mtime_ns))
+
+  def test_render_dropsFinalNewline(self):
+    self.assertEqual(
+        self.cache.render('NYKnicks', 'title.txt', {'team': 'Knicks'}),
+        'Go Knicks!')
+
+  def test_render_subredditTemplate_overridesDefault(self):
+    self.write(os.path.join('nyknicks', 'title.txt'), 'Let us go {team}\n')
+
+    self.assertEqual(
+        self.cache.render('NYKnicks', 'title.txt', {'team': 'Knicks'}),
+        'Let us go Knicks')
+    self.assertEqual(
+        self.cache.render('GoNets', 'title.txt', {'team': 'Nets'}), 'Go Nets!')
+
+  def test_get_unchangedFile_compiledOnce(self):
+    first = self.cache.get('NYKnicks', 'title.txt')
+
+    self.assertIs(self.cache.get('NYKnicks', 'title.txt'), first)
+    self.assertEqual(self.cache.stats['template.compile'], 1)
+    self.assertEqual(self.cache.stats['template.hit'], 1)
+
+  def test_get_modifiedFile_compiledAgain(self):
+    self.write('title.txt', 'Go {team}!\n', mtime_ns=1_000_000_000)
+    self.cache.get('NYKnicks', 'title.txt')
+    self.write('title.txt', 'Come on {team}!\n', mtime_ns=2_000_000_000)
+
+    self.assertEqual(
+        self.cache.render('NYKnicks', 'title.txt', {'team': 'Knicks'}),
+        'Come on Knicks!')
+    self.assertEqual(self.cache.stats['template.compile'], 2)
+
+
+if __name__ == '__main__':
+  unittest.main()
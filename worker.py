@@ -0,0 +1,336 @@
+"""
+Runs subreddit jobs from a job queue shared with other worker processes.
+
+Start as many workers as needed, on one host or on several hosts that share the
+queue's file system. Each worker repeatedly claims the job that has been due
+the longest, runs it (the same sidebar and game thread jobs fanout.py runs) and
+puts it back with the time its bots asked to run again. While a job runs the
+worker renews its lease in the background, so a slow Reddit API doesn't let
+another worker take the job over; if the worker dies, its job is taken over
+once the lease expires. Should a worker still lose the lease while it runs the
+job (e.g. it was stalled for longer than a lease), the job's next Reddit request
+raises LeaseLostError instead of going out, so two workers never edit a thread
+at the same time. Adding workers adds capacity at tip-off, and losing one only
+delays its job by a lease.
+
+Each worker has its own NbaService, scoreboard planner and Reddit rate limiter.
+Every subreddit's bot uses its own Reddit account, so the Reddit request budget
+of an account is still only used by whichever worker holds its job.
+"""
+
+from collections import Counter
+from daemon import ERROR_RETRY_INTERVAL
+from datetime import timedelta
+from job_queue import DEFAULT_LEASE, JobQueue
+from services.state_store import DEFAULT_STATE_DIR
+
+import os
+import socket
+import sqlite3
+import threading
+import traceback
+
+DEFAULT_QUEUE_PATH = os.path.join(DEFAULT_STATE_DIR, 'jobs.sqlite3')
+
+# The longest a worker sleeps when no job is due, so it notices jobs that were
+# added in the meantime.
+MAX_IDLE_SLEEP = timedelta(seconds=30)
+
+# The shortest a worker sleeps when no job is due, e.g. when another worker
+# claimed the job that just became due.
+MIN_IDLE_SLEEP = timedelta(seconds=1)
+
+
+class LeaseLostError(Exception):
+  """The worker no longer holds the lease on the job it is running."""
+
+
+class Heartbeat:
+  """Renews a lease in a background thread until the block it guards ends.
+
+  The lease is renewed three times per lease length, so a single slow renewal
+  doesn't lose it. If a renewal finds the lease gone, lost is set and renewing
+  stops."""
+
+  def __init__(self, logger, queue, lease, length=DEFAULT_LEASE):
+    self.logger = logger
+    self.queue = queue
+    self.lease = lease
+    self.length = length
+    self.lost = False
+    self._stopped = threading.Event()
+    self._thread = threading.Thread(
+        target=self._run, name=f'heartbeat-{lease.name}', daemon=True)
+
+  def __enter__(self):
+    self._thread.start()
+    return self
+
+  def __exit__(self, *exc_info):
+    self._stopped.set()
+    self._thread.join()
+    return False
+
+  def check(self):
+    """Raises LeaseLostError if the lease was lost or ran out without being
+    renewed, after which another worker may have claimed the job."""
+    if self.lost or self.queue.now() >= self.lease.expires_at:
+      raise LeaseLostError(f'Lost the lease on {self.lease.name}.')
+
+  def _run(self):
+    interval = self.length.total_seconds() / 3
+    while not self._stopped.wait(interval):
+      try:
+        renewed = self.queue.heartbeat(self.lease, self.length)
+      except sqlite3.Error:
+        # E.g. the database stayed locked; the next renewal may still be in
+        # time.
+        self.logger.warning(
+            f'Could not renew the lease on {self.lease.name}: '
+            f'{traceback.format_exc()}')
+        continue
+      if renewed is None:
+        self.lost = True
+        return
+      self.lease = renewed
+
+
+def default_owner():
+  """Returns a name for this worker process that is unique across hosts."""
+  return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def run_worker(
+    logger,
+    queue,
+    make_job,
+    owner=None,
+    lease=DEFAULT_LEASE,
+    stop=None,
+    exit_when_idle=False):
+  """Claims and runs jobs from queue until stop is set.
+
+  Parameters
+  ----------
+  logger: logging.Logger
+  queue: job_queue.JobQueue
+  make_job: function
+    Called with a job's name and a check_lease function the first time this
+    worker claims the job. Returns a function that does the job's work for the
+    datetime it is called with and returns a daemon.WakePlan for when the job
+    is next due. The job calls check_lease() before each change it makes, which
+    raises LeaseLostError once another worker may have taken the job over (see
+    Heartbeat.check).
+  owner: str
+    Names this worker in the queue. Defaults to default_owner().
+  lease: timedelta
+    How long a claimed job stays with this worker without a heartbeat.
+  stop: threading.Event
+    Makes the worker return after the job it is running, if any.
+  exit_when_idle: bool
+    Return as soon as no job is due instead of waiting for the next one.
+
+  Returns
+  -------
+  collections.Counter
+    How many jobs were completed, failed or lost to another worker.
+  """
+  owner = owner if owner is not None else default_owner()
+  stop = stop if stop is not None else threading.Event()
+  stats = Counter()
+  jobs = {}
+  # The Heartbeat of the job being run.
+  running = [None]
+
+  def check_lease():
+    if running[0] is not None:
+      running[0].check()
+
+  while not stop.is_set():
+    claimed = queue.claim(owner, lease)
+    if claimed is None:
+      if exit_when_idle:
+        break
+      stop.wait(_idle_sleep(queue).total_seconds())
+      continue
+
+    now = queue.now()
+    plan = None
+    error = None
+    with Heartbeat(logger, queue, claimed, lease) as heartbeat:
+      running[0] = heartbeat
+      try:
+        if claimed.name not in jobs:
+          jobs[claimed.name] = make_job(claimed.name, check_lease)
+        plan = jobs[claimed.name](now)
+      except LeaseLostError as e:
+        error = str(e)
+      except Exception:
+        error = traceback.format_exc()
+        logger.error(f'Job {claimed.name} failed: {error}')
+      finally:
+        running[0] = None
+    lease_now = heartbeat.lease
+
+    if plan is not None:
+      kept = queue.complete(lease_now, plan.wake_at)
+      stats['worker.completed'] += kept
+    else:
+      kept = queue.fail(lease_now, now + ERROR_RETRY_INTERVAL, error)
+      stats['worker.failed'] += kept
+    if not kept:
+      stats['worker.lease_lost'] += 1
+      logger.warning(
+          f'Lost the lease on {claimed.name} while running it; another worker '
+          f'took it over.')
+    elif plan is not None:
+      logger.info(f'Job {claimed.name} is next due for {plan.reason}.')
+  return stats
+
+
+def _idle_sleep(queue):
+  """Returns how long to wait for the next job to become claimable."""
+  available_at = queue.next_available_at()
+  if available_at is None:
+    return MAX_IDLE_SLEEP
+  return min(max(available_at - queue.now(), MIN_IDLE_SLEEP), MAX_IDLE_SLEEP)
+
+
+if __name__ == '__main__':
+  from optparse import OptionParser
+
+  import logging.config
+  import signal
+  import sys
+
+  parser = OptionParser(usage='%prog [options] [subreddit...]')
+  parser.add_option(
+      "-q",
+      "--queue",
+      dest="queue",
+      default=DEFAULT_QUEUE_PATH,
+      help="The SQLite job queue shared by all workers.",
+      metavar='path')
+  parser.add_option(
+      "-a",
+      "--all",
+      action="store_true",
+      dest="all",
+      default=False,
+      help="Add the subreddits of all 30 teams to the queue.")
+  parser.add_option(
+      "-s",
+      "--sidebar",
+      action="store_true",
+      dest="sidebar",
+      default=False,
+      help="Update the sidebars.")
+  parser.add_option(
+      "-g",
+      "--game_thread",
+      action="store_true",
+      dest="game_thread",
+      default=False,
+      help="Create or update the game threads.")
+  parser.add_option(
+      "-t",
+      "--tank_standings",
+      dest="tank",
+      help="Print the race to be worst instead of best, if enabled.",
+      metavar='yes|no')
+  parser.add_option(
+      "-l",
+      "--lease",
+      dest="lease",
+      type="int",
+      default=int(DEFAULT_LEASE.total_seconds()),
+      help="Seconds a worker keeps a job without renewing its lease.")
+  parser.add_option(
+      "-o",
+      "--owner",
+      dest="owner",
+      default=default_owner(),
+      help="Names this worker in the queue.")
+  parser.add_option(
+      "--once",
+      action="store_true",
+      dest="once",
+      default=False,
+      help="Exit when no job is due instead of waiting for the next one.")
+  (options, args) = parser.parse_args()
+
+  logging.config.fileConfig('logging.conf')
+  logger = logging.getLogger('worker')
+
+  from fanout import subreddit_job
+  from team_config import TEAMS, load_team
+
+  subreddit_names = [team.subreddit for team in TEAMS.values()] \
+      if options.all else args
+  try:
+    teams = [load_team(name) for name in subreddit_names]
+  except ValueError as e:
+    logger.error(e)
+    raise SystemExit(str(e))
+  selected = [
+    name for name in ('sidebar', 'game_thread') if getattr(options, name)] \
+      or ['sidebar', 'game_thread']
+  yes = set(['yes', 'y', 'true'])
+  tank_standings = bool(options.tank and options.tank.lower() in yes)
+
+  queue = JobQueue(options.queue)
+  queue.add(team.subreddit for team in teams)
+  if not queue.jobs():
+    raise SystemExit(
+        f'The queue {options.queue} is empty. Usage: {sys.argv[0]} [options] '
+        'subreddit...')
+
+  from rate_limiter import RateLimiter
+  from services.game_planner import ScoreboardPlanner
+  from services.nba_service import NbaService
+
+  nba_service = NbaService(logger)
+  rate_limiter = RateLimiter()
+  # Only the queued teams' games are planned. The bots of teams that other
+  # workers add to the queue later fall back to their schedules.
+  planner = ScoreboardPlanner(
+      nba_service, [load_team(job.name).tri_code for job in queue.jobs()]) \
+      if 'game_thread' in selected else None
+
+  def make_job(subreddit_name, check_lease):
+    job = subreddit_job(
+        logger,
+        load_team(subreddit_name),
+        selected,
+        tank_standings,
+        nba_service,
+        rate_limiter,
+        planner,
+        reuse_renders=not options.once,
+        before_request=check_lease)
+
+    def run(now):
+      nba_service.start_run()
+      return job(now)
+
+    return run
+
+  stop = threading.Event()
+  signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+  logger.info(
+      f'Worker {options.owner} running {", ".join(selected)} from '
+      f'{options.queue}.')
+  with nba_service:
+    stats = run_worker(
+        logger,
+        queue,
+        make_job,
+        options.owner,
+        timedelta(seconds=options.lease),
+        stop,
+        exit_when_idle=options.once)
+  logger.info(
+      f'Worker {options.owner} stopped: {stats["worker.completed"]} jobs '
+      f'completed, {stats["worker.failed"]} failed, '
+      f'{stats["worker.lease_lost"]} lost to other workers.')
+  nba_service.log_stats()
@@ -0,0 +1,217 @@
+from constants import UTC
+from daemon import WakePlan
+from datetime import datetime, timedelta
+from job_queue import JobQueue
+from worker import run_worker
+
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+import unittest
+
+# 1 hour before NYK @ CLE in the fake services' data.
+GAME_NOW = datetime(2020, 12, 29, 23, 0, 0, 0, UTC)
+
+
+def _game_thread_worker(path, lease_seconds, run_seconds, barrier, runs):
+  """The body of a worker process: runs the game thread bots of the queue's
+  jobs (named 'tri code-n') against the fake NBA service and a mock Reddit for
+  run_seconds, reporting each run on runs."""
+  from game_thread_bot import GameThreadBot
+  from services.fake_nba_service import FakeNbaService
+  from team_config import TEAMS
+  from unittest.mock import MagicMock
+
+  logging.basicConfig(level=logging.ERROR)
+  logger = logging.getLogger(__name__)
+  nba_service = FakeNbaService()
+  owner = f'worker-{os.getpid()}'
+
+  def make_job(name, check_lease):
+    reddit = MagicMock()
+    reddit.subreddit.return_value.new.return_value = []
+    team = TEAMS[name.split('-')[0]]
+    bot = GameThreadBot(logger, nba_service, GAME_NOW, reddit, name, team)
+
+    def job(now):
+      started = time.time()
+      plan = bot.run()
+      # Long enough for the other workers to try to claim the job meanwhile.
+      time.sleep(0.02)
+      runs.put((name, owner, started, time.time(), plan.reason))
+      # Due again right away, so the workers keep competing for every job.
+      return WakePlan(now, plan.reason)
+
+    return job
+
+  shared_queue = JobQueue(path)
+  stop = threading.Event()
+  barrier.wait()
+  threading.Timer(run_seconds, stop.set).start()
+  run_worker(
+      logger,
+      shared_queue,
+      make_job,
+      owner,
+      timedelta(seconds=lease_seconds),
+      stop)
+  shared_queue.close()
+
+
+class WorkerTest(unittest.TestCase):
+
+  def setUp(self):
+    logging.basicConfig(level=logging.ERROR)
+    self.logger = logging.getLogger(__name__)
+    temp_dir = tempfile.TemporaryDirectory()
+    self.addCleanup(temp_dir.cleanup)
+    self.path = os.path.join(temp_dir.name, 'jobs.sqlite3')
+    self.queue = JobQueue(self.path)
+    self.addCleanup(self.queue.close)
+
+  def test_run_worker_runsDueJobsAndReschedules(self):
+    self.queue.add(['a', 'b'])
+    self.queue.add(['later'], self.queue.now() + timedelta(hours=1))
+    ran = []
+
+    def make_job(name, check_lease):
+      def job(now):
+        ran.append(name)
+        return WakePlan(now + timedelta(minutes=5), 'later')
+      return job
+
+    stats = run_worker(
+        self.logger, self.queue, make_job, 'w', exit_when_idle=True)
+
+    self.assertEqual(sorted(ran), ['a', 'b'])
+    self.assertEqual(stats['worker.completed'], 2)
+    jobs = {job.name: job for job in self.queue.jobs()}
+    self.assertEqual(jobs['a'].runs, 1)
+    self.assertIsNone(jobs['a'].owner)
+    self.assertEqual(jobs['later'].runs, 0)
+
+  def test_run_worker_failingJob_retriedLater(self):
+    self.queue.add(['broken'])
+
+    def make_job(name, check_lease):
+      def job(now):
+        raise ValueError('boom')
+      return job
+
+    stats = run_worker(
+        self.logger, self.queue, make_job, 'w', exit_when_idle=True)
+
+    self.assertEqual(stats['worker.failed'], 1)
+    job = self.queue.jobs()[0]
+    self.assertEqual(job.failures, 1)
+    self.assertIn('ValueError: boom', job.last_error)
+    self.assertGreater(job.due_at, self.queue.now())
+
+  def test_run_worker_slowJob_heartbeatKeepsLease(self):
+    self.queue.add(['slow'])
+    lease = timedelta(seconds=0.3)
+    other_worker = JobQueue(self.path)
+    self.addCleanup(other_worker.close)
+    claims = []
+
+    def make_job(name, check_lease):
+      def job(now):
+        # Past the end of the lease as claimed.
+        time.sleep(0.5)
+        claims.append(other_worker.claim('other', lease))
+        return WakePlan(now + timedelta(hours=1), 'later')
+      return job
+
+    stats = run_worker(
+        self.logger, self.queue, make_job, 'w', lease, exit_when_idle=True)
+
+    self.assertEqual(claims, [None])
+    self.assertEqual(stats['worker.completed'], 1)
+    self.assertEqual(stats['worker.lease_lost'], 0)
+
+  def test_run_worker_leaseLostWhileRunning_jobStopsBeforeEditing(self):
+    self.queue.add(['stalled'])
+    lease = timedelta(seconds=0.3)
+    other_worker = JobQueue(self.path)
+    self.addCleanup(other_worker.close)
+    edits = []
+
+    def make_job(name, check_lease):
+      def job(now):
+        check_lease()
+        # Another worker takes the job over, as if this one had stalled for
+        # longer than the lease.
+        other_worker.remove(name)
+        other_worker.add([name])
+        other_worker.claim('other', lease)
+        # Long enough for the next renewal to find the lease gone.
+        time.sleep(0.2)
+        check_lease()
+        edits.append(name)
+        return WakePlan(now + timedelta(hours=1), 'later')
+      return job
+
+    stats = run_worker(
+        self.logger, self.queue, make_job, 'w', lease, exit_when_idle=True)
+
+    self.assertEqual(edits, [])
+    self.assertEqual(stats['worker.lease_lost'], 1)
+    self.assertEqual(self.queue.jobs()[0].owner, 'other')
+
+  def test_run_worker_manyProcesses_neverRunSameJobAtOnce(self):
+    names = [f'{tri_code}-{i}' for tri_code in ('NYK', 'CLE') for i in range(4)]
+    self.queue.add(names)
+    # A worker that died after claiming a job: the job is taken over once its
+    # lease expires.
+    dead_lease = self.queue.claim('dead', timedelta(seconds=0.5))
+
+    processes = 3
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(processes)
+    runs = context.Queue()
+    workers = [
+      context.Process(
+          target=_game_thread_worker,
+          args=(self.path, 2, 1.5, barrier, runs))
+      for _ in range(processes)]
+    for worker in workers:
+      worker.start()
+    # A worker only exits once its runs were read, so read while they run.
+    results = []
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline and (
+        any(worker.is_alive() for worker in workers) or not runs.empty()):
+      try:
+        results.append(runs.get(timeout=0.1))
+      except queue.Empty:
+        pass
+    for worker in workers:
+      worker.join(timeout=1)
+    self.assertEqual([worker.exitcode for worker in workers], [0] * processes)
+
+    # Every job ran, the bots made game threads and the work was shared.
+    self.assertEqual({name for name, *_ in results}, set(names))
+    self.assertEqual(
+        {reason for *_, reason in results}, {'game in progress'})
+    self.assertGreater(len({owner for _, owner, *_ in results}), 1)
+    # No two runs of a job overlapped.
+    for name in names:
+      intervals = sorted(
+          (started, ended) for job, _, started, ended, _ in results
+          if job == name)
+      for (_, ended), (started, _) in zip(intervals, intervals[1:]):
+        self.assertLessEqual(ended, started, name)
+    # The queue counted exactly the runs that were reported.
+    jobs = {job.name: job for job in self.queue.jobs()}
+    for name in names:
+      self.assertEqual(
+          jobs[name].runs, sum(1 for job, *_ in results if job == name), name)
+    self.assertIn(dead_lease.name, {name for name, *_ in results})
+
+
+if __name__ == '__main__':
+  unittest.main()